@@ -0,0 +1,301 @@
+# backend/app/core/admission.py
+"""
+Admission Control
+-----------------
+Gate in front of the LLM-backed endpoints, so one client (or a patient app
+stuck in a retry loop) can't eat the model capacity everybody shares.
+
+- Per user: a token bucket (ADMISSION_USER_RATE_PER_MINUTE, burst
+  ADMISSION_USER_BURST); each LLM-backed request costs one token. An empty
+  bucket is answered 429 with Retry-After = time until the next token.
+- Globally: at most ADMISSION_CAPACITY requests in flight. 0 derives it
+  from the LLM router: the summed max_concurrency of backends whose
+  circuit isn't open, so an outage sheds load instead of queueing it.
+- Priority classes share that capacity with headroom kept for the classes
+  above them: "doctor" may use all of it, "ongoing" (a triage conversation
+  already under way) ADMISSION_ONGOING_SHARE, "new_chat"
+  ADMISSION_NEW_CHAT_SHARE. Waiters are served highest class first; one
+  that isn't admitted within ADMISSION_MAX_WAIT_SECONDS gets 429.
+
+Only routes that call the LLM go through the gate: the doctor dashboard
+reads the database and the queue, so it stays up while every backend's
+circuit is open.
+
+Counters live in an AdmissionBackend. The default is in-memory (one
+worker); with several workers, plug a shared store (Redis, ...) in through
+set_admission_backend() at startup so the buckets and the in-flight count
+are global. Waiting is per process; waiters re-check the store every
+ADMISSION_POLL_SECONDS to see capacity freed by other workers.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import Depends, HTTPException, Request
+
+from app.core import metrics
+from app.core.auth_cache import UserSnapshot
+from app.core.config import settings
+from app.core.deps import get_current_user
+
+PRIORITIES = ("doctor", "ongoing", "new_chat")  # highest first
+SLOTS_KEY = "llm"
+
+ADMISSION_DECISIONS = metrics.counter(
+    "admission_decisions_total", "Admission results by priority (admitted | rate_limited | shed)"
+)
+ADMISSION_WAIT = metrics.histogram("admission_wait_seconds", "Time spent queued for an admission slot")
+ADMISSION_WAITING = metrics.gauge("admission_waiting", "Requests queued for an admission slot, by priority")
+
+
+class AdmissionBackend:
+    """
+    Interface for the admission counters. A shared implementation must make
+    each call atomic across workers (e.g. a Redis Lua script) and should
+    expire in-flight entries so a crashed worker can't leak capacity.
+    """
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens from bucket `key`: 0.0 if taken, else seconds until they would be."""
+        raise NotImplementedError
+
+    def acquire(self, key: str, limit: int) -> bool:
+        """One more in flight under `key` if fewer than `limit` are."""
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        raise NotImplementedError
+
+    def in_flight(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class InMemoryAdmissionBackend(AdmissionBackend):
+    """Buckets and counters in this process; idle full buckets are dropped."""
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated)
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_buckets:
+                self._prune(now, rate, burst)
+            return (cost - tokens) / rate if rate > 0 else math.inf
+
+    def _prune(self, now: float, rate: float, burst: float) -> None:
+        for k in [k for k, (t, u) in self._buckets.items() if t + (now - u) * rate >= burst]:
+            del self._buckets[k]
+
+    def acquire(self, key: str, limit: int) -> bool:
+        with self._lock:
+            current = self._in_flight.get(key, 0)
+            if current >= limit:
+                return False
+            self._in_flight[key] = current + 1
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._in_flight[key] = max(0, self._in_flight.get(key, 0) - 1)
+
+    def in_flight(self, key: str) -> int:
+        return self._in_flight.get(key, 0)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"{reason}; retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        backend: Optional[AdmissionBackend] = None,
+        rate_per_minute: float = 20,
+        burst: float = 10,
+        capacity: int = 0,
+        shares: Optional[Dict[str, float]] = None,
+        max_wait: float = 5.0,
+        poll: float = 0.1,
+    ):
+        self.backend = backend or InMemoryAdmissionBackend()
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.capacity = capacity
+        self.shares = shares or {"doctor": 1.0, "ongoing": 0.9, "new_chat": 0.6}
+        self.max_wait = max_wait
+        self.poll = poll
+        self._waiters: List[Tuple[int, int, asyncio.Event]] = []  # heap of (rank, seq, wake-up)
+        self._seq = itertools.count()
+        self._avg_hold = 1.0  # EWMA of slot hold time, seeds Retry-After
+
+    def total_capacity(self) -> int:
+        if self.capacity > 0:
+            return self.capacity
+        try:
+            from app.services.llm_client import get_llm_client
+            backends = get_llm_client().backends
+        except RuntimeError:
+            return settings.LLM_MAX_CONCURRENCY  # no LLM configured: nothing to derive from
+        return sum(b.max_concurrency for b in backends if b.breaker.available())
+
+    def limit(self, priority: str) -> int:
+        capacity = self.total_capacity()
+        if capacity <= 0:
+            return 0
+        return max(1, math.floor(capacity * self.shares.get(priority, 1.0)))
+
+    def _retry_after(self, priority: str) -> float:
+        waiting = len(self._waiters) + 1
+        return max(1.0, waiting * self._avg_hold / max(1, self.limit(priority)))
+
+    def check_rate(self, user_id: int, cost: float = 1.0) -> None:
+        if cost <= 0 or self.rate <= 0:
+            return
+        wait = self.backend.take(f"user:{user_id}", self.rate, self.burst, cost)
+        if wait > 0:
+            raise AdmissionRejected("rate_limited", wait)
+
+    async def _acquire_slot(self, priority: str) -> None:
+        rank = PRIORITIES.index(priority)
+        if self.limit(priority) <= 0:
+            raise AdmissionRejected("shed", settings.LLM_BREAKER_COOLDOWN_SECONDS)  # every LLM backend is down
+        if not self._waiters and self.backend.acquire(SLOTS_KEY, self.limit(priority)):
+            return
+
+        wake = asyncio.Event()
+        entry = (rank, next(self._seq), wake)
+        heapq.heappush(self._waiters, entry)
+        ADMISSION_WAITING.inc(priority=priority)
+        deadline = time.monotonic() + self.max_wait
+        queued = time.monotonic()
+        try:
+            while True:
+                # Only the best-placed waiter may take a slot; the rest keep their turn
+                if self._waiters[0] is entry and self.backend.acquire(SLOTS_KEY, self.limit(priority)):
+                    ADMISSION_WAIT.observe(time.monotonic() - queued)
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AdmissionRejected("shed", self._retry_after(priority))
+                wake.clear()
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=min(self.poll, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            ADMISSION_WAITING.dec(priority=priority)
+            self._wake_head()
+
+    def _wake_head(self) -> None:
+        if self._waiters:
+            self._waiters[0][2].set()
+
+    @asynccontextmanager
+    async def admit(self, user_id: int, priority: str, cost: float = 1.0):
+        """Hold an admission slot for the body; raises AdmissionRejected when refused."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        try:
+            self.check_rate(user_id, cost)
+            await self._acquire_slot(priority)
+        except AdmissionRejected as e:
+            ADMISSION_DECISIONS.inc(priority=priority, result=e.reason)
+            raise
+        ADMISSION_DECISIONS.inc(priority=priority, result="admitted")
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.backend.release(SLOTS_KEY)
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * (time.monotonic() - started)
+            self._wake_head()
+
+
+def _shares() -> Dict[str, float]:
+    return {
+        "doctor": 1.0,
+        "ongoing": settings.ADMISSION_ONGOING_SHARE,
+        "new_chat": settings.ADMISSION_NEW_CHAT_SHARE,
+    }
+
+
+_backend: AdmissionBackend = InMemoryAdmissionBackend()
+_controller: Optional[AdmissionController] = None
+
+metrics.gauge(
+    "admission_in_flight",
+    "Requests holding an admission slot",
+    fn=lambda: _backend.in_flight(SLOTS_KEY),
+)
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            _backend,
+            rate_per_minute=settings.ADMISSION_USER_RATE_PER_MINUTE,
+            burst=settings.ADMISSION_USER_BURST,
+            capacity=settings.ADMISSION_CAPACITY,
+            shares=_shares(),
+            max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+            poll=settings.ADMISSION_POLL_SECONDS,
+        )
+    return _controller
+
+
+def set_admission_backend(backend: AdmissionBackend) -> None:
+    global _backend, _controller
+    _backend = backend
+    _controller = None
+
+
+Classifier = Callable[[Request, UserSnapshot], Awaitable[str]]
+
+
+def admission(priority: Union[str, Classifier], cost: float = 1.0):
+    """
+    Route dependency: authenticates, then holds an admission slot until the
+    response (streams included) is finished. `priority` is a class name or
+    an async classifier(request, user) for routes whose class depends on
+    the request (e.g. a new vs. an ongoing conversation).
+    """
+    async def dependency(request: Request, user: UserSnapshot = Depends(get_current_user)):
+        if not settings.ADMISSION_ENABLED:
+            yield user
+            return
+        cls = priority if isinstance(priority, str) else await priority(request, user)
+        try:
+            async with get_admission_controller().admit(user.id, cls, cost):
+                yield user
+        except AdmissionRejected as e:
+            detail = "Too many requests" if e.reason == "rate_limited" else "Server busy"
+            raise HTTPException(
+                status_code=429,
+                detail=f"{detail}, please retry shortly",
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+
+    return dependency
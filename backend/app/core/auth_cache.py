@@ -0,0 +1,99 @@
+# backend/app/core/auth_cache.py
+"""
+Authenticated-user cache for get_current_user.
+
+Maps a bearer token to its verified claims and a lightweight snapshot of
+the user row, so repeat requests skip both the JWT signature check and the
+users-table lookup. Entries expire at the token's own `exp` or after
+AUTH_CACHE_TTL_SECONDS, whichever is first, and are dropped explicitly when
+the user row changes (see the listeners in app/models/user.py).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+AUTH_CACHE_HITS = metrics.counter("auth_cache_hits_total", "get_current_user served from the token cache")
+AUTH_CACHE_MISSES = metrics.counter("auth_cache_misses_total", "get_current_user that had to verify and query")
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The fields routes read from the current user; safe to share across requests."""
+    id: int
+    name: str
+    email: str
+    role: Any
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(id=user.id, name=user.name, email=user.email, role=user.role)
+
+
+class TokenCache:
+    def __init__(self, max_entries: int = 10_000, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], UserSnapshot]]" = OrderedDict()
+        self._by_email: Dict[str, Set[str]] = {}
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and now < entry[0]:
+                self._entries.move_to_end(token)
+                AUTH_CACHE_HITS.inc()
+                return entry[2]
+            if entry is not None:
+                self._drop(token)
+        AUTH_CACHE_MISSES.inc()
+        return None
+
+    def put(self, token: str, claims: Dict[str, Any], user: UserSnapshot) -> None:
+        expires_at = time.time() + self.ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        with self._lock:
+            if token in self._entries:
+                self._drop(token)
+            self._entries[token] = (expires_at, claims, user)
+            self._by_email.setdefault(user.email, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_user(self, email: str) -> None:
+        with self._lock:
+            for token in list(self._by_email.get(email, ())):
+                self._drop(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_email.clear()
+
+    def _drop(self, token: str) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._by_email.get(entry[2].email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_email[entry[2].email]
+
+
+token_cache = TokenCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(email: str) -> None:
+    token_cache.invalidate_user(email)
@@ -6,14 +6,119 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")  # default: derived from DATABASE_URL
+
+    # Connection pool (server databases)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    # SQLite
+    SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "true").lower() in ("1", "true", "yes")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
 
     # JWT / Auth
     SECRET_KEY: str = os.getenv("JWT_SECRET", os.getenv("SECRET_KEY", "dev-secret-change-me"))
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60 * 12))
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", 10_000))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+
+    # Metrics (/metrics, request latency middleware, pipeline step timings)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Triage record write-behind
+    TRIAGE_WRITE_MODE: str = os.getenv("TRIAGE_WRITE_MODE", "commit")  # commit (ack after commit) | enqueue | direct
+    TRIAGE_WRITE_FLUSH_MS: float = float(os.getenv("TRIAGE_WRITE_FLUSH_MS", 20))
+    TRIAGE_WRITE_BATCH_MAX: int = int(os.getenv("TRIAGE_WRITE_BATCH_MAX", 200))
+    TRIAGE_WRITE_QUEUE_MAX: int = int(os.getenv("TRIAGE_WRITE_QUEUE_MAX", 10_000))
+
+    # Rule-based triage fast path (skips the LLM for clear-cut cases)
+    TRIAGE_FAST_PATH: bool = os.getenv("TRIAGE_FAST_PATH", "true").lower() in ("1", "true", "yes")
+    TRIAGE_FAST_PATH_SEVERITIES: str = os.getenv("TRIAGE_FAST_PATH_SEVERITIES", "Critical")  # comma-separated
+    TRIAGE_FAST_PATH_MIN_SCORE: float = float(os.getenv("TRIAGE_FAST_PATH_MIN_SCORE", 90))  # term coverage 0-100
+
+    # LLM triage output
+    TRIAGE_LLM_JSON_MODE: bool = os.getenv("TRIAGE_LLM_JSON_MODE", "true").lower() in ("1", "true", "yes")
+    TRIAGE_LLM_STREAM: bool = os.getenv("TRIAGE_LLM_STREAM", "false").lower() in ("1", "true", "yes")  # act on fields mid-stream
+    TRIAGE_LLM_REPAIR_RETRIES: int = int(os.getenv("TRIAGE_LLM_REPAIR_RETRIES", 1))  # 0 disables the repair request
+    # With every LLM backend down, the rule table tickets only a symptom it matched this well (term coverage 0-100)
+    TRIAGE_FALLBACK_MIN_SCORE: float = float(os.getenv("TRIAGE_FALLBACK_MIN_SCORE", 65))
+
+    # Triage queue engine
+    QUEUE_AGING_SECONDS: float = float(os.getenv("QUEUE_AGING_SECONDS", 1800))  # head start per severity level
+    QUEUE_SERVICE_INTERVAL_SECONDS: float = float(os.getenv("QUEUE_SERVICE_INTERVAL_SECONDS", 120))  # until observed
+    QUEUE_SERVICE_EWMA_ALPHA: float = float(os.getenv("QUEUE_SERVICE_EWMA_ALPHA", 0.2))
+    QUEUE_REBUILD_MAX_AGE_HOURS: float = float(os.getenv("QUEUE_REBUILD_MAX_AGE_HOURS", 48))
+    # In-process /patients/ snapshots only see this worker's writes: off by default with several workers
+    QUEUE_SNAPSHOT_CACHE: bool = os.getenv(
+        "QUEUE_SNAPSHOT_CACHE", "true" if int(os.getenv("WEB_CONCURRENCY", 1)) <= 1 else "false"
+    ).lower() in ("1", "true", "yes")
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_QUEUE: int = int(os.getenv("PASSWORD_HASH_QUEUE", 64))  # waiting beyond the workers
 
     # Groq
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "")  # e.g. a local stub server
+
+    # LLM client
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 30))
+    LLM_POOL_MAX_CONNECTIONS: int = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", 32))
+    LLM_POOL_MAX_KEEPALIVE: int = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", 16))
+    LLM_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", 60))
+
+    # LLM routing
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")  # a backend's "model" overrides it
+    LLM_BACKENDS: str = os.getenv("LLM_BACKENDS", "")  # JSON list in priority order; empty = Groq only
+    LLM_HEDGE_AFTER_MS: float = float(os.getenv("LLM_HEDGE_AFTER_MS", 2500))  # 0 disables hedging
+    LLM_BREAKER_WINDOW: int = int(os.getenv("LLM_BREAKER_WINDOW", 20))  # recent calls per backend
+    LLM_BREAKER_ERROR_RATE: float = float(os.getenv("LLM_BREAKER_ERROR_RATE", 0.5))
+    LLM_BREAKER_MIN_CALLS: int = int(os.getenv("LLM_BREAKER_MIN_CALLS", 5))
+    LLM_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", 30))
+
+    # Admission control (LLM-backed endpoints)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    ADMISSION_USER_RATE_PER_MINUTE: float = float(os.getenv("ADMISSION_USER_RATE_PER_MINUTE", 20))
+    ADMISSION_USER_BURST: float = float(os.getenv("ADMISSION_USER_BURST", 10))
+    ADMISSION_CAPACITY: int = int(os.getenv("ADMISSION_CAPACITY", 0))  # 0 = healthy LLM backends' concurrency
+    ADMISSION_ONGOING_SHARE: float = float(os.getenv("ADMISSION_ONGOING_SHARE", 0.9))  # of capacity
+    ADMISSION_NEW_CHAT_SHARE: float = float(os.getenv("ADMISSION_NEW_CHAT_SHARE", 0.6))
+    ADMISSION_MAX_WAIT_SECONDS: float = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", 5))
+    ADMISSION_POLL_SECONDS: float = float(os.getenv("ADMISSION_POLL_SECONDS", 0.1))  # re-check a shared store
+
+    # LLM response cache
+    LLM_CACHE_MODE: str = os.getenv("LLM_CACHE_MODE", "deterministic")  # off | deterministic | all
+    LLM_CACHE_MAX_TEMPERATURE: float = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", 0.2))  # deterministic mode
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", 2048))
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", 3600))
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "")  # e.g. ./llm_cache.db; empty = memory only
+
+    # Conversation sessions
+    CONVERSATION_TOKEN_BUDGET: int = int(os.getenv("CONVERSATION_TOKEN_BUDGET", 1500))  # per prompt, system included
+    CONVERSATION_SUMMARY_MAX_CHARS: int = int(os.getenv("CONVERSATION_SUMMARY_MAX_CHARS", 800))
+    CONVERSATION_MAX_SESSIONS: int = int(os.getenv("CONVERSATION_MAX_SESSIONS", 10_000))
+    CONVERSATION_SESSION_TTL_SECONDS: float = float(os.getenv("CONVERSATION_SESSION_TTL_SECONDS", 7200))
+
+    # Clinical NER
+    NER_MODEL: str = os.getenv("NER_MODEL", "samrawal/bert-base-uncased_clinical-ner")
+    NER_MODEL_DIR: str = os.getenv("NER_MODEL_DIR", "")  # local copy; loads offline when set
+    NER_BACKEND: str = os.getenv("NER_BACKEND", "torch")  # torch | onnx
+    NER_QUANTIZE: bool = os.getenv("NER_QUANTIZE", "false").lower() in ("1", "true", "yes")  # onnx only
+    NER_PRELOAD: bool = os.getenv("NER_PRELOAD", "true").lower() in ("1", "true", "yes")
+    NER_ALLOW_FALLBACK: bool = os.getenv("NER_ALLOW_FALLBACK", "true").lower() in ("1", "true", "yes")
+    NER_BATCH_SIZE: int = int(os.getenv("NER_BATCH_SIZE", 16))
+    NER_BATCH_MAX_WAIT_MS: float = float(os.getenv("NER_BATCH_MAX_WAIT_MS", 10))
+
+    # Severity rules
+    SEVERITY_RULES_PATH: str = os.getenv("SEVERITY_RULES_PATH", "")  # default: app/data/severity_rules.json
+    SEVERITY_RULES_RELOAD_SECONDS: float = float(os.getenv("SEVERITY_RULES_RELOAD_SECONDS", 5))  # 0 disables
 
     class Config:
         extra = "ignore"
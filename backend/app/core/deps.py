@@ -1,9 +1,10 @@
 # backend/app/core/deps.py
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.auth_cache import UserSnapshot, token_cache
+from app.core.metrics import timed
+from app.core.database import AsyncSessionLocal, SessionLocal
 from app.core.security import decode_token
 
 security = HTTPBearer()
@@ -15,22 +16,37 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: Session = Depends(get_db)
-    ):
+async def get_async_db():
+    # Needs the async driver for DATABASE_URL (aiosqlite for SQLite, asyncpg for Postgres)
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@timed("get_current_user")
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserSnapshot:
+        token = credentials.credentials
+
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+
         # Lazy import to avoid circular refs
         from app.models.user import User
 
-        token = credentials.credentials
         payload = decode_token(token)
 
         email = payload.get("sub")
         if not email:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-
-        return user
+        # Own short-lived session: cache hits above never open one
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.email == email).first()
+            if not user:
+                raise HTTPException(status_code=401, detail="User not found")
+            snapshot = UserSnapshot.from_user(user)
+        finally:
+            db.close()
+
+        token_cache.put(token, payload, snapshot)
+        return snapshot
@@ -0,0 +1,220 @@
+# backend/app/core/metrics.py
+"""
+Minimal in-process metrics registry rendered in Prometheus text format.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock;
+there is no external dependency. Services create their metrics at import
+time and `/metrics` renders everything registered.
+
+`span()` / `timed()` time named pipeline steps into one histogram
+(pipeline_step_seconds{step=...}). With METRICS_ENABLED=false they are
+resolved to no-ops up front: `timed` returns the function unchanged.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Pipeline steps range from sub-millisecond rule scoring to multi-second LLM calls
+STEP_BUCKETS = (0.0005, 0.001, 0.0025) + DEFAULT_BUCKETS
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_key(labels), 0.0)
+
+    def samples(self):
+        for key, v in list(self._values.items()):
+            yield f"{self.name}{_fmt_labels(key)} {v}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+        self._fn = fn
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        if self._fn is not None:
+            return float(self._fn())
+        return self._values.get(_key(labels), 0.0)
+
+    def samples(self):
+        if self._fn is not None:
+            yield f"{self.name} {float(self._fn())}"
+            return
+        for key, v in list(self._values.items()):
+            yield f"{self.name}{_fmt_labels(key)} {v}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def count(self, **labels: str) -> float:
+        row = self._values.get(_key(labels))
+        return row[-1] if row else 0.0
+
+    def sum(self, **labels: str) -> float:
+        row = self._values.get(_key(labels))
+        return row[-2] if row else 0.0
+
+    def samples(self):
+        for key, row in list(self._values.items()):
+            for bound, n in zip(self.buckets, row):
+                yield f"{self.name}_bucket{_fmt_labels(key, ('le', str(bound)))} {n}"
+            yield f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {row[-1]}"
+            yield f"{self.name}_sum{_fmt_labels(key)} {row[-2]}"
+            yield f"{self.name}_count{_fmt_labels(key)} {row[-1]}"
+
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, help: str) -> Counter:
+    return _register(Counter(name, help))
+
+
+def gauge(name: str, help: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+    return _register(Gauge(name, help, fn))
+
+
+def histogram(name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, buckets))
+
+
+PIPELINE_STEP = histogram("pipeline_step_seconds", "Time spent in instrumented pipeline steps", STEP_BUCKETS)
+
+_NO_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("step", "started")
+
+    def __init__(self, step: str):
+        self.step = step
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        PIPELINE_STEP.observe(time.perf_counter() - self.started, step=self.step)
+        return False
+
+
+def span(step: str):
+    """`with span("calculate_severity"):` — records the block's duration (errors included)."""
+    return _Span(step) if settings.METRICS_ENABLED else _NO_SPAN
+
+
+def timed(step: str):
+    """Decorator form of span() for sync and async functions."""
+    def decorate(fn):
+        if not settings.METRICS_ENABLED:
+            return fn
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _Span(step):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(step):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in list(_registry.values()):
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
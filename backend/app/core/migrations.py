@@ -0,0 +1,52 @@
+# backend/app/core/migrations.py
+"""
+Lightweight, idempotent schema upgrades.
+
+`Base.metadata.create_all()` only creates missing tables; it never touches
+tables that already exist. Anything added to an existing table (indexes,
+columns) is applied here at startup so old databases catch up.
+
+New columns on existing tables must be nullable (or have a server default).
+Data backfills run last and must be idempotent.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base
+
+
+def _create_missing_indexes(engine: Engine) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _add_missing_columns(engine: Engine) -> None:
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {col_type}'))
+
+
+def _backfill_triage_terms(engine: Engine) -> None:
+    from app.services.triage_terms import backfill_terms, ensure_fts
+
+    # FTS first: its triggers index the backfilled terms
+    ensure_fts(engine)
+    backfill_terms(engine)
+
+
+def run_migrations(engine: Engine) -> None:
+    _add_missing_columns(engine)
+    _create_missing_indexes(engine)
+    _backfill_triage_terms(engine)
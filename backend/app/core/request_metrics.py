@@ -0,0 +1,58 @@
+# backend/app/core/request_metrics.py
+"""
+Per-route request metrics as a plain ASGI middleware (no BaseHTTPMiddleware,
+so responses aren't re-wrapped and streams aren't buffered).
+
+- http_request_duration_seconds{method,route,status}: from the request
+  arriving to the response finishing. For SSE/streaming routes this is the
+  lifetime of the stream.
+- http_requests_in_flight{method}
+
+`route` is the path template the router dispatched to
+("/chat/sessions/{session_id}"), never the raw path, so ids don't explode
+the label set; requests no route matched are "unmatched". The template is
+only known once routing has happened, which is why in-flight requests are
+counted per method. Installed by main.py only when METRICS_ENABLED is on.
+"""
+
+import time
+
+from app.core import metrics
+
+HTTP_DURATION = metrics.histogram("http_request_duration_seconds", "Request latency by route", metrics.STEP_BUCKETS)
+HTTP_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Requests currently being handled, by method")
+
+
+def route_template(scope) -> str:
+    """Path template of the route that handled `scope` (set by the router while dispatching)."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500  # if the app raises before starting a response
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=method)
+            HTTP_DURATION.observe(
+                time.perf_counter() - started, method=method, route=route_template(scope), status=str(status)
+            )
@@ -1,17 +1,98 @@
+import asyncio
+import math
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 
+from app.core import metrics
 from app.core.config import settings
 
+T = TypeVar("T")
+
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+PASSWORD_POOL_BUSY = metrics.gauge("password_pool_busy", "Password hash jobs running or queued")
+PASSWORD_POOL_REJECTED = metrics.counter("password_pool_rejected_total", "Password hash jobs rejected (pool saturated)")
+PASSWORD_HASH_SECONDS = metrics.histogram("password_hash_seconds", "bcrypt hash/verify time on the worker")
+
+class PasswordPoolSaturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing pool saturated; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class PasswordHasherPool:
+    """
+    Dedicated, bounded pool for bcrypt work.
+
+    bcrypt releases the GIL, so a few threads give real parallelism without
+    borrowing the shared request threadpool. At most workers + queue_size
+    jobs are admitted; beyond that callers get PasswordPoolSaturated right
+    away instead of piling up.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 64):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._avg_seconds = 0.25  # EWMA of job time, seeds Retry-After
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._busy * self._avg_seconds / self.workers))
+
+    def _timed(self, fn: Callable[..., T], *args) -> T:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._avg_seconds = 0.9 * self._avg_seconds + 0.1 * elapsed
+            PASSWORD_HASH_SECONDS.observe(elapsed)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._busy >= self.capacity:
+                PASSWORD_POOL_REJECTED.inc()
+                raise PasswordPoolSaturated(self._retry_after())
+            self._busy += 1
+        PASSWORD_POOL_BUSY.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, fn, *args)
+        finally:
+            with self._lock:
+                self._busy -= 1
+            PASSWORD_POOL_BUSY.dec()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_password_pool: Optional[PasswordHasherPool] = None
+
+def get_password_pool() -> PasswordHasherPool:
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = PasswordHasherPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE)
+    return _password_pool
+
+def init_password_pool() -> None:
+    get_password_pool()
+
+def close_password_pool() -> None:
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown()
+        _password_pool = None
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -19,6 +100,12 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed: str) -> bool:
     return pwd_context.verify(plain_password, hashed)
 
+async def get_password_hash_async(password: str) -> str:
+    return await get_password_pool().run(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed: str) -> bool:
+    return await get_password_pool().run(verify_password, plain_password, hashed)
+
 def create_access_token(subject: str, role: str, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = {"sub": subject, "role": role, "iat": int(datetime.utcnow().timestamp())}
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -0,0 +1,23 @@
+# backend/app/core/sse.py
+"""Server-Sent Events framing helpers."""
+
+import json
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(data: Any, event: str = "", id: Optional[int] = None) -> str:
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_comment(text: str = "keep-alive") -> str:
+    return f": {text}\n\n"
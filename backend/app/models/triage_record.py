@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
 
@@ -19,4 +20,33 @@ class TriageRecord(Base):
     wait_time = Column(String, nullable=False)           # e.g., "Immediate", "20–40 minutes"
     status = Column(String, default="waiting")           # waiting | in-progress | done
 
+    # Severity rule table version in effect when this record was scored
+    rule_version = Column(String, nullable=True)
+
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+    # Normalized symptoms / risk factors, one row each (see TriageTerm)
+    terms = relationship("TriageTerm", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Dashboard queue filters, newest first
+        Index("ix_triage_records_status_severity_ts", "status", "severity_label", "timestamp"),
+        # Keyset pagination over (timestamp, id)
+        Index("ix_triage_records_ts_id", "timestamp", "id"),
+    )
+
+
+class TriageTerm(Base):
+    """One symptom or risk factor of a triage record, normalized for indexed lookup."""
+    __tablename__ = "triage_terms"
+
+    id = Column(Integer, primary_key=True)
+    record_id = Column(Integer, ForeignKey("triage_records.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)                # symptom | risk_factor
+    term = Column(String, nullable=False)                # lowercased, whitespace-collapsed
+
+    __table_args__ = (
+        # "all chest pain cases": term lookup, then record ids
+        Index("ix_triage_terms_kind_term_record", "kind", "term", "record_id"),
+        Index("ix_triage_terms_record", "record_id"),
+    )
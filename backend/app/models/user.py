@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, Enum
+from sqlalchemy import Column, Integer, String, DateTime, func, Enum, event, inspect
+from sqlalchemy.orm import Session, column_property, object_session
 from app.core.database import Base
 import enum
 
@@ -11,7 +12,34 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
+    # active_history: the old email is loaded on change even if the row was expired, so its tokens can be dropped
+    email = column_property(Column(String, unique=True, index=True, nullable=False), active_history=True)
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.patient)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Keep the get_current_user token cache in sync with the users table.
+# Mapper events fire at flush, before the change is visible to other
+# sessions (or rolled back), so they only note the emails; the cache is
+# invalidated once the transaction has committed.
+_PENDING_KEY = "invalidate_user_emails"
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    session.info.setdefault(_PENDING_KEY, set()).update(e for e in emails if e)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cached_users(session):
+    from app.core.auth_cache import invalidate_user
+
+    for email in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(email)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop(_PENDING_KEY, None)
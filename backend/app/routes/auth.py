@@ -1,8 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.orm import Session
+from app.core.auth_cache import UserSnapshot
 from app.core.deps import get_db, get_current_user
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import (
+    PasswordPoolSaturated,
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.models.user import User, UserRole
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -28,37 +35,67 @@ class MeResponse(BaseModel):
     email: EmailStr
     role: UserRole
 
+# ---------- Helpers ----------
+
+def _find_user(db: Session, email: str):
+    user = db.query(User).filter(User.email == email).first()
+    # Hand the pooled connection back before the (slow) bcrypt step;
+    # loaded attributes stay readable on the detached instance.
+    db.close()
+    return user
+
+def _create_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def _busy(e: PasswordPoolSaturated) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
 # ---------- Routes ----------
+# bcrypt runs on the dedicated password pool and DB calls on the threadpool,
+# so a login storm never blocks the event loop.
 
 @router.post("/register", response_model=MeResponse)
-def register(payload: RegisterRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+async def register(payload: RegisterRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, payload.email)
     if user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    try:
+        hashed_password = await get_password_hash_async(payload.password)
+    except PasswordPoolSaturated as e:
+        raise _busy(e)
+
     new_user = User(
         name=payload.name,
         email=payload.email,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=hashed_password,
         role=payload.role
     )
 
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-
-    return new_user
+    return await run_in_threadpool(_create_user, db, new_user)
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+async def login(payload: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, payload.email)
+
+    try:
+        valid = bool(user) and await verify_password_async(payload.password, user.hashed_password)
+    except PasswordPoolSaturated as e:
+        raise _busy(e)
 
-    if not user or not verify_password(payload.password, user.hashed_password):
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     token = create_access_token(subject=user.email, role=user.role.value)
     return TokenResponse(access_token=token)
 
 @router.get("/me", response_model=MeResponse)
-def me(current_user: User = Depends(get_current_user)):
+def me(current_user: UserSnapshot = Depends(get_current_user)):
     return current_user
@@ -1,10 +1,17 @@
 # backend/app/routes/chat.py
-from typing import List, Literal
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Dict, List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from app.core.admission import admission
 from app.core.deps import get_current_user
-from app.models.user import User
-from app.services.groq_chat_service import chat_with_ai
+from app.core.sse import SSE_HEADERS, format_sse
+from app.core.auth_cache import UserSnapshot
+from app.services.conversation_store import SessionNotFound, get_conversation_store
+from app.services.groq_chat_service import (
+    chat_with_ai, chat_with_session, stream_chat_with_ai, stream_chat_with_session,
+)
+from app.services.llm_client import ClientDisconnected, LLMTimeoutError, LLMUnavailableError, cancel_on_disconnect
 
 router = APIRouter(prefix="/chat", tags=["Conversational AI"])
 
@@ -21,16 +28,182 @@ class ChatResponse(BaseModel):
     user: str
     reply: str
 
-@router.post("/", response_model=ChatResponse)
-async def chat(payload: ChatRequest, current_user: User = Depends(get_current_user)):
+class SessionMessage(BaseModel):
+    content: str = Field(..., min_length=1, max_length=4000)
+
+class SessionCreated(BaseModel):
+    session_id: str
+
+class SessionView(BaseModel):
+    session_id: str
+    turns: List[ChatTurn]
+    state: Dict[str, Any]
+    summary: str
+
+async def _chat_priority(request: Request, user: UserSnapshot) -> str:
+    """Admission class: a conversation that already has a reply goes before a brand-new one."""
+    session_id = request.path_params.get("session_id")
+    if session_id:
+        try:
+            session = get_conversation_store().get(session_id, user.id)
+        except SessionNotFound:
+            return "new_chat"  # the route answers 404
+        return "ongoing" if session.turns else "new_chat"
+    try:
+        history = (await request.json()).get("history") or []
+    except Exception:
+        return "new_chat"
+    return "ongoing" if any(isinstance(t, dict) and t.get("role") == "ai" for t in history) else "new_chat"
+
+def _require_patient_message(payload: ChatRequest):
     has_patient_msg = any(t.role == "patient" and t.content.strip() for t in payload.history)
     if not has_patient_msg:
         raise HTTPException(status_code=400, detail="No patient message found in history.")
 
+@router.post("/", response_model=ChatResponse)
+async def chat(payload: ChatRequest, request: Request, current_user: UserSnapshot = Depends(admission(_chat_priority))):
+    _require_patient_message(payload)
+
     try:
         history_dicts = [t.model_dump() for t in payload.history]
-        reply = await chat_with_ai(history_dicts)
+        reply = await cancel_on_disconnect(request, chat_with_ai(history_dicts))
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"Chat timed out: {e}")
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Chat is temporarily unavailable: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat service error: {e}")
 
     return ChatResponse(user=current_user.email, reply=reply)
+
+@router.post("/stream")
+async def chat_stream(payload: ChatRequest, current_user: UserSnapshot = Depends(admission(_chat_priority))):
+    """
+    Server-Sent Events variant of /chat/.
+    Emits `data: {"delta": ...}` per chunk, then `event: done` with the full reply.
+    Starlette cancels the generator (and the LLM call) if the client disconnects.
+    """
+    _require_patient_message(payload)
+    history_dicts = [t.model_dump() for t in payload.history]
+
+    async def events():
+        reply = ""
+        try:
+            async for delta in stream_chat_with_ai(history_dicts):
+                reply += delta
+                yield format_sse({"delta": delta})
+        except LLMTimeoutError as e:
+            yield format_sse({"detail": f"Chat timed out: {e}"}, event="error")
+            return
+        except LLMUnavailableError as e:
+            yield format_sse({"detail": f"Chat is temporarily unavailable: {e}"}, event="error")
+            return
+        except Exception as e:
+            yield format_sse({"detail": f"Chat service error: {e}"}, event="error")
+            return
+        yield format_sse({"user": current_user.email, "reply": reply}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Server-side sessions: clients send only the new message each turn
+# ---------------------------------------------------------------------------
+
+def _load_session(session_id: str, user: UserSnapshot):
+    try:
+        return get_conversation_store().get(session_id, user.id)
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+
+@router.post("/sessions", response_model=SessionCreated, status_code=201)
+def create_session(current_user: UserSnapshot = Depends(get_current_user)):
+    session = get_conversation_store().create(current_user.id)
+    return SessionCreated(session_id=session.id)
+
+@router.get("/sessions/{session_id}", response_model=SessionView)
+def get_session(session_id: str, current_user: UserSnapshot = Depends(get_current_user)):
+    """Turns and extracted state, e.g. to redraw the conversation after an app restart."""
+    session = _load_session(session_id, current_user)
+    return SessionView(session_id=session.id, turns=session.turns, state=session.state(), summary=session.summary)
+
+@router.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str, current_user: UserSnapshot = Depends(get_current_user)):
+    _load_session(session_id, current_user)
+    get_conversation_store().delete(session_id)
+    return Response(status_code=204)
+
+@router.post("/sessions/{session_id}/messages", response_model=ChatResponse)
+async def session_message(
+    session_id: str,
+    payload: SessionMessage,
+    request: Request,
+    current_user: UserSnapshot = Depends(admission(_chat_priority)),
+):
+    store = get_conversation_store()
+    session = _load_session(session_id, current_user)
+
+    async with store.lock(session_id):
+        kept = session.add_turn("patient", payload.content)
+        try:
+            try:
+                reply = await cancel_on_disconnect(request, chat_with_session(session))
+            except BaseException:
+                if kept:
+                    session.turns.pop()  # no reply: the client can resend the same message
+                raise
+        except ClientDisconnected:
+            raise HTTPException(status_code=499, detail="Client disconnected")
+        except LLMTimeoutError as e:
+            raise HTTPException(status_code=504, detail=f"Chat timed out: {e}")
+        except LLMUnavailableError as e:
+            raise HTTPException(status_code=503, detail=f"Chat is temporarily unavailable: {e}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Chat service error: {e}")
+        session.add_turn("ai", reply)
+        store.save(session)
+
+    return ChatResponse(user=current_user.email, reply=reply)
+
+@router.post("/sessions/{session_id}/stream")
+async def session_stream(
+    session_id: str,
+    payload: SessionMessage,
+    current_user: UserSnapshot = Depends(admission(_chat_priority)),
+):
+    """/chat/stream for a session: SSE deltas, then `event: done`; the reply is stored on completion."""
+    store = get_conversation_store()
+    session = _load_session(session_id, current_user)
+
+    async def events():
+        async with store.lock(session_id):
+            kept = session.add_turn("patient", payload.content)
+            reply = ""
+            try:
+                async for delta in stream_chat_with_session(session):
+                    reply += delta
+                    yield format_sse({"delta": delta})
+            except BaseException as e:
+                if kept:
+                    session.turns.pop()  # no complete reply: the client can resend
+                if not isinstance(e, Exception):
+                    raise  # disconnect / cancellation
+                if isinstance(e, LLMTimeoutError):
+                    detail = f"Chat timed out: {e}"
+                elif isinstance(e, LLMUnavailableError):
+                    detail = f"Chat is temporarily unavailable: {e}"
+                else:
+                    detail = f"Chat service error: {e}"
+                yield format_sse({"detail": detail}, event="error")
+                return
+            session.add_turn("ai", reply)
+            store.save(session)
+        yield format_sse({"user": current_user.email, "reply": reply}, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
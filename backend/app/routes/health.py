@@ -0,0 +1,17 @@
+# backend/app/routes/health.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+@router.get("/live")
+def live():
+    return {"status": "ok"}
+
+@router.get("/ready")
+def ready():
+    # Lazy import — keeps transformers out of the import path of this module
+    from app.services.nlp_processing import is_ready, model_status
+
+    body = {"ready": is_ready(), "ner": model_status()}
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
@@ -1,37 +1,171 @@
 # backend/app/routes/patients.py
 
-from fastapi import APIRouter, Depends
+import asyncio
+from contextlib import suppress
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_current_user, get_db
+from app.core.deps import get_async_db, get_current_user, get_db
+from app.core.sse import SSE_HEADERS, format_sse, sse_comment
+from app.models.user import UserRole
 
 router = APIRouter(prefix="/patients", tags=["Doctor"])
 
+HEARTBEAT_SECONDS = 15
+
+class StatusUpdate(BaseModel):
+    status: Literal["waiting", "in-progress", "done"]
+
+def _require_doctor(user):
+    if getattr(user, "role", None) != UserRole.doctor:
+        raise HTTPException(status_code=403, detail="Doctors only")
+
 @router.get("/")
-def get_all_patients(
-    db: Session = Depends(get_db),
+async def get_all_patients(
+    status: Optional[List[str]] = Query(None, description="waiting | in-progress | done (repeatable)"),
+    severity: Optional[List[str]] = Query(None, description="Critical | High | Medium | Low (repeatable)"),
+    since: Optional[datetime] = Query(None, description="Only records at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only records before this time"),
+    symptom: Optional[List[str]] = Query(None, description="Records with this symptom, e.g. chest pain (repeatable, any of)"),
+    risk_factor: Optional[List[str]] = Query(None, description="Records with this risk factor (repeatable, any of)"),
+    q: Optional[str] = Query(None, max_length=200, description="Free-text search over symptoms and risk factors"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,ticket,severity,status"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)  # ensure only authenticated users (doctor) access
 ):
     # Lazy import — avoids circular imports during app startup
-    from app.models.triage_record import TriageRecord
+    from app.services.patient_queue import InvalidQueueQuery, QueueQuery, fetch_queue_page_async, parse_fields
+    from app.services.queue_snapshot import etag_matches, snapshot_cache
 
-    patients = (
-        db.query(TriageRecord)
-        .order_by(TriageRecord.timestamp.desc())
-        .all()
+    key = (
+        tuple(sorted(status or [])), tuple(sorted(severity or [])),
+        since, until, limit, cursor, fields or "",
+        tuple(sorted(symptom or [])), tuple(sorted(risk_factor or [])), q or "",
     )
 
+    snap = snapshot_cache.get(key)
+    if snap is None:
+        version = snapshot_cache.current_version()
+        try:
+            query = QueueQuery(
+                status=status or [],
+                severity=severity or [],
+                since=since,
+                until=until,
+                symptom=symptom or [],
+                risk_factor=risk_factor or [],
+                text=q,
+                limit=limit,
+                cursor=cursor,
+                fields=parse_fields(fields),
+            )
+            items, next_cursor = await fetch_queue_page_async(db, query)
+        except InvalidQueueQuery as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        snap = snapshot_cache.put(key, version, items, next_cursor)
+
+    # Body stays a plain list for existing clients; the next page is advertised in a header
+    headers = {"ETag": snap.etag, "Cache-Control": "no-cache"}
+    if snap.next_cursor:
+        headers["X-Next-Cursor"] = snap.next_cursor
+
+    if etag_matches(if_none_match, snap.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snap.body, media_type="application/json", headers=headers)
+
+@router.get("/events")
+async def queue_events(
+    since: Optional[int] = Query(None, description="Last sequence number seen; replays what was missed"),
+    last_event_id: Optional[int] = Header(None),
+    current_user = Depends(get_current_user)
+):
+    """
+    Live queue deltas as Server-Sent Events (created / updated / removed).
+    Each event's `id` is its sequence number. A `reset` event means the
+    missed range is gone; the client should re-fetch /patients/.
+    """
+    from app.services.queue_events import get_event_backend
+
+    backend = get_event_backend()
+    resume_from = since if since is not None else last_event_id
+
+    async def stream():
+        # Tell new clients where the stream starts so they can resume later
+        yield format_sse({"seq": backend.latest_seq}, event="hello")
+
+        events = backend.subscribe(resume_from)
+        pending = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                done, _ = await asyncio.wait({pending}, timeout=HEARTBEAT_SECONDS)
+                if not done:
+                    yield sse_comment()
+                    continue
+                event = pending.result()
+                yield format_sse(event.to_dict(), event=event.type, id=event.seq)
+                pending = asyncio.ensure_future(events.__anext__())
+        finally:
+            pending.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await pending
+            await events.aclose()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.get("/next")
+def next_patients(
+    limit: int = Query(10, ge=1, le=100),
+    current_user = Depends(get_current_user)
+):
+    """Waiting patients in the order they should be called in (severity with aging)."""
+    from app.services.triage_queue import get_triage_queue
+
+    _require_doctor(current_user)
+    queue = get_triage_queue()
     return [
         {
-            "id": p.id,
-            "patient_id": p.patient_id,
-            "symptoms": p.symptoms,
-            "severity": p.severity_label,
-            "priority": None,  # legacy key placeholder
-            "status": p.status,
-            "ticket": p.ticket,
-            "wait_time": p.wait_time,
-            "timestamp": p.timestamp
+            "ticket": e.ticket,
+            "severity": e.severity,
+            "patient_id": e.patient_id,
+            "position": i,
+            "wait_time": queue.wait_label(e.ticket),
         }
-        for p in patients
+        for i, e in enumerate(queue.next_up(limit))
     ]
+
+@router.patch("/{record_id}/status")
+def update_patient_status(
+    record_id: int,
+    payload: StatusUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    from app.services.patient_queue import update_status
+
+    _require_doctor(current_user)
+    record = update_status(db, record_id, payload.status)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Triage record not found")
+    return record
+
+@router.delete("/{record_id}", status_code=204)
+def remove_patient(
+    record_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    from app.services.patient_queue import remove_record
+
+    _require_doctor(current_user)
+    if not remove_record(db, record_id):
+        raise HTTPException(status_code=404, detail="Triage record not found")
+    return Response(status_code=204)
@@ -1,34 +1,111 @@
 # backend/app/routes/triage.py
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.core.admission import admission
 from app.core.deps import get_current_user
-from app.services.triage_service import analyze_triage
+from app.services.llm_client import ClientDisconnected, cancel_on_disconnect
+from app.services.triage_service import analyze_triage, triage_in_progress
 
 router = APIRouter(prefix="/triage", tags=["Triage"])
 
 class TriageRequest(BaseModel):
     messages: List[str]
 
+class SessionTriageRequest(BaseModel):
+    message: Optional[str] = Field(None, max_length=4000, description="New patient message, if any")
+
+def _triage_response(result):
+    if not result.get("final"):
+        return {"continue": True}  # not done
+
+    return {
+        "ticket": {
+            "number": result["ticket"],
+            "estimatedWait": result["wait_time"],
+            "position": result.get("position")
+        },
+        "summary": {
+            "symptoms": result.get("symptoms", []),
+            "duration": result.get("duration", ""),
+            "severity": result.get("severity", ""),
+            "risk_factors": result.get("risk_factors", [])
+        }
+    }
+
+async def _triage_priority(request: Request, user) -> str:
+    """Admission class: a triage already under way goes before a patient's first message."""
+    from app.services.conversation_store import SessionNotFound, get_conversation_store
+
+    session_id = request.path_params.get("session_id")
+    if session_id:
+        try:
+            session = get_conversation_store().get(session_id, user.id)
+        except SessionNotFound:
+            return "new_chat"  # the route answers 404
+        return "ongoing" if session.turns else "new_chat"
+    # Not the posted history: a client could pad it to jump the queue
+    return "ongoing" if triage_in_progress(user.id) else "new_chat"
+
 @router.post("/process")
-async def triage_process(req: TriageRequest, user = Depends(get_current_user)):
+async def triage_process(req: TriageRequest, request: Request, user = Depends(admission(_triage_priority))):
     try:
-        result = await analyze_triage(req.messages, user.id)
-
-        if not result.get("final"):
-            return {"continue": True}  # not done
-
-        return {
-            "ticket": {
-                "number": result["ticket"],
-                "estimatedWait": result["wait_time"]
-            },
-            "summary": {
-                "symptoms": result.get("symptoms", []),
-                "duration": result.get("duration", ""),
-                "severity": result.get("severity", ""),
-                "risk_factors": result.get("risk_factors", [])
-            }
-        }
+        result = await cancel_on_disconnect(request, analyze_triage(req.messages, user.id))
+        return _triage_response(result)
+    except ClientDisconnected:
+        # Nobody is listening anymore; status code is only for the access log
+        raise HTTPException(status_code=499, detail="Client disconnected")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Triage failed: {e}")
+
+@router.post("/sessions/{session_id}")
+async def triage_session(
+    session_id: str,
+    req: SessionTriageRequest,
+    request: Request,
+    user = Depends(admission(_triage_priority))
+):
+    """
+    Triage a server-side conversation (see /chat/sessions). Post only the new
+    message; the server keeps the history and what has been extracted so far.
+    """
+    from app.services.conversation_store import SessionNotFound, get_conversation_store
+    from app.services.triage_service import analyze_triage_session
+
+    store = get_conversation_store()
+    try:
+        session = store.get(session_id, user.id)
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    if not req.message and not any(t["role"] == "patient" for t in session.turns):
+        raise HTTPException(status_code=400, detail="No patient message in this session yet.")
+
+    try:
+        async with store.lock(session_id):
+            result = await cancel_on_disconnect(request, analyze_triage_session(session, req.message, user.id))
+            store.save(session)
+        return _triage_response(result)
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Triage failed: {e}")
+
+@router.get("/position")
+async def queue_position(user = Depends(get_current_user)):
+    """Live place in the queue for the caller's open ticket(s)."""
+    from app.services.triage_queue import get_triage_queue
+
+    queue = get_triage_queue()
+    entries = queue.tickets_for_patient(user.id)
+    if not entries:
+        raise HTTPException(status_code=404, detail="No open ticket")
+    return [
+        {
+            "number": e.ticket,
+            "severity": e.severity,
+            "status": e.status,
+            "position": queue.position(e.ticket),
+            "estimatedWait": queue.wait_label(e.ticket) if e.status == "waiting" else None,
+        }
+        for e in entries
+    ]
@@ -3,11 +3,62 @@
 """
 AI-assisted symptom analysis helper.
 Used BEFORE final LLM triage to extract structured medical hints.
+
+analyze_triage runs this first; when the rule table is confident about a
+severity listed in TRIAGE_FAST_PATH_SEVERITIES the triage is finalized
+locally and the LLM is never called (see fast_path_decision).
 """
 
-from typing import Dict, Any
-from app.services.nlp_processing import extract_symptoms
-from app.services.severity_scoring import calculate_severity
+import re
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import span
+from app.services.nlp_processing import extract_symptoms, extract_symptoms_async
+from app.services.severity_rules import get_rules
+
+# Any negation in the conversation sends it to the LLM ("no chest pain")
+NEGATION = re.compile(r"\b(no|not|never|without|denies|denied|don't|doesn't|didn't|isn't|wasn't)\b|(^|\s)(لا|ليس|بدون|ما)(\s|$)")
+
+def has_negation(text: str) -> bool:
+    return bool(NEGATION.search((text or "").lower()))
+
+# Arabic "and" is a waw standing alone or prefixed to the next word ("صداع ودوار"),
+# never one inside a word ("دوار"). Words that begin with a waw of their own
+# (وجع, ورم, وخز, وهن, وذمة) are not split.
+_WAW_WORDS = "جع|رم|خز|هن|ذم"
+_FRAGMENT_SPLIT = re.compile(rf"[,.;!?\n،]| and | with |\sو(?:\s+|(?!{_WAW_WORDS})(?=\S))")
+
+def fragment_symptoms(text: str) -> List[str]:
+    """Model-free extractor: split on punctuation/conjunctions (for machines without the NER model)."""
+    parts = [p.strip() for p in _FRAGMENT_SPLIT.split((text or "").lower()) if p and p.strip()]
+    return parts or ["unknown symptom"]
+
+def analyze_symptoms(symptoms: List[str]) -> Dict[str, Any]:
+    """Rule-table verdict for already-extracted symptoms."""
+    rules = get_rules()
+    with span("calculate_severity"):
+        severity_guess, matched_term, match_score = rules.matcher.best_match(symptoms)
+    return {
+        "symptoms": symptoms,
+        "duration": "",
+        "risk_factors": [],
+        "severity_guess": severity_guess,
+        "matched_term": matched_term,
+        "match_score": match_score,
+        "rule_version": rules.version,
+    }
+
+def _empty() -> Dict[str, Any]:
+    return {
+        "symptoms": [],
+        "duration": "",
+        "risk_factors": [],
+        "severity_guess": "Low",
+        "matched_term": None,
+        "match_score": 0.0,
+        "rule_version": get_rules().version,
+    }
 
 def process_patient_input(user_input: str) -> Dict[str, Any]:
     """
@@ -15,19 +66,37 @@ def process_patient_input(user_input: str) -> Dict[str, Any]:
     This is a helper for your triage flow — not the final medical decision.
     """
     if not user_input or not user_input.strip():
-        return {
-            "symptoms": [],
-            "duration": "",
-            "risk_factors": [],
-            "severity_guess": "Low",
-        }
+        return _empty()
+    return analyze_symptoms(extract_symptoms(user_input))
 
-    symptoms = extract_symptoms(user_input)
-    severity_guess = calculate_severity(symptoms)
+async def process_patient_input_async(user_input: str) -> Dict[str, Any]:
+    """process_patient_input for async callers (NER runs on the batching worker)."""
+    if not user_input or not user_input.strip():
+        return _empty()
+    return analyze_symptoms(await extract_symptoms_async(user_input))
+
+def fast_path_decision(analysis: Dict[str, Any], negated: bool) -> Optional[Dict[str, Any]]:
+    """
+    A final triage result when the heuristic is confident enough to skip the
+    LLM, else None. Confident = the winning vocabulary term appears
+    (near-)verbatim in an extracted symptom (match_score), its severity is in
+    TRIAGE_FAST_PATH_SEVERITIES, and no negation appeared anywhere in the
+    patient's messages (`negated`, see has_negation).
+    """
+    allowed = {s.strip() for s in settings.TRIAGE_FAST_PATH_SEVERITIES.split(",") if s.strip()}
+    if analysis["severity_guess"] not in allowed:
+        return None
+    if analysis["match_score"] < settings.TRIAGE_FAST_PATH_MIN_SCORE:
+        return None
+    if negated:
+        return None
 
     return {
-        "symptoms": symptoms,
-        "duration": "",
-        "risk_factors": [],
-        "severity_guess": severity_guess,
+        "final": True,
+        "severity": analysis["severity_guess"],
+        "symptoms": analysis["symptoms"],
+        "duration": analysis["duration"],
+        "risk_factors": analysis["risk_factors"],
+        "rule_version": analysis["rule_version"],
+        "source": "rules",
     }
@@ -0,0 +1,283 @@
+# backend/app/services/conversation_store.py
+"""
+Conversation Sessions
+---------------------
+Server-side state for an intake conversation, so clients post only the new
+message instead of the whole history every turn.
+
+Each session keeps:
+- the turns (assistant questions de-duplicated as they arrive),
+- the structured state extracted so far (symptoms, duration, risk
+  factors), updated incrementally from each new message and from the
+  triage model's answers,
+- a compact summary of turns that fell out of the recent window.
+
+The prompt sent to the model is: system prompt + one "known so far" note
+(state + summary) + as many recent turns as fit CONVERSATION_TOKEN_BUDGET.
+Its size is bounded no matter how long the conversation runs.
+
+Sessions live in memory (LRU + idle TTL). Another store (Redis, a DB
+table, ...) plugs in by implementing `SessionBackend` and passing it to
+`set_session_backend()` at startup; sessions serialize with to_dict().
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+ROLES = ("patient", "ai")
+MAX_STATE_ITEMS = 30         # per list; extraction noise shouldn't grow the prompt forever
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English; close enough for budgeting
+    return len(text) // 4 + 1
+
+
+@dataclass
+class ConversationSession:
+    id: str
+    user_id: int
+    turns: List[Dict[str, str]] = field(default_factory=list)
+    symptoms: List[str] = field(default_factory=list)
+    duration: str = ""
+    risk_factors: List[str] = field(default_factory=list)
+    negated: bool = False          # a negation was seen ("no chest pain"): no rule-only triage
+    summary: str = ""
+    summarized: int = 0            # turns[:summarized] are folded into `summary`
+    extracted: int = 0             # turns[:extracted] have been through symptom extraction
+    result: Optional[Dict[str, Any]] = None   # final triage, once issued (re-posts don't re-ticket)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationSession":
+        return cls(**data)
+
+    def state(self) -> Dict[str, Any]:
+        return {"symptoms": list(self.symptoms), "duration": self.duration, "risk_factors": list(self.risk_factors)}
+
+    def take_new_patient_text(self) -> str:
+        """Patient messages not yet run through extraction (and mark them as done)."""
+        text = "\n".join(t["content"] for t in self.turns[self.extracted:] if t["role"] == "patient")
+        self.extracted = len(self.turns)
+        return text
+
+    def add_turn(self, role: str, content: str) -> bool:
+        """Append a turn. Repeated assistant questions are dropped. Returns whether it was kept."""
+        content = (content or "").strip()
+        if role not in ROLES:
+            raise ValueError(f"Unknown role: {role}")
+        if not content:
+            return False
+        if role == "ai" and any(t["role"] == "ai" and t["content"] == content for t in self.turns):
+            return False
+        self.turns.append({"role": role, "content": content})
+        self.updated_at = time.time()
+        return True
+
+    def merge_state(self, data: Dict[str, Any]) -> None:
+        """Fold newly extracted symptoms / duration / risk factors into the session."""
+        for key in ("symptoms", "risk_factors"):
+            values = data.get(key) or []
+            if isinstance(values, str):
+                values = [v for v in values.split(",")]
+            current = getattr(self, key)
+            seen = {v.lower() for v in current}
+            for v in values:
+                v = str(v).strip()
+                if len(current) >= MAX_STATE_ITEMS:
+                    break
+                if v and v.lower() not in seen and v.lower() not in ("unknown symptom", "general symptom"):
+                    current.append(v)
+                    seen.add(v.lower())
+        if data.get("duration"):
+            self.duration = str(data["duration"]).strip()
+
+
+class SessionBackend:
+    """Interface for session persistence."""
+
+    def load(self, session_id: str) -> Optional[ConversationSession]:
+        raise NotImplementedError
+
+    def save(self, session: ConversationSession) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+
+class InMemorySessionBackend(SessionBackend):
+    """LRU of sessions, dropped after `ttl` seconds without activity."""
+
+    def __init__(self, max_sessions: int = 10_000, ttl: float = 7200):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[ConversationSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() - session.updated_at > self.ttl:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def save(self, session: ConversationSession) -> None:
+        with self._lock:
+            self._sessions[session.id] = session
+            self._sessions.move_to_end(session.id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SessionNotFound(LookupError):
+    """Unknown or expired session, or one that belongs to someone else."""
+
+
+class ConversationStore:
+    def __init__(self, backend: SessionBackend, token_budget: int = 1500, summary_max_chars: int = 800):
+        self.backend = backend
+        self.token_budget = token_budget
+        self.summary_max_chars = summary_max_chars
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def create(self, user_id: int) -> ConversationSession:
+        session = ConversationSession(id=uuid.uuid4().hex, user_id=user_id)
+        self.backend.save(session)
+        return session
+
+    def get(self, session_id: str, user_id: int) -> ConversationSession:
+        session = self.backend.load(session_id)
+        if session is None or session.user_id != user_id:
+            raise SessionNotFound(session_id)
+        return session
+
+    def save(self, session: ConversationSession) -> None:
+        self.backend.save(session)
+
+    def delete(self, session_id: str) -> None:
+        self.backend.delete(session_id)
+        self._locks.pop(session_id, None)
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """Serializes turns of one session (double-submits, two tabs)."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            if len(self._locks) >= 1024:
+                # Idle locks are cheap to recreate
+                for sid in [s for s, l in self._locks.items() if not l.locked()]:
+                    del self._locks[sid]
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    # -- prompt -------------------------------------------------------------
+
+    def _known_so_far(self, session: ConversationSession, max_chars: int) -> str:
+        """State first, then as much of the summary (newest end) as fits in `max_chars`."""
+        parts = []
+        if session.symptoms:
+            parts.append("Symptoms: " + ", ".join(session.symptoms))
+        if session.duration:
+            parts.append("Duration: " + session.duration)
+        if session.risk_factors:
+            parts.append("Risk factors: " + ", ".join(session.risk_factors))
+        note = ("Known so far —\n" + "\n".join(parts)) if parts else ""
+        if len(note) > max_chars:
+            return note[:max_chars - 1] + "…"
+
+        room = max_chars - len(note) - len("\nEarlier in the conversation: ")
+        if session.summary and room > 40:
+            summary = session.summary if len(session.summary) <= room else "…" + session.summary[-(room - 1):]
+            note = (note or "Known so far —") + "\nEarlier in the conversation: " + summary
+        return note
+
+    def _fold_into_summary(self, session: ConversationSession, upto: int) -> None:
+        for turn in session.turns[session.summarized:upto]:
+            who = "Patient" if turn["role"] == "patient" else "You asked"
+            session.summary = f"{session.summary} {who}: {turn['content']}".strip()
+        if len(session.summary) > self.summary_max_chars:
+            # Oldest details go first; the structured state keeps the clinical facts
+            session.summary = "…" + session.summary[-self.summary_max_chars:]
+        session.summarized = max(session.summarized, upto)
+
+    def build_messages(self, session: ConversationSession, system_prompt: str,
+                       token_budget: Optional[int] = None) -> List[Dict[str, str]]:
+        """OpenAI-style messages: system, known-so-far note, then the most recent turns within budget."""
+        budget = (token_budget or self.token_budget) - estimate_tokens(system_prompt)
+        # The note may take up to half of what's left; recent turns get the rest
+        note_chars = min(self.summary_max_chars + 400, max(budget, 0) * 4 // 2)
+
+        # Walk back from the newest turn until the budget (minus the note) runs out
+        start = len(session.turns)
+        used = estimate_tokens(self._known_so_far(session, note_chars))
+        while start > session.summarized:
+            cost = estimate_tokens(session.turns[start - 1]["content"])
+            if start < len(session.turns) and used + cost > budget:
+                break  # the newest turn is always sent
+            used += cost
+            start -= 1
+
+        if start > session.summarized:
+            self._fold_into_summary(session, start)
+
+        # Folding lengthens the note it was measured at; give up older turns until it fits again
+        note = self._known_so_far(session, note_chars)
+        kept = sum(estimate_tokens(t["content"]) for t in session.turns[start:])
+        while start < len(session.turns) - 1 and estimate_tokens(note) + kept > budget:
+            kept -= estimate_tokens(session.turns[start]["content"])
+            start += 1
+            self._fold_into_summary(session, start)
+            note = self._known_so_far(session, note_chars)
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if note:
+            messages.append({"role": "system", "content": note})
+        for turn in session.turns[start:]:
+            messages.append({"role": "user" if turn["role"] == "patient" else "assistant", "content": turn["content"]})
+        return messages
+
+
+_backend: SessionBackend = InMemorySessionBackend(
+    max_sessions=settings.CONVERSATION_MAX_SESSIONS,
+    ttl=settings.CONVERSATION_SESSION_TTL_SECONDS,
+)
+_store: Optional[ConversationStore] = None
+
+
+def get_conversation_store() -> ConversationStore:
+    global _store
+    if _store is None:
+        _store = ConversationStore(
+            _backend,
+            token_budget=settings.CONVERSATION_TOKEN_BUDGET,
+            summary_max_chars=settings.CONVERSATION_SUMMARY_MAX_CHARS,
+        )
+    return _store
+
+
+def set_session_backend(backend: SessionBackend) -> None:
+    global _backend, _store
+    _backend = backend
+    _store = None
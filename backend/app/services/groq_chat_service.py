@@ -1,12 +1,14 @@
 # backend/app/services/groq_chat_service.py
 
-from typing import List, Dict, Literal
-from groq import Groq
-from anyio import to_thread
+from typing import AsyncIterator, List, Dict, Literal
 from app.core.config import settings
+from app.services.llm_client import get_llm_client
 
-# Latest Groq model
-GROQ_MODEL = "llama-3.3-70b-versatile"
+# Logical model name; a backend in LLM_BACKENDS may map it to its own
+GROQ_MODEL = settings.LLM_MODEL
+
+# Part of the LLM cache key: bump when SYSTEM_PROMPT changes
+CHAT_PROMPT_VERSION = "chat-1"
 
 SYSTEM_PROMPT = """
 You are an emergency triage assistant INSIDE the hospital ER.
@@ -44,26 +46,137 @@ def _convert_history_to_openai_messages(history: List[Dict[str, str]]) -> List[D
 
     return messages
 
-def _chat_sync(history: List[Dict[str, str]]) -> str:
-    if not settings.GROQ_API_KEY:
-        raise RuntimeError("GROQ_API_KEY is not configured.")
+AI_PREAMBLE = "as an ai"
+
+def _clean_reply(reply: str) -> str:
+    reply = reply.strip()
+    if reply.lower().startswith(AI_PREAMBLE):
+        reply = reply.split("\n", 1)[-1].strip()
+    return reply
 
-    client = Groq(api_key=settings.GROQ_API_KEY)
+class _StreamingReplyCleaner:
+    """
+    Incremental version of _clean_reply for streamed tokens.
+    Holds text back only while it could still be an "As an AI..." preamble,
+    and keeps trailing whitespace pending so the joined output matches
+    _clean_reply on the full text exactly.
+    """
+
+    def __init__(self):
+        self._state = "undecided"  # undecided | skipping | trimming | passing
+        self._buffer = ""
+        self._pending_ws = ""
+
+    def feed(self, delta: str) -> str:
+        if self._state == "passing":
+            return self._emit(delta)
+
+        if self._state == "trimming":
+            return self._trim(delta)
+
+        self._buffer += delta
+
+        if self._state == "undecided":
+            head = self._buffer.lstrip()
+            if head[:len(AI_PREAMBLE)].lower() != AI_PREAMBLE[:len(head)]:
+                return self._start_passing(head)
+            if len(head) < len(AI_PREAMBLE):
+                return ""
+            self._state = "skipping"
+            self._buffer = head
+
+        # skipping: drop everything up to the first newline
+        if "\n" not in self._buffer:
+            return ""
+        rest = self._buffer.split("\n", 1)[1]
+        self._buffer = ""
+        self._state = "trimming"
+        return self._trim(rest)
+
+    def flush(self) -> str:
+        # Never decided, or a preamble with no newline: _clean_reply keeps the whole text
+        if self._state in ("undecided", "skipping"):
+            self._state = "passing"
+            return self._buffer.strip()
+        return ""
+
+    def _trim(self, text: str) -> str:
+        text = text.lstrip()
+        return self._start_passing(text) if text else ""
+
+    def _start_passing(self, text: str) -> str:
+        self._state = "passing"
+        self._buffer = ""
+        return self._emit(text)
+
+    def _emit(self, text: str) -> str:
+        text = self._pending_ws + text
+        stripped = text.rstrip()
+        self._pending_ws = text[len(stripped):]
+        return stripped
+
+async def chat_with_ai(history: List[Dict[str, str]]) -> str:
     messages = _convert_history_to_openai_messages(history)
 
-    response = client.chat.completions.create(
+    reply = await get_llm_client().complete(
         model=GROQ_MODEL,
         messages=messages,
         temperature=0.3,
         max_tokens=200,
+        prompt_version=CHAT_PROMPT_VERSION,  # cached only with LLM_CACHE_MODE=all
     )
 
-    reply = (response.choices[0].message.content or "").strip()
+    return _clean_reply(reply)
 
-    if reply.lower().startswith("as an ai"):
-        reply = reply.split("\n", 1)[-1].strip()
+async def stream_chat_with_ai(history: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """Same reply as chat_with_ai, yielded in pieces as the model generates it."""
+    messages = _convert_history_to_openai_messages(history)
+    cleaner = _StreamingReplyCleaner()
 
-    return reply
+    async for delta in get_llm_client().stream(
+        model=GROQ_MODEL,
+        messages=messages,
+        temperature=0.3,
+        max_tokens=200,
+    ):
+        text = cleaner.feed(delta)
+        if text:
+            yield text
 
-async def chat_with_ai(history: List[Dict[str, str]]) -> str:
-    return await to_thread.run_sync(_chat_sync, history)
+    tail = cleaner.flush()
+    if tail:
+        yield tail
+
+async def chat_with_session(session) -> str:
+    """chat_with_ai for a server-side conversation: compact state + recent turns within the token budget."""
+    from app.services.conversation_store import get_conversation_store
+
+    messages = get_conversation_store().build_messages(session, SYSTEM_PROMPT)
+    reply = await get_llm_client().complete(
+        model=GROQ_MODEL,
+        messages=messages,
+        temperature=0.3,
+        max_tokens=200,
+        prompt_version=CHAT_PROMPT_VERSION,
+    )
+    return _clean_reply(reply)
+
+async def stream_chat_with_session(session) -> AsyncIterator[str]:
+    from app.services.conversation_store import get_conversation_store
+
+    messages = get_conversation_store().build_messages(session, SYSTEM_PROMPT)
+    cleaner = _StreamingReplyCleaner()
+
+    async for delta in get_llm_client().stream(
+        model=GROQ_MODEL,
+        messages=messages,
+        temperature=0.3,
+        max_tokens=200,
+    ):
+        text = cleaner.feed(delta)
+        if text:
+            yield text
+
+    tail = cleaner.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,241 @@
+# backend/app/services/llm_cache.py
+"""
+LLM Response Cache
+------------------
+Many intake conversations are the same few words ("chest pain",
+"Chest pain."). Completions are cached under a key built from the
+canonicalized message list (Unicode-normalized, case-folded, whitespace
+collapsed, outer punctuation stripped) plus model, prompt version,
+temperature and any other request parameters.
+
+- In memory: LRU with a TTL (LLM_CACHE_SIZE / LLM_CACHE_TTL_SECONDS).
+- On disk (optional, LLM_CACHE_PATH): a small SQLite file consulted on
+  memory misses, so restarts keep a warm cache.
+- Concurrent identical misses share one upstream call.
+- Only calls that pass a prompt version are cacheable. LLM_CACHE_MODE:
+    deterministic : temperature <= LLM_CACHE_MAX_TEMPERATURE only
+    all           : any versioned call
+    off
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+CACHE_MODES = ("off", "deterministic", "all")
+
+LLM_CACHE_REQUESTS = metrics.counter("llm_cache_requests_total", "LLM cache lookups by result (hit | miss | bypass)")
+LLM_CACHE_SAVED = metrics.counter("llm_cache_seconds_saved_total", "Upstream LLM latency avoided by cache hits")
+LLM_CACHE_HIT_RATIO = metrics.gauge(
+    "llm_cache_hit_ratio",
+    "Cache hits / cacheable lookups since start",
+    fn=lambda: _hit_ratio(),
+)
+
+_PUNCT_EDGES = ".,;:!?¡¿…-–—'\"`()[]{}«»“”‘’،؟"
+
+
+def _hit_ratio() -> float:
+    hits, misses = LLM_CACHE_REQUESTS.value(result="hit"), LLM_CACHE_REQUESTS.value(result="miss")
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def canonicalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return " ".join(text.split()).strip(_PUNCT_EDGES + " ")
+
+
+def canonicalize_messages(messages: List[Dict[str, str]]) -> List[Tuple[str, str]]:
+    return [(m.get("role", ""), canonicalize_text(m.get("content", ""))) for m in messages]
+
+
+def cache_key(messages: List[Dict[str, str]], *, model: str, prompt_version: str,
+              temperature: float, params: Optional[Dict[str, Any]] = None) -> str:
+    payload = {
+        "messages": canonicalize_messages(messages),
+        "model": model,
+        "prompt_version": prompt_version,
+        "temperature": round(float(temperature), 3),
+        "params": params or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+
+
+@dataclass
+class CachedReply:
+    text: str
+    latency: float      # what the upstream call cost, credited on every hit
+    expires_at: float
+
+
+class _DiskStore:
+    """SQLite-backed second level. Small synchronous calls; run them off the event loop."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, text TEXT NOT NULL, latency REAL NOT NULL,"
+                " expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[CachedReply]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, latency, expires_at FROM llm_cache WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (now, key))
+        return CachedReply(*row)
+
+    def put(self, key: str, reply: CachedReply) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                (key, reply.text, reply.latency, reply.expires_at, time.time()),
+            )
+            # Least recently used rows beyond the cap
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl: float = 3600,
+        mode: str = "deterministic",
+        max_temperature: float = 0.2,
+        path: str = "",
+        disk_max_entries: int = 50_000,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM_CACHE_MODE: {mode}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.mode = mode
+        self.max_temperature = max_temperature
+        self._entries: "OrderedDict[str, CachedReply]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._disk = _DiskStore(path, disk_max_entries) if path else None
+
+    def cacheable(self, prompt_version: Optional[str], temperature: float) -> bool:
+        if self.mode == "off" or not prompt_version:
+            return False
+        return self.mode == "all" or temperature <= self.max_temperature
+
+    def _get_memory(self, key: str) -> Optional[CachedReply]:
+        with self._lock:
+            reply = self._entries.get(key)
+            if reply is None:
+                return None
+            if reply.expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return reply
+
+    def _put_memory(self, key: str, reply: CachedReply) -> None:
+        with self._lock:
+            self._entries[key] = reply
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[CachedReply]:
+        reply = self._get_memory(key)
+        if reply is None and self._disk is not None:
+            reply = await asyncio.to_thread(self._disk.get, key)
+            if reply is not None:
+                self._put_memory(key, reply)
+        return reply
+
+    async def put(self, key: str, text: str, latency: float) -> None:
+        reply = CachedReply(text=text, latency=latency, expires_at=time.time() + self.ttl)
+        self._put_memory(key, reply)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, reply)
+
+    async def get_or_call(self, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        """Cached text for `key`, or run `call` once (shared by concurrent callers) and cache it."""
+        reply = await self.get(key)
+        if reply is not None:
+            LLM_CACHE_REQUESTS.inc(result="hit")
+            LLM_CACHE_SAVED.inc(reply.latency)
+            return reply.text
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            shared = await asyncio.shield(pending)
+            if shared is not None:
+                LLM_CACHE_REQUESTS.inc(result="hit")
+                LLM_CACHE_SAVED.inc(shared[1])
+                return shared[0]
+            # The call we waited on failed or was cancelled: make our own, uncached
+            LLM_CACHE_REQUESTS.inc(result="miss")
+            return await call()
+
+        LLM_CACHE_REQUESTS.inc(result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            started = time.perf_counter()
+            text = await call()
+            latency = time.perf_counter() - started
+            future.set_result((text, latency))
+            await self.put(key, text, latency)
+            return text
+        finally:
+            if not future.done():
+                future.set_result(None)  # don't hand our timeout/cancellation to the waiters
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+
+def build_llm_cache() -> LLMResponseCache:
+    return LLMResponseCache(
+        max_entries=settings.LLM_CACHE_SIZE,
+        ttl=settings.LLM_CACHE_TTL_SECONDS,
+        mode=settings.LLM_CACHE_MODE,
+        max_temperature=settings.LLM_CACHE_MAX_TEMPERATURE,
+        path=settings.LLM_CACHE_PATH,
+    )
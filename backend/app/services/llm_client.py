@@ -0,0 +1,610 @@
+# backend/app/services/llm_client.py
+"""
+LLM Client
+----------
+Shared non-blocking client for OpenAI-compatible chat APIs, routed across
+one or more backends (Groq, a local model server, another provider).
+
+- Backends come from LLM_BACKENDS (a JSON list, see build_backends());
+  without it there is a single Groq backend from GROQ_API_KEY /
+  GROQ_BASE_URL. Each backend has its own pooled keep-alive httpx client,
+  concurrency semaphore, model name and circuit breaker.
+- Every call has one deadline (LLM_TIMEOUT_SECONDS by default) covering
+  queueing, failover and hedging.
+- complete(): a failed attempt fails over to the next backend at once. If
+  the attempt in flight hasn't answered after LLM_HEDGE_AFTER_MS, one
+  hedge request goes to the next healthy backend (the same one when it is
+  the only one); the first answer wins and the other is cancelled.
+- A backend whose recent error rate reaches LLM_BREAKER_ERROR_RATE is
+  skipped for LLM_BREAKER_COOLDOWN_SECONDS, then let through for a single
+  probe call.
+- When no backend answers, LLMUnavailableError is raised (LLMTimeoutError,
+  a subclass, when the deadline ran out); triage then falls back to the
+  rule-based scorer.
+- stream() fails over only until the first delta has been yielded.
+- complete() calls that pass a `prompt_version` go through the response
+  cache (see llm_cache); streams are never cached.
+- complete(on_delta=...) streams the completion under the hood so the
+  caller can inspect it as it arrives and cut it short; the full text is
+  still what gets returned and cached.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+import httpx
+from fastapi import Request
+from groq import AsyncGroq
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.llm_cache import LLM_CACHE_REQUESTS, LLMResponseCache, build_llm_cache, cache_key
+
+T = TypeVar("T")
+
+BACKEND_KINDS = ("groq", "openai")
+
+LLM_IN_FLIGHT = metrics.gauge("llm_in_flight", "LLM completions currently running, by backend")
+LLM_WAITING = metrics.gauge("llm_waiting", "Callers queued for an LLM concurrency slot, by backend")
+LLM_QUEUE_WAIT = metrics.histogram("llm_queue_wait_seconds", "Time spent waiting for an LLM concurrency slot")
+LLM_LATENCY = metrics.histogram("llm_request_seconds", "LLM attempt latency by backend, excluding queue wait")
+LLM_REQUESTS = metrics.counter("llm_requests_total", "LLM attempts by backend and outcome")
+LLM_HEDGES = metrics.counter("llm_hedges_total", "Hedge requests by backend and result (sent / won)")
+LLM_FAILOVERS = metrics.counter("llm_failovers_total", "Calls moved to another backend after an error")
+LLM_UNAVAILABLE = metrics.counter("llm_unavailable_total", "Calls no backend could answer, by reason")
+LLM_BREAKER_OPENED = metrics.counter("llm_breaker_opened_total", "Circuit breaker trips by backend")
+
+
+class LLMUnavailableError(Exception):
+    """No backend produced an answer (all failed, or every circuit is open)."""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """The LLM did not answer within the call deadline."""
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away while we were waiting on the LLM."""
+
+
+class _StoppedEarly(Exception):
+    """on_delta asked to stop; carries the text received so far (never cached)."""
+
+    def __init__(self, text: str):
+        super().__init__("stream stopped by caller")
+        self.text = text
+
+
+class CircuitBreaker:
+    """
+    closed -> open once at least `min_calls` of the last `window` attempts
+    are recorded and the error share reaches `error_rate`; open -> half-open
+    after `cooldown` seconds, where a single probe decides closed or open.
+    """
+
+    def __init__(self, window: int = 20, error_rate: float = 0.5, min_calls: int = 5,
+                 cooldown: float = 30.0, name: str = "", clock: Callable[[], float] = time.monotonic):
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.name = name
+        self.state = "closed"
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+
+    def available(self) -> bool:
+        """Whether allow() could let a call through now (no state change)."""
+        return self.state != "open" or self._clock() - self._opened_at >= self.cooldown
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if self._clock() - self._opened_at < self.cooldown:
+                return False
+            self.state = "half-open"
+            self._probing = False
+        if self.state == "half-open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def record(self, ok: bool) -> None:
+        if self.state == "half-open":
+            self._probing = False
+            if ok:
+                self.state = "closed"
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        if self.state == "open":
+            return  # a straggler from before the trip
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+            self._open()
+
+    def release(self) -> None:
+        """The attempt ended without a verdict (cancelled hedge loser, client gone)."""
+        if self.state == "half-open":
+            self._probing = False
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        LLM_BREAKER_OPENED.inc(backend=self.name)
+
+
+class LLMBackend:
+    """
+    One OpenAI-compatible endpoint. kind="groq" goes through the Groq SDK
+    (base_url without /openai/v1); kind="openai" posts to
+    {base_url}/chat/completions directly, for local model servers (vLLM,
+    llama.cpp, Ollama) and other providers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        api_key: str = "",
+        base_url: Optional[str] = None,
+        kind: str = "groq",
+        model: Optional[str] = None,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        max_keepalive: int = 16,
+        keepalive_expiry: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        if kind not in BACKEND_KINDS:
+            raise ValueError(f"LLM backend {name!r}: kind must be one of {', '.join(BACKEND_KINDS)}")
+        if kind == "openai" and not base_url:
+            raise ValueError(f"LLM backend {name!r}: kind 'openai' needs a base_url")
+        self.name = name
+        self.kind = kind
+        self.model = model
+        self.api_key = api_key
+        self.base_url = (base_url or "").rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker(name=name)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=None,  # the router's deadline is the single source of truth
+        )
+        self._client = AsyncGroq(
+            api_key=api_key or "none",
+            base_url=base_url or None,
+            max_retries=0,
+            http_client=self._http,
+        ) if kind == "groq" else None
+
+    def pool_connections(self) -> int:
+        """Open connections in the httpx pool (best effort, httpcore internals)."""
+        pool = getattr(getattr(self._http, "_transport", None), "_pool", None)
+        return len(getattr(pool, "connections", ()))
+
+    def _params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(params, model=self.model) if self.model else params
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Hold one concurrency slot, recording queue wait and call metrics."""
+        queued = time.perf_counter()
+        LLM_WAITING.inc(backend=self.name)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            LLM_WAITING.dec(backend=self.name)
+        started = time.perf_counter()
+        LLM_QUEUE_WAIT.observe(started - queued, backend=self.name)
+        LLM_IN_FLIGHT.inc(backend=self.name)
+
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        except LLMTimeoutError:
+            outcome = "timeout"
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        finally:
+            self._semaphore.release()
+            LLM_IN_FLIGHT.dec(backend=self.name)
+            LLM_LATENCY.observe(time.perf_counter() - started, backend=self.name)
+            LLM_REQUESTS.inc(backend=self.name, outcome=outcome)
+
+    async def complete(self, params: Dict[str, Any], timeout: float) -> str:
+        params = self._params(params)
+        async with self._slot():
+            try:
+                if self._client is not None:
+                    res = await asyncio.wait_for(self._client.chat.completions.create(**params), timeout=timeout)
+                    return (res.choices[0].message.content or "").strip()
+                res = await asyncio.wait_for(self._post(params), timeout=timeout)
+                return (res["choices"][0]["message"].get("content") or "").strip()
+            except asyncio.TimeoutError:
+                raise LLMTimeoutError(f"{self.name}: no answer within {timeout:.1f}s")
+
+    async def _post(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        res = await self._http.post(f"{self.base_url}/chat/completions", json=params, headers=self._headers())
+        res.raise_for_status()
+        return res.json()
+
+    async def stream(self, params: Dict[str, Any], timeout: float) -> AsyncIterator[str]:
+        """Yield completion text deltas as they arrive. The deadline covers the whole stream."""
+        params = dict(self._params(params), stream=True)
+        async with self._slot():
+            deadline = time.monotonic() + timeout
+            try:
+                if self._client is not None:
+                    stream = await asyncio.wait_for(self._client.chat.completions.create(**params), timeout=timeout)
+                    try:
+                        chunks = stream.__aiter__()
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=deadline - time.monotonic())
+                            except StopAsyncIteration:
+                                break
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                yield chunk.choices[0].delta.content
+                    finally:
+                        await stream.close()
+                    return
+
+                request = self._http.build_request(
+                    "POST", f"{self.base_url}/chat/completions", json=params, headers=self._headers()
+                )
+                res = await asyncio.wait_for(self._http.send(request, stream=True), timeout=timeout)
+                try:
+                    res.raise_for_status()
+                    lines = res.aiter_lines().__aiter__()
+                    while True:
+                        try:
+                            line = await asyncio.wait_for(lines.__anext__(), timeout=deadline - time.monotonic())
+                        except StopAsyncIteration:
+                            break
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        choices = json.loads(data).get("choices") or [{}]
+                        content = (choices[0].get("delta") or {}).get("content")
+                        if content:
+                            yield content
+                finally:
+                    await res.aclose()
+            except asyncio.TimeoutError:
+                raise LLMTimeoutError(f"{self.name}: stream exceeded {timeout:.1f}s")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        await self._http.aclose()
+
+
+class LLMClient:
+    """Routes calls over `backends` (priority order), with the shared response cache."""
+
+    def __init__(
+        self,
+        backends: List[LLMBackend],
+        timeout: float = 30.0,
+        hedge_after: Optional[float] = None,
+        cache: Optional[LLMResponseCache] = None,
+    ):
+        if not backends:
+            raise ValueError("LLMClient needs at least one backend")
+        self.backends = backends
+        self.timeout = timeout
+        self.hedge_after = hedge_after or None
+        self.cache = cache
+
+    def pool_connections(self) -> int:
+        return sum(b.pool_connections() for b in self.backends)
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        prompt_version: Optional[str] = None,
+        on_delta: Optional[Callable[[str], bool]] = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Run one chat completion and return the message text.
+        `prompt_version` opts the call into the response cache; bump it
+        whenever the prompt or the way the reply is used changes.
+        `on_delta` receives each streamed piece of an uncached call and
+        returns True to stop; the partial text is then returned uncached.
+        """
+        params: Dict[str, Any] = {"model": model, "messages": messages, "temperature": temperature, **kwargs}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        timeout = timeout or self.timeout
+
+        if on_delta is None:
+            call = lambda: self._route(params, timeout)
+        else:
+            call = lambda: self._complete_streamed(params, timeout, on_delta)
+
+        try:
+            if self.cache is not None and self.cache.cacheable(prompt_version, temperature):
+                extra = {k: v for k, v in params.items() if k not in ("model", "messages", "temperature")}
+                key = cache_key(messages, model=model, prompt_version=prompt_version, temperature=temperature, params=extra)
+                return await self.cache.get_or_call(key, call)
+            if self.cache is not None:
+                LLM_CACHE_REQUESTS.inc(result="bypass")
+            return await call()
+        except _StoppedEarly as stop:
+            return stop.text
+
+    async def _route(self, params: Dict[str, Any], timeout: float) -> str:
+        """Failover plus at most one hedge across the backends; the first answer wins."""
+        deadline = time.monotonic() + timeout
+        untried = list(self.backends)
+        running: Dict["asyncio.Task[str]", LLMBackend] = {}
+        hedges = set()
+        errors: List[str] = []
+        hedged = False
+        launched_at = 0.0
+
+        def launch(hedge: bool) -> bool:
+            nonlocal launched_at
+            backend = None
+            while untried and backend is None:
+                candidate = untried.pop(0)
+                if candidate.breaker.allow():
+                    backend = candidate
+            if backend is None and hedge and len(self.backends) == 1 and self.backends[0].breaker.allow():
+                backend = self.backends[0]  # a lone backend hedges against itself
+            if backend is None:
+                return False
+            task = asyncio.ensure_future(backend.complete(params, max(0.001, deadline - time.monotonic())))
+            running[task] = backend
+            if hedge:
+                hedges.add(task)
+                LLM_HEDGES.inc(backend=backend.name, result="sent")
+            elif errors:
+                LLM_FAILOVERS.inc()
+            launched_at = time.monotonic()
+            return True
+
+        if not launch(hedge=False):
+            LLM_UNAVAILABLE.inc(reason="circuit_open")
+            raise LLMUnavailableError("every LLM backend is unavailable (circuit open)")
+
+        timed_out = False
+        try:
+            while running:
+                now = time.monotonic()
+                if now >= deadline:
+                    timed_out = True
+                    LLM_UNAVAILABLE.inc(reason="deadline")
+                    raise LLMTimeoutError(f"LLM call exceeded {timeout:.0f}s")
+
+                wait = deadline - now
+                if self.hedge_after and not hedged:
+                    wait = min(wait, max(0.0, launched_at + self.hedge_after - now))
+                done, _ = await asyncio.wait(running, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if self.hedge_after and not hedged and time.monotonic() >= launched_at + self.hedge_after:
+                        hedged = True
+                        launch(hedge=True)
+                    continue
+
+                for task in done:
+                    backend = running.pop(task)
+                    try:
+                        text = task.result()
+                    except Exception as e:
+                        backend.breaker.record(False)
+                        errors.append(f"{backend.name}: {e.__class__.__name__}: {e}")
+                        continue
+                    backend.breaker.record(True)
+                    if task in hedges:
+                        LLM_HEDGES.inc(backend=backend.name, result="won")
+                    return text
+
+                # Everything in flight failed: next backend, same deadline
+                if not running and not launch(hedge=False):
+                    LLM_UNAVAILABLE.inc(reason="errors")
+                    raise LLMUnavailableError("all LLM backends failed: " + "; ".join(errors))
+            raise LLMUnavailableError("all LLM backends failed: " + "; ".join(errors))
+        finally:
+            for task, backend in running.items():
+                task.cancel()
+                if timed_out:
+                    backend.breaker.record(False)
+                else:
+                    backend.breaker.release()
+
+    async def _complete_streamed(self, params: Dict[str, Any], timeout: float,
+                                 on_delta: Callable[[str], bool]) -> str:
+        parts: List[str] = []
+        async with aclosing(self.stream(**params, timeout=timeout)) as deltas:
+            async for delta in deltas:
+                parts.append(delta)
+                if on_delta(delta):
+                    raise _StoppedEarly("".join(parts).strip())
+        return "".join(parts).strip()
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Yield completion text deltas as they arrive. The deadline covers the
+        whole stream; a backend that fails before its first delta is skipped.
+        """
+        params: Dict[str, Any] = {"model": model, "messages": messages, "temperature": temperature, **kwargs}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+
+        errors: List[str] = []
+        for backend in self.backends:
+            if not backend.breaker.allow():
+                continue
+            if errors:
+                LLM_FAILOVERS.inc()
+            started = False
+            try:
+                async for delta in backend.stream(params, max(0.001, deadline - time.monotonic())):
+                    started = True
+                    yield delta
+            except (asyncio.CancelledError, GeneratorExit):
+                if started:
+                    backend.breaker.record(True)
+                else:
+                    backend.breaker.release()
+                raise
+            except Exception as e:
+                backend.breaker.record(False)
+                if started:
+                    raise  # part of this reply already went out
+                errors.append(f"{backend.name}: {e.__class__.__name__}: {e}")
+                if time.monotonic() >= deadline:
+                    LLM_UNAVAILABLE.inc(reason="deadline")
+                    raise LLMTimeoutError(f"LLM stream exceeded {timeout:.0f}s")
+                continue
+            backend.breaker.record(True)
+            return
+
+        LLM_UNAVAILABLE.inc(reason="errors" if errors else "circuit_open")
+        raise LLMUnavailableError("all LLM backends failed: " + ("; ".join(errors) or "circuits open"))
+
+    async def aclose(self) -> None:
+        if self.cache is not None:
+            self.cache.close()
+        for backend in self.backends:
+            await backend.aclose()
+
+
+_client: Optional[LLMClient] = None
+
+metrics.gauge(
+    "llm_pool_connections",
+    "Open HTTP connections across the LLM backend pools",
+    fn=lambda: _client.pool_connections() if _client is not None else 0,
+)
+
+
+def build_backends() -> List[LLMBackend]:
+    """
+    LLM_BACKENDS is a JSON list in priority order, e.g.
+        [{"name": "groq", "api_key_env": "GROQ_API_KEY"},
+         {"name": "local", "kind": "openai", "base_url": "http://127.0.0.1:8080/v1", "model": "llama3.1:8b"}]
+    Keys: name, kind (groq | openai, default groq), base_url, api_key or
+    api_key_env, model (overrides LLM_MODEL), max_concurrency. Without it:
+    one Groq backend from GROQ_API_KEY / GROQ_BASE_URL, if a key is set.
+    """
+    if settings.LLM_BACKENDS.strip():
+        configs = json.loads(settings.LLM_BACKENDS)
+    elif settings.GROQ_API_KEY:
+        configs = [{"name": "groq", "api_key": settings.GROQ_API_KEY, "base_url": settings.GROQ_BASE_URL}]
+    else:
+        configs = []
+
+    backends = []
+    for i, c in enumerate(configs):
+        name = c.get("name") or f"backend{i}"
+        backends.append(LLMBackend(
+            name=name,
+            kind=c.get("kind", "groq"),
+            api_key=c.get("api_key") or os.getenv(c.get("api_key_env", ""), ""),
+            base_url=c.get("base_url") or None,
+            model=c.get("model"),
+            max_concurrency=int(c.get("max_concurrency", settings.LLM_MAX_CONCURRENCY)),
+            max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive=settings.LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+            breaker=CircuitBreaker(
+                window=settings.LLM_BREAKER_WINDOW,
+                error_rate=settings.LLM_BREAKER_ERROR_RATE,
+                min_calls=settings.LLM_BREAKER_MIN_CALLS,
+                cooldown=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+                name=name,
+            ),
+        ))
+    return backends
+
+
+def get_llm_client() -> LLMClient:
+    global _client
+    if _client is not None:
+        return _client
+
+    backends = build_backends()
+    if not backends:
+        raise RuntimeError("No LLM backend configured (set GROQ_API_KEY or LLM_BACKENDS).")
+
+    _client = LLMClient(
+        backends,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        hedge_after=settings.LLM_HEDGE_AFTER_MS / 1000.0,
+        cache=build_llm_cache(),
+    )
+    return _client
+
+
+def init_llm_client() -> None:
+    """Open the shared client at startup (no-op without a configured backend)."""
+    if settings.GROQ_API_KEY or settings.LLM_BACKENDS.strip():
+        get_llm_client()
+
+
+async def close_llm_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T], poll_interval: float = 0.5) -> T:
+    """
+    Await `awaitable`, cancelling it if the HTTP client disconnects first.
+    Frees the concurrency slot as soon as the patient closes the app.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,137 @@
+# app/services/ner_batcher.py
+"""
+NER Micro-Batcher
+-----------------
+Coalesces concurrent extract_symptoms requests into batched forward passes.
+
+Callers await `submit(text)`. A single worker thread takes the first queued
+request, keeps collecting until the batch is full (NER_BATCH_SIZE) or the
+latency budget (NER_BATCH_MAX_WAIT_MS) is spent, runs the whole batch
+through the pipeline at once, then resolves each caller's future on its own
+event loop. The model therefore never runs on the event loop, and never on
+more than one thread at a time.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_Request = Tuple[str, asyncio.AbstractEventLoop, asyncio.Future]
+_STOP = object()
+
+
+class NERBatcher:
+    def __init__(self, max_batch_size: int = 16, max_wait_ms: float = 10.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches_run = 0
+        self.texts_processed = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ner-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    async def submit(self, text: str) -> List[str]:
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((text, loop, future))
+        return await future
+
+    def _collect(self, first: _Request) -> Tuple[List[_Request], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        from app.services.nlp_processing import extract_symptoms_batch
+
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+
+            # Drop requests whose caller already gave up
+            batch = [r for r in batch if not r[2].done()]
+            if not batch:
+                continue
+
+            try:
+                results = extract_symptoms_batch([text for text, _, _ in batch], batch_size=len(batch))
+            except Exception as e:
+                logger.exception("NER batch of %d failed", len(batch))
+                for _, loop, future in batch:
+                    _deliver(loop, future, None, e)
+                continue
+
+            self.batches_run += 1
+            self.texts_processed += len(batch)
+            for (_, loop, future), result in zip(batch, results):
+                _deliver(loop, future, result, None)
+
+
+def _deliver(loop: asyncio.AbstractEventLoop, future: asyncio.Future, result, error: Optional[BaseException]) -> None:
+    """Hand a result back to the caller's loop; skipped if it gave up or its loop is gone."""
+    if future.done():
+        return
+    try:
+        loop.call_soon_threadsafe(_resolve, future, result, error)
+    except RuntimeError:
+        pass  # loop closed (shutdown, or a finished asyncio.run())
+
+
+def _resolve(future: asyncio.Future, result, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+_batcher: Optional[NERBatcher] = None
+
+
+def get_ner_batcher() -> NERBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = NERBatcher(
+            max_batch_size=settings.NER_BATCH_SIZE,
+            max_wait_ms=settings.NER_BATCH_MAX_WAIT_MS,
+        )
+    return _batcher
+
+
+def stop_ner_batcher() -> None:
+    if _batcher is not None:
+        _batcher.stop(timeout=5)
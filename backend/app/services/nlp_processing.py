@@ -3,38 +3,148 @@
 NLP Processing Service
 ----------------------
 Extracts medical symptoms/entities from user input.
-Uses a clinical NER model if available, otherwise falls back to general NER.
-Lazy-loads the model to avoid slow startup.
+Uses the clinical NER model (NER_MODEL, or a local copy in NER_MODEL_DIR).
+If it cannot be loaded we fall back to general NER — loudly: the fallback
+is logged and reported by the readiness probe.
+
+The model is preloaded and warmed at startup (NER_PRELOAD); otherwise it
+is lazy-loaded on first use. NER_BACKEND=onnx runs an exported ONNX graph
+through onnxruntime (optionally int8-quantized with NER_QUANTIZE) instead
+of PyTorch.
+
+`extract_symptoms_batch` runs many texts through one forward pass;
+async callers should use `extract_symptoms_async`, which micro-batches
+concurrent requests on a dedicated worker (see ner_batcher).
 """
 
-from typing import List
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
 from transformers import pipeline
 
+from app.core.config import settings
+from app.core.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = "chest pain and shortness of breath since this morning"
+
 _ner_model = None  # Lazy-loaded model cache
+_load_lock = threading.Lock()
+_status: Dict[str, Any] = {"state": "cold"}  # cold | loading | loaded | ready | failed
+
+def _onnx_pipeline(model_ref: str, quantize: bool, local_only: bool):
+    """
+    Token-classification pipeline on onnxruntime.
+    `model_ref` may already hold an export (model.onnx / model_quantized.onnx);
+    otherwise the PyTorch checkpoint is exported (and quantized) on the fly.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForTokenClassification
+    except ImportError:
+        raise RuntimeError("NER_BACKEND=onnx needs `pip install optimum[onnxruntime]`")
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_ref, local_files_only=local_only)
+    quantized_file = "model_quantized.onnx"
+    is_dir = os.path.isdir(model_ref)
+
+    if quantize and is_dir and os.path.exists(os.path.join(model_ref, quantized_file)):
+        model = ORTModelForTokenClassification.from_pretrained(model_ref, file_name=quantized_file)
+    elif is_dir and os.path.exists(os.path.join(model_ref, "model.onnx")) and not quantize:
+        model = ORTModelForTokenClassification.from_pretrained(model_ref)
+    else:
+        model = ORTModelForTokenClassification.from_pretrained(model_ref, export=True, local_files_only=local_only)
+        if quantize:
+            model = _quantize(model)
+
+    return pipeline("ner", model=model, tokenizer=tokenizer, grouped_entities=True)
+
+def _quantize(model):
+    """Dynamic int8 quantization of an ORT model into a temp dir."""
+    import tempfile
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    out_dir = tempfile.mkdtemp(prefix="ner-int8-")
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    ORTQuantizer.from_pretrained(model).quantize(save_dir=out_dir, quantization_config=qconfig)
+    return ORTModelForTokenClassification.from_pretrained(out_dir, file_name="model_quantized.onnx")
+
+def build_pipeline(model_ref: str, backend: str = "torch", quantize: bool = False, local_only: bool = False):
+    if backend == "onnx":
+        return _onnx_pipeline(model_ref, quantize, local_only)
+    if backend != "torch":
+        raise ValueError(f"Unknown NER_BACKEND: {backend}")
+    # A local directory path never touches the Hub, so this also works offline
+    return pipeline("ner", model=model_ref, grouped_entities=True)
 
 def load_model():
     global _ner_model
     if _ner_model is not None:
         return _ner_model
 
-    try:
-        _ner_model = pipeline(
-            "ner",
-            model="samrawal/bert-base-uncased_clinical-ner",
-            grouped_entities=True
-        )
-    except Exception:
-        _ner_model = pipeline("ner", grouped_entities=True)
+    with _load_lock:
+        if _ner_model is not None:
+            return _ner_model
+
+        model_ref = settings.NER_MODEL_DIR or settings.NER_MODEL
+        local_only = bool(settings.NER_MODEL_DIR)
+        _status.update(state="loading", model=model_ref, backend=settings.NER_BACKEND, fallback=False)
+        started = time.perf_counter()
+
+        try:
+            nlp = build_pipeline(model_ref, settings.NER_BACKEND, settings.NER_QUANTIZE, local_only)
+        except Exception as e:
+            if not settings.NER_ALLOW_FALLBACK:
+                _status.update(state="failed", error=str(e))
+                raise
+            logger.warning("Clinical NER model %s failed to load (%s); FALLING BACK to generic NER", model_ref, e)
+            try:
+                nlp = pipeline("ner", grouped_entities=True)
+            except Exception as fallback_error:
+                _status.update(state="failed", error=f"{e}; fallback: {fallback_error}")
+                raise
+            _status.update(model="generic-ner", backend="torch", fallback=True, error=str(e))
+
+        _status.update(state="loaded", load_seconds=round(time.perf_counter() - started, 2))
+        _ner_model = nlp
 
     return _ner_model
 
-def extract_symptoms(text: str) -> List[str]:
-    if not text or not text.strip():
-        return ["unknown symptom"]
+def preload_model() -> None:
+    """Load and warm the model (first forward pass is much slower than the rest)."""
+    try:
+        nlp = load_model()
+        started = time.perf_counter()
+        nlp(WARMUP_TEXT)
+        _status.update(state="ready", warmup_seconds=round(time.perf_counter() - started, 2))
+        logger.info("NER model ready: %s", model_status())
+    except Exception as e:
+        _status.update(state="failed", error=str(e))
+        logger.exception("NER model preload failed")
 
-    nlp = load_model()
-    entities = nlp(text)
+def start_preload() -> Optional[threading.Thread]:
+    """Preload on a background thread so the server can answer liveness probes meanwhile."""
+    if not settings.NER_PRELOAD:
+        return None
+    thread = threading.Thread(target=preload_model, name="ner-preload", daemon=True)
+    thread.start()
+    return thread
+
+def model_status() -> Dict[str, Any]:
+    return dict(_status)
+
+def is_ready() -> bool:
+    """With preload on, ready means loaded *and* warmed. Lazy mode never gates readiness."""
+    if settings.NER_PRELOAD:
+        return _status["state"] == "ready"
+    return _status["state"] != "failed"
 
+def _merge_entities(entities: List[Dict[str, Any]]) -> List[str]:
     merged = []
     current = []
 
@@ -58,3 +168,34 @@ def extract_symptoms(text: str) -> List[str]:
         cleaned = ["general symptom"]
 
     return cleaned
+
+@timed("extract_symptoms")
+def extract_symptoms(text: str) -> List[str]:
+    if not text or not text.strip():
+        return ["unknown symptom"]
+
+    nlp = load_model()
+    return _merge_entities(nlp(text))
+
+def extract_symptoms_batch(texts: List[str], batch_size: int = 16) -> List[List[str]]:
+    """extract_symptoms for many texts, running the model on batches of `batch_size`."""
+    results: List[List[str]] = [["unknown symptom"] for _ in texts]
+    todo = [i for i, t in enumerate(texts) if t and t.strip()]
+    if not todo:
+        return results
+
+    nlp = load_model()
+    outputs = nlp([texts[i] for i in todo], batch_size=batch_size)
+    for i, entities in zip(todo, outputs):
+        results[i] = _merge_entities(entities)
+
+    return results
+
+@timed("extract_symptoms")
+async def extract_symptoms_async(text: str) -> List[str]:
+    """Non-blocking extract_symptoms; coalesced with concurrent callers into one batch."""
+    if not text or not text.strip():
+        return ["unknown symptom"]
+
+    from app.services.ner_batcher import get_ner_batcher
+    return await get_ner_batcher().submit(text)
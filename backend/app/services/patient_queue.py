@@ -0,0 +1,175 @@
+# backend/app/services/patient_queue.py
+"""
+Patient Queue Queries
+---------------------
+Keyset-paginated, filtered reads of `triage_records` for the doctor dashboard.
+
+Rows are ordered newest first by (timestamp, id). The cursor is an opaque
+token holding the last row's (timestamp, id), so every page is an index
+range scan no matter how deep the client pages.
+
+Writes that change the queue go through here too, so every change is
+published to live dashboards (see queue_events).
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.triage_record import TriageRecord
+from app.services.queue_events import publish_queue_event
+from app.services.triage_queue import get_triage_queue
+from app.services.triage_terms import has_terms, matches_text
+
+# Public field name -> model column. "priority" is a legacy placeholder (always None).
+FIELD_COLUMNS = {
+    "id": TriageRecord.id,
+    "patient_id": TriageRecord.patient_id,
+    "symptoms": TriageRecord.symptoms,
+    "duration": TriageRecord.duration,
+    "severity": TriageRecord.severity_label,
+    "risk_factors": TriageRecord.risk_factors,
+    "status": TriageRecord.status,
+    "ticket": TriageRecord.ticket,
+    "wait_time": TriageRecord.wait_time,
+    "timestamp": TriageRecord.timestamp,
+    "rule_version": TriageRecord.rule_version,
+}
+LEGACY_FIELDS = ("id", "patient_id", "symptoms", "severity", "priority", "status", "ticket", "wait_time", "timestamp")
+ALLOWED_FIELDS = set(FIELD_COLUMNS) | {"priority"}
+STATUSES = ("waiting", "in-progress", "done")
+
+
+class InvalidQueueQuery(ValueError):
+    """Bad cursor or unknown field name."""
+
+
+@dataclass
+class QueueQuery:
+    status: List[str] = field(default_factory=list)
+    severity: List[str] = field(default_factory=list)
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    symptom: List[str] = field(default_factory=list)
+    risk_factor: List[str] = field(default_factory=list)
+    text: Optional[str] = None       # free-text search over symptoms and risk factors
+    limit: int = 100
+    cursor: Optional[str] = None
+    fields: Sequence[str] = LEGACY_FIELDS
+
+
+def serialize_record(record: TriageRecord, fields: Sequence[str] = LEGACY_FIELDS) -> Dict[str, Any]:
+    return {f: getattr(record, FIELD_COLUMNS[f].key) if f in FIELD_COLUMNS else None for f in fields}
+
+
+def encode_cursor(timestamp: datetime, record_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), record_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(ts), int(record_id)
+    except Exception:
+        raise InvalidQueueQuery("Invalid cursor")
+
+
+def parse_fields(raw: Optional[str]) -> Sequence[str]:
+    if not raw:
+        return LEGACY_FIELDS
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in ALLOWED_FIELDS]
+    if unknown:
+        raise InvalidQueueQuery(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def queue_page_statement(q: QueueQuery) -> Select:
+    """SELECT for one page of `q`, one row more than the limit (tells whether a next page exists)."""
+    # id + timestamp are always loaded: they form the cursor
+    names = [f for f in FIELD_COLUMNS if f in q.fields or f in ("id", "timestamp")]
+    query = select(*[FIELD_COLUMNS[n].label(n) for n in names])
+
+    if q.status:
+        query = query.filter(TriageRecord.status.in_(q.status))
+    if q.severity:
+        query = query.filter(TriageRecord.severity_label.in_(q.severity))
+    if q.since:
+        query = query.filter(TriageRecord.timestamp >= q.since)
+    if q.until:
+        query = query.filter(TriageRecord.timestamp < q.until)
+    if q.symptom:
+        query = query.filter(has_terms("symptom", q.symptom))
+    if q.risk_factor:
+        query = query.filter(has_terms("risk_factor", q.risk_factor))
+    if q.text and q.text.strip():
+        query = query.filter(matches_text(q.text))
+    if q.cursor:
+        ts, record_id = decode_cursor(q.cursor)
+        query = query.filter(or_(
+            TriageRecord.timestamp < ts,
+            and_(TriageRecord.timestamp == ts, TriageRecord.id < record_id),
+        ))
+
+    return query.order_by(TriageRecord.timestamp.desc(), TriageRecord.id.desc()).limit(q.limit + 1)
+
+
+def _page(rows, q: QueueQuery) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    next_cursor = None
+    if len(rows) > q.limit:
+        rows = rows[:q.limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    items = []
+    for row in rows:
+        data = row._asdict()
+        items.append({f: data.get(f) for f in q.fields})
+    return items, next_cursor
+
+
+def fetch_queue_page(db: Session, q: QueueQuery) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return one page of serialized rows and the cursor for the next page (None at the end)."""
+    return _page(db.execute(queue_page_statement(q)).all(), q)
+
+
+async def fetch_queue_page_async(db: AsyncSession, q: QueueQuery) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """fetch_queue_page for async routes: the query doesn't block the event loop."""
+    return _page((await db.execute(queue_page_statement(q))).all(), q)
+
+
+def update_status(db: Session, record_id: int, status: str) -> Optional[Dict[str, Any]]:
+    """Move a record to a new status. Returns the serialized record, or None if missing."""
+    if status not in STATUSES:
+        raise InvalidQueueQuery(f"Unknown status: {status}")
+
+    record = db.get(TriageRecord, record_id)
+    if record is None:
+        return None
+
+    record.status = status
+    db.commit()
+    get_triage_queue().transition(record.ticket, status)
+    data = serialize_record(record)
+    publish_queue_event("updated", data)
+    return data
+
+
+def remove_record(db: Session, record_id: int) -> bool:
+    record = db.get(TriageRecord, record_id)
+    if record is None:
+        return False
+
+    data = serialize_record(record)
+    db.delete(record)
+    db.commit()
+    get_triage_queue().discard(record.ticket)
+    publish_queue_event("removed", data)
+    return True
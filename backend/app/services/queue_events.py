@@ -0,0 +1,157 @@
+# backend/app/services/queue_events.py
+"""
+Queue Events
+------------
+Push channel for doctor dashboards: every change to `triage_records`
+(created / updated / removed) is published as a delta with a monotonically
+increasing sequence number.
+
+Reconnecting clients pass the last sequence they saw and receive only the
+events they missed. If those have already dropped out of the replay buffer
+they get a single "reset" event and should re-fetch /patients/.
+
+The in-process broadcaster is enough for one worker. Multi-worker fan-out
+(Redis pub/sub, Postgres LISTEN/NOTIFY, ...) plugs in by implementing
+`EventBackend` and passing it to `set_event_backend()` at startup.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+EVENT_TYPES = ("created", "updated", "removed")
+
+
+@dataclass
+class QueueEvent:
+    seq: int
+    type: str                      # created | updated | removed | reset
+    record: Dict[str, Any] = field(default_factory=dict)
+    at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class EventBackend:
+    """Interface for queue event fan-out."""
+
+    def publish(self, type: str, record: Dict[str, Any]) -> QueueEvent:
+        raise NotImplementedError
+
+    def subscribe(self, since: Optional[int] = None) -> AsyncIterator[QueueEvent]:
+        raise NotImplementedError
+
+    @property
+    def latest_seq(self) -> int:
+        raise NotImplementedError
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, event: QueueEvent) -> None:
+        # Runs on the subscriber's loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: stop queueing and tell it to resync instead
+            self.overflowed = True
+
+
+class InMemoryBroadcaster(EventBackend):
+    """Single-process broadcaster with a bounded replay buffer. Thread-safe publish."""
+
+    def __init__(self, history: int = 1000, subscriber_queue: int = 256):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history: Deque[QueueEvent] = deque(maxlen=history)
+        self._subscribers: Set[_Subscriber] = set()
+        self._subscriber_queue = subscriber_queue
+
+    @property
+    def latest_seq(self) -> int:
+        return self._seq
+
+    def publish(self, type: str, record: Dict[str, Any]) -> QueueEvent:
+        if type not in EVENT_TYPES:
+            raise ValueError(f"Unknown queue event type: {type}")
+
+        with self._lock:
+            self._seq += 1
+            event = QueueEvent(seq=self._seq, type=type, record=record)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                pass  # subscriber's loop already closed
+        return event
+
+    def _replay(self, since: int) -> Optional[List[QueueEvent]]:
+        """Events after `since`, or None when the buffer no longer reaches back that far."""
+        if since >= self._seq:
+            return []
+        if not self._history or self._history[0].seq > since + 1:
+            return None
+        return [e for e in self._history if e.seq > since]
+
+    async def subscribe(self, since: Optional[int] = None) -> AsyncIterator[QueueEvent]:
+        sub = _Subscriber(asyncio.get_running_loop(), self._subscriber_queue)
+
+        with self._lock:
+            # Register and snapshot under the same lock so nothing falls in between
+            self._subscribers.add(sub)
+            backlog = self._replay(since) if since is not None else []
+            current = self._seq
+
+        try:
+            if backlog is None:
+                yield QueueEvent(seq=current, type="reset")
+            else:
+                for event in backlog:
+                    yield event
+                if backlog:
+                    current = backlog[-1].seq
+
+            while True:
+                event = await sub.queue.get()
+                if event.seq <= current:
+                    continue  # already replayed
+                if sub.overflowed and sub.queue.empty():
+                    # Later events were dropped; jump to the newest seq and make the client refetch
+                    current = self._seq
+                    sub.overflowed = False
+                    yield QueueEvent(seq=current, type="reset")
+                    continue
+                current = event.seq
+                yield event
+        finally:
+            with self._lock:
+                self._subscribers.discard(sub)
+
+
+_backend: EventBackend = InMemoryBroadcaster()
+
+
+def get_event_backend() -> EventBackend:
+    return _backend
+
+
+def set_event_backend(backend: EventBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+def publish_queue_event(type: str, record: Dict[str, Any]) -> QueueEvent:
+    return _backend.publish(type, record)
@@ -0,0 +1,94 @@
+# backend/app/services/queue_snapshot.py
+"""
+Queue Snapshot Cache
+--------------------
+Pre-serialized /patients/ responses keyed by query parameters.
+
+The cache version is the queue event sequence number: every write that
+changes `triage_records` publishes an event (see queue_events), which bumps
+the sequence and implicitly invalidates every snapshot. Steady-state polls
+are answered from memory — or with 304 Not Modified — without touching the
+database or re-encoding JSON.
+
+The sequence only sees this process's writes, so with several workers
+QUEUE_SNAPSHOT_CACHE should be off; every poll then reads the database.
+The ETag hashes the body either way, so it stays valid across restarts
+and workers.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.services.queue_events import get_event_backend
+
+
+@dataclass(frozen=True)
+class QueueSnapshot:
+    version: int
+    body: bytes
+    etag: str
+    next_cursor: Optional[str]
+
+
+class QueueSnapshotCache:
+    def __init__(self, max_entries: int = 64, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, QueueSnapshot]" = OrderedDict()
+
+    @staticmethod
+    def current_version() -> int:
+        return get_event_backend().latest_seq
+
+    def get(self, key: Hashable) -> Optional[QueueSnapshot]:
+        if not self.enabled:
+            return None
+        version = self.current_version()
+        with self._lock:
+            snap = self._entries.get(key)
+            if snap is None:
+                return None
+            if snap.version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snap
+
+    def put(self, key: Hashable, version: int, items: List[Dict[str, Any]], next_cursor: Optional[str]) -> QueueSnapshot:
+        """Serialize once and store. `version` must be read *before* the query ran."""
+        body = json.dumps(
+            jsonable_encoder(items), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+        digest = hashlib.sha1(body + b"\0" + (next_cursor or "").encode()).hexdigest()[:20]
+        snap = QueueSnapshot(version=version, body=body, etag=f'"q-{digest}"', next_cursor=next_cursor)
+        if not self.enabled:
+            return snap
+
+        with self._lock:
+            self._entries[key] = snap
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snap
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+snapshot_cache = QueueSnapshotCache(enabled=settings.QUEUE_SNAPSHOT_CACHE)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
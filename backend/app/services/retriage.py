@@ -0,0 +1,387 @@
+# backend/app/services/retriage.py
+"""
+Bulk Re-Triage
+--------------
+Re-scores past intakes offline whenever the severity rules or the NER model
+change, instead of pushing them one by one through /triage/process.
+
+Sources are streamed, never loaded whole:
+- iter_jsonl(): one conversation per line. Accepts {"messages": [...]},
+  {"history": [{"role", "content"}]}, {"text": ...} and backlog-style
+  {"title", "body"} lines; the id comes from "id" / "request_id" (else the
+  line number) and the stored label from "severity_label" / "severity" /
+  "expected".
+- iter_records(): triage_records in id order. The conversation itself is
+  not stored, so the text is the recorded symptom list.
+
+RetriageEngine sends chunks of items to a process pool (each worker loads
+the model once and runs extract_symptoms_batch + calculate_severity_batch
+on the whole chunk), optionally asks the LLM with bounded concurrency, and
+appends results to a JSONL file in source order.
+
+After every chunk the output is fsynced and a checkpoint (<output>.ckpt)
+records the last source position, the output size and the running diff
+stats; resume=True truncates the output to that size and carries on after
+that position, so an interrupted run neither repeats nor loses items.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXTRACTORS = ("ner", "fragments", "stored")
+SEVERITY_RANK = {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}
+MAX_SAMPLES = 25  # changed ids kept in the report
+
+@dataclass
+class ReplayItem:
+    seq: int                                   # resume position: line number or record id
+    id: str
+    text: str
+    symptoms: Optional[List[str]] = None       # recorded symptoms (extractor="stored")
+    stored_severity: Optional[str] = None
+    stored_rule_version: Optional[str] = None
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+def _conversation_text(obj: Dict[str, Any]) -> str:
+    if isinstance(obj.get("messages"), list):
+        return "\n".join(str(m) for m in obj["messages"])
+    if isinstance(obj.get("history"), list):
+        return "\n".join(t.get("content", "") for t in obj["history"] if t.get("role") in ("patient", "user"))
+    if obj.get("text"):
+        return str(obj["text"])
+    return "\n".join(str(obj[k]) for k in ("title", "body") if obj.get(k))
+
+
+def iter_jsonl(path: str, after_seq: int = 0) -> Iterator[ReplayItem]:
+    with open(path, encoding="utf-8") as f:
+        for seq, line in enumerate(f, start=1):
+            if seq <= after_seq or not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("%s:%d skipped, not JSON (%s)", path, seq, e)
+                continue
+            symptoms = obj.get("symptoms")
+            if isinstance(symptoms, str):
+                symptoms = [s.strip() for s in symptoms.split(",") if s.strip()]
+            yield ReplayItem(
+                seq=seq,
+                id=str(obj.get("id") or obj.get("request_id") or seq),
+                text=_conversation_text(obj),
+                symptoms=symptoms or None,
+                stored_severity=obj.get("severity_label") or obj.get("severity") or obj.get("expected"),
+                stored_rule_version=obj.get("rule_version"),
+            )
+
+
+def iter_records(after_seq: int = 0, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 page: int = 1000, session_factory: Optional[Callable] = None) -> Iterator[ReplayItem]:
+    """triage_records after id `after_seq`, keyset-paged so each query stays short."""
+    from app.core.database import SessionLocal
+    from app.models.triage_record import TriageRecord
+    from app.services.triage_terms import split_terms
+
+    session_factory = session_factory or SessionLocal
+    last_id = after_seq
+    while True:
+        with session_factory() as db:
+            query = db.query(
+                TriageRecord.id, TriageRecord.symptoms, TriageRecord.severity_label, TriageRecord.rule_version,
+            ).filter(TriageRecord.id > last_id)
+            if since is not None:
+                query = query.filter(TriageRecord.timestamp >= since)
+            if until is not None:
+                query = query.filter(TriageRecord.timestamp < until)
+            rows = query.order_by(TriageRecord.id).limit(page).all()
+        if not rows:
+            return
+        for r in rows:
+            yield ReplayItem(
+                seq=r.id,
+                id=str(r.id),
+                text=r.symptoms or "",
+                symptoms=split_terms(r.symptoms) or None,
+                stored_severity=r.severity_label,
+                stored_rule_version=r.rule_version,
+            )
+        last_id = rows[-1].id
+
+
+# ---------------------------------------------------------------------------
+# Worker side (module level so the process pool can pickle it)
+# ---------------------------------------------------------------------------
+
+def _init_worker(torch_threads: int) -> None:
+    os.environ["NER_PRELOAD"] = "false"
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)  # N workers x all cores would just thrash
+    except Exception:
+        pass
+
+
+def score_chunk(texts: List[str], stored: List[Optional[List[str]]], extractor: str,
+                ner_batch_size: int) -> Tuple[str, List[List[str]], List[str]]:
+    """(rule version, symptoms per item, severity per item) for one chunk."""
+    from app.services.ai_chat_service import fragment_symptoms
+    from app.services.severity_rules import get_rules
+    from app.services.severity_scoring import calculate_severity_batch
+
+    if extractor == "ner":
+        from app.services.nlp_processing import extract_symptoms_batch
+        symptom_lists = extract_symptoms_batch(texts, batch_size=ner_batch_size)
+    elif extractor == "fragments":
+        symptom_lists = [fragment_symptoms(t) for t in texts]
+    else:
+        symptom_lists = [s or fragment_symptoms(t) for t, s in zip(texts, stored)]
+
+    rules = get_rules()
+    return rules.version, symptom_lists, calculate_severity_batch(symptom_lists)
+
+
+# ---------------------------------------------------------------------------
+# Diff report
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DiffStats:
+    total: int = 0
+    labeled: int = 0                 # items with a stored severity to compare against
+    changed: int = 0
+    upgraded: int = 0
+    downgraded: int = 0
+    errors: int = 0
+    transitions: Counter = field(default_factory=Counter)   # "Low -> High"
+    llm_total: int = 0
+    llm_final: int = 0
+    llm_agrees_with_rules: int = 0
+    llm_changed: int = 0             # final LLM label differs from the stored one
+    samples: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.total += 1
+        if result.get("error"):
+            self.errors += 1
+            return
+        stored, new = result.get("stored_severity"), result["severity"]
+        if stored:
+            self.labeled += 1
+            self.transitions[f"{stored} -> {new}"] += 1
+            if stored != new:
+                self.changed += 1
+                delta = SEVERITY_RANK.get(new, 0) - SEVERITY_RANK.get(stored, 0)
+                self.upgraded += delta > 0
+                self.downgraded += delta < 0
+                if len(self.samples) < MAX_SAMPLES:
+                    self.samples.append({"id": result["id"], "stored": stored, "new": new,
+                                         "symptoms": result["symptoms"][:8]})
+        if "llm_final" in result:
+            self.llm_total += 1
+            if result["llm_final"]:
+                self.llm_final += 1
+                self.llm_agrees_with_rules += result["llm_severity"] == new
+                self.llm_changed += bool(stored) and result["llm_severity"] != stored
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = dict(self.__dict__)
+        d["transitions"] = dict(self.transitions)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "DiffStats":
+        d = dict(d)
+        d["transitions"] = Counter(d.get("transitions", {}))
+        return cls(**d)
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+def checkpoint_path(output_path: str) -> str:
+    return output_path + ".ckpt"
+
+
+def load_checkpoint(output_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(checkpoint_path(output_path), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_checkpoint(output_path: str, state: Dict[str, Any]) -> None:
+    path = checkpoint_path(output_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)  # atomic: a crash leaves the old or the new checkpoint, never half of one
+
+
+class RetriageEngine:
+    def __init__(
+        self,
+        extractor: str = "ner",
+        workers: int = 2,
+        chunk_size: int = 64,
+        ner_batch_size: int = 16,
+        use_llm: bool = False,
+        llm_concurrency: int = 4,
+        torch_threads: int = 1,
+    ):
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"extractor must be one of {', '.join(EXTRACTORS)}")
+        self.extractor = extractor
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.ner_batch_size = ner_batch_size
+        self.use_llm = use_llm
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.torch_threads = torch_threads
+
+    def _executor(self) -> Executor:
+        if self.workers <= 0:
+            return ThreadPoolExecutor(1)  # in-process: one model copy, off the event loop
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.torch_threads,))
+
+    async def _llm_labels(self, texts: List[str]) -> List[Dict[str, Any]]:
+        from app.services.triage_service import llm_triage
+
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+
+        async def one(text):
+            async with semaphore:
+                try:
+                    data = await llm_triage(text)
+                except Exception as e:
+                    return {"llm_final": False, "llm_error": f"{e.__class__.__name__}: {e}"}
+                return {"llm_final": bool(data.get("final")), "llm_severity": data.get("severity")}
+
+        return await asyncio.gather(*[one(t) for t in texts])
+
+    def _chunks(self, items: Iterable[ReplayItem]) -> Iterator[List[ReplayItem]]:
+        chunk: List[ReplayItem] = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def run(
+        self,
+        source: Callable[[int], Iterable[ReplayItem]],
+        output_path: str,
+        resume: bool = False,
+        progress: Optional[Callable[[DiffStats], None]] = None,
+    ) -> DiffStats:
+        """
+        Re-triage everything `source(after_seq)` yields into `output_path`.
+        With resume=True and a checkpoint present, continues where it stopped.
+        """
+        checkpoint = load_checkpoint(output_path) if resume else None
+        after_seq, size = 0, 0
+        stats = DiffStats()
+        if checkpoint is not None:
+            after_seq, size = checkpoint["last_seq"], checkpoint["bytes"]
+            stats = DiffStats.from_dict(checkpoint["stats"])
+            logger.info("Resuming after seq %d (%d items done)", after_seq, stats.total)
+
+        loop = asyncio.get_running_loop()
+        executor = self._executor()
+        pending: deque = deque()
+        max_pending = max(2, 2 * self.workers)
+
+        with open(output_path, "ab" if checkpoint else "wb") as out:
+            out.truncate(size)  # drop lines written after the last checkpoint
+            out.seek(size)
+
+            async def drain_one():
+                chunk, future = pending.popleft()
+                try:
+                    version, symptom_lists, severities = await future
+                except Exception as e:
+                    logger.exception("Chunk ending at seq %d failed", chunk[-1].seq)
+                    version, symptom_lists, severities = None, [[] for _ in chunk], [None for _ in chunk]
+                    error = f"{e.__class__.__name__}: {e}"
+                else:
+                    error = None
+
+                llm = await self._llm_labels([i.text for i in chunk]) if self.use_llm and not error else None
+                for n, item in enumerate(chunk):
+                    result = {
+                        "id": item.id,
+                        "seq": item.seq,
+                        "symptoms": symptom_lists[n],
+                        "severity": severities[n],
+                        "rule_version": version,
+                        "stored_severity": item.stored_severity,
+                        "stored_rule_version": item.stored_rule_version,
+                        "changed": bool(item.stored_severity) and severities[n] != item.stored_severity,
+                    }
+                    if error:
+                        result["error"] = error
+                    if llm is not None:
+                        result.update(llm[n])
+                    stats.add(result)
+                    out.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+
+                out.flush()
+                os.fsync(out.fileno())
+                _write_checkpoint(output_path, {
+                    "last_seq": chunk[-1].seq, "bytes": out.tell(), "stats": stats.to_dict(),
+                })
+                if progress is not None:
+                    progress(stats)
+
+            try:
+                for chunk in self._chunks(source(after_seq)):
+                    future = loop.run_in_executor(
+                        executor, score_chunk,
+                        [i.text for i in chunk], [i.symptoms for i in chunk], self.extractor, self.ner_batch_size,
+                    )
+                    pending.append((chunk, future))
+                    if len(pending) >= max_pending:
+                        await drain_one()  # oldest first: output stays in source order
+                while pending:
+                    await drain_one()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return stats
+
+
+def render_report(stats: DiffStats) -> str:
+    lines = [
+        f"items:        {stats.total} ({stats.errors} failed)",
+        f"with label:   {stats.labeled}",
+        f"changed:      {stats.changed}"
+        + (f" ({100 * stats.changed / stats.labeled:.1f}%)" if stats.labeled else "")
+        + f"  up {stats.upgraded} / down {stats.downgraded}",
+    ]
+    for transition, n in sorted(stats.transitions.items(), key=lambda kv: -kv[1]):
+        if transition.split(" -> ")[0] != transition.split(" -> ")[1]:
+            lines.append(f"  {transition:22s} {n}")
+    if stats.llm_total:
+        lines.append(f"LLM final:    {stats.llm_final} / {stats.llm_total}, "
+                     f"agrees with rules {stats.llm_agrees_with_rules}, differs from stored {stats.llm_changed}")
+    return "\n".join(lines)
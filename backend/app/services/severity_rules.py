@@ -0,0 +1,131 @@
+# app/services/severity_rules.py
+
+"""
+Severity Rule Tables
+--------------------
+Loads the versioned severity rules (weights, labels, synonyms) from a JSON
+data file and compiles them into a SymptomMatcher.
+
+The file is re-checked at most every SEVERITY_RULES_RELOAD_SECONDS. A
+changed file is loaded and compiled off to the side, then swapped in with a
+single reference assignment: requests already holding the previous table
+finish with it, new requests get the new one. A file that fails to load or
+validate is logged and ignored; the last good table stays active.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.symptom_matcher import SymptomMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "severity_rules.json")
+
+
+class RuleTableError(ValueError):
+    """The rules file is missing fields or inconsistent."""
+
+
+@dataclass(frozen=True)
+class RuleTable:
+    version: str
+    weights: Dict[str, int]
+    labels: Dict[int, str]
+    synonyms: Tuple[Tuple[str, str], ...]
+    matcher: SymptomMatcher
+
+
+def parse_rule_table(raw: dict) -> RuleTable:
+    try:
+        version = str(raw["version"])
+        weights = {str(k): int(v) for k, v in raw["weights"].items()}
+        labels = {int(k): str(v) for k, v in raw["labels"].items()}
+        synonyms = tuple((str(k), str(v)) for k, v in raw.get("synonyms", []))
+    except (KeyError, TypeError, ValueError) as e:
+        raise RuleTableError(f"Malformed severity rules: {e}")
+
+    missing = sorted({w for w in weights.values() if w not in labels})
+    if missing:
+        raise RuleTableError(f"No label for weight(s) {missing}")
+
+    return RuleTable(
+        version=version,
+        weights=weights,
+        labels=labels,
+        synonyms=synonyms,
+        matcher=SymptomMatcher(weights, labels, synonyms),
+    )
+
+
+def load_rule_table(path: str) -> RuleTable:
+    with open(path, encoding="utf-8") as f:
+        return parse_rule_table(json.load(f))
+
+
+class RuleStore:
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime
+        self._table = load_rule_table(path)
+        self._next_check = time.monotonic() + check_interval
+
+    def current(self) -> RuleTable:
+        if self.check_interval > 0 and time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        return self._table
+
+    def reload_if_changed(self) -> bool:
+        # Only one thread checks; the others keep using the current table
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError as e:
+                logger.warning("Severity rules file unavailable (%s); keeping version %s", e, self._table.version)
+                return False
+            if mtime == self._mtime:
+                return False
+
+            try:
+                table = load_rule_table(self.path)
+            except Exception as e:
+                logger.error("Rejected severity rules update (%s); keeping version %s", e, self._table.version)
+                self._mtime = mtime  # don't retry the same broken file every interval
+                return False
+
+            previous, self._table, self._mtime = self._table, table, mtime
+            logger.info("Severity rules reloaded: %s -> %s", previous.version, table.version)
+            return True
+        finally:
+            self._lock.release()
+
+
+_store: Optional[RuleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_rule_store() -> RuleStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RuleStore(
+                    settings.SEVERITY_RULES_PATH or os.path.normpath(DEFAULT_RULES_PATH),
+                    settings.SEVERITY_RULES_RELOAD_SECONDS,
+                )
+    return _store
+
+
+def get_rules() -> RuleTable:
+    return get_rule_store().current()
@@ -0,0 +1,229 @@
+# backend/app/services/structured_output.py
+"""
+Structured Output
+-----------------
+Turns LLM triage replies into a validated `TriageDecision`.
+
+- extract_json_object() tolerates what models wrap around JSON: code
+  fences, a sentence before or after, trailing commas. It never slices
+  from the first "{" to the last "}", which breaks on braces in prose.
+- JsonFieldScanner reads a streamed reply one delta at a time and reports
+  each top-level scalar field (`final`, `severity`, ...) the moment its
+  value is complete, long before the closing brace arrives.
+- parse_triage_decision() raises StructuredOutputError (reason "json" or
+  "schema") instead of swallowing the failure, so the caller can make one
+  repair request and count what parsing costs.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_MAX_CANDIDATES = 20  # "{" positions tried before giving up
+
+
+class StructuredOutputError(ValueError):
+    """The reply wasn't a JSON object (reason "json") or didn't fit the schema (reason "schema")."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def normalize_severity(value: Any) -> Optional[str]:
+    """'critical ' -> 'Critical'; None for anything that isn't a known level."""
+    if not isinstance(value, str):
+        return None
+    v = value.strip().lower()
+    for level in SEVERITIES:
+        if v == level.lower():
+            return level
+    return None
+
+
+class TriageDecision(BaseModel):
+    """What the triage model must return. Unknown keys (e.g. a made-up ticket) are dropped."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    final: bool = False
+    severity: Optional[Literal["Critical", "High", "Medium", "Low"]] = None
+    symptoms: List[str] = []
+    duration: str = ""
+    risk_factors: List[str] = []
+
+    @field_validator("severity", mode="before")
+    @classmethod
+    def _severity(cls, v):
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return None
+        level = normalize_severity(v)
+        if level is None:
+            raise ValueError(f"severity must be one of {', '.join(SEVERITIES)}")
+        return level
+
+    @field_validator("symptoms", "risk_factors", mode="before")
+    @classmethod
+    def _string_list(cls, v):
+        if v is None:
+            return []
+        if isinstance(v, str):
+            v = v.split(",")
+        if not isinstance(v, list) or any(isinstance(x, (dict, list)) for x in v):
+            raise ValueError("expected a list of strings")
+        return [str(x).strip() for x in v if x is not None and str(x).strip()]
+
+    @field_validator("duration", mode="before")
+    @classmethod
+    def _duration(cls, v):
+        return "" if v is None else str(v).strip()
+
+    @model_validator(mode="after")
+    def _final_needs_severity(self):
+        if self.final and self.severity is None:
+            raise ValueError("a final decision needs a severity")
+        return self
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """The first JSON object in `text`. Raises StructuredOutputError("json") if there is none."""
+    text = _FENCE.sub("", (text or "").strip())
+    if not text:
+        raise StructuredOutputError("json", "empty reply")
+
+    decoder = json.JSONDecoder()
+    for candidate in (text, _TRAILING_COMMA.sub(r"\1", text)):
+        start = candidate.find("{")
+        tries = 0
+        while start != -1 and tries < _MAX_CANDIDATES:
+            try:
+                obj, _ = decoder.raw_decode(candidate, start)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(obj, dict):
+                    return obj
+            start = candidate.find("{", start + 1)
+            tries += 1
+    raise StructuredOutputError("json", "no JSON object in reply")
+
+
+def parse_triage_decision(text: str) -> TriageDecision:
+    obj = extract_json_object(text)
+    try:
+        return TriageDecision.model_validate(obj)
+    except ValidationError as exc:
+        # One line per problem, short enough to hand back to the model in a repair request
+        problems = "; ".join(f"{'.'.join(map(str, e['loc'])) or 'object'}: {e['msg']}" for e in exc.errors())
+        raise StructuredOutputError("schema", problems) from None
+
+
+class JsonFieldScanner:
+    """
+    Incremental scanner over one streamed JSON object. feed() returns the
+    top-level scalar fields completed by that delta; nested objects and
+    arrays are skipped (their keys appear in `fields` only once the whole
+    reply is parsed normally). Text before the first "{" is ignored.
+    """
+
+    _LITERALS = ("true", "false", "null")
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"       # key | colon | value | literal | after
+        self._buf: List[str] = []
+        self._key: Optional[str] = None
+
+    def feed(self, delta: str) -> Dict[str, Any]:
+        new: Dict[str, Any] = {}
+        for ch in delta:
+            if self.done:
+                break
+            self._step(ch, new)
+        return new
+
+    def _step(self, ch: str, new: Dict[str, Any]) -> None:
+        top = self._depth == 1
+
+        if self._in_string:
+            if top:
+                self._buf.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if top:
+                    self._string_done(new)
+            return
+
+        if self._depth == 0:
+            if ch == "{":
+                self._depth = 1
+            return
+
+        if self._expect == "literal" and top and ch not in ",}" and not ch.isspace():
+            self._buf.append(ch)
+            word = "".join(self._buf)
+            if word in self._LITERALS:
+                self._emit(json.loads(word), new)
+            return
+
+        if ch == '"':
+            self._in_string = True
+            if top:
+                self._buf = ['"']
+        elif ch in "{[":
+            if top and self._expect == "value":
+                self._expect = "after"  # compound value: not reported
+            self._depth += 1
+        elif ch in "}]":
+            if top:
+                self._finish_literal(new)
+                self.done = True
+            self._depth -= 1
+        elif top and ch == ":":
+            self._expect = "value"
+        elif top and ch == ",":
+            self._finish_literal(new)
+            self._expect = "key"
+        elif top and self._expect == "value" and not ch.isspace():
+            self._expect = "literal"
+            self._buf = [ch]
+
+    def _string_done(self, new: Dict[str, Any]) -> None:
+        try:
+            value = json.loads("".join(self._buf))
+        except json.JSONDecodeError:
+            value = None
+        if self._expect == "key":
+            self._key = value
+            self._expect = "colon"
+        elif self._expect == "value":
+            self._emit(value, new)
+
+    def _finish_literal(self, new: Dict[str, Any]) -> None:
+        if self._expect != "literal":
+            return
+        try:
+            self._emit(json.loads("".join(self._buf)), new)
+        except json.JSONDecodeError:
+            self._expect = "after"
+
+    def _emit(self, value: Any, new: Dict[str, Any]) -> None:
+        if self._key is not None:
+            self.fields[self._key] = new[self._key] = value
+        self._key = None
+        self._expect = "after"
+        self._buf = []
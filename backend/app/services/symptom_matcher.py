@@ -0,0 +1,125 @@
+# app/services/symptom_matcher.py
+
+"""
+Symptom Matcher
+---------------
+Precompiled fuzzy matcher behind calculate_severity.
+
+Built once from a reference vocabulary (term -> weight). Reference strings
+are pre-processed up front, and every symptom is scored against the whole
+vocabulary in one rapidfuzz `cdist` call (C++, optionally multi-threaded)
+instead of two Python-level fuzz calls per (symptom, term) pair.
+
+Scores are bit-for-bit those of the original loop: per pair
+    weight * 20 + (partial_ratio + token_sort_ratio) / 2
+with thefuzz's rounding and pre-processing, and ties resolved in
+(symptom order, vocabulary order) exactly as the loop did.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from thefuzz import utils as fuzz_utils
+
+
+def _token_sort_process(text: str) -> str:
+    # thefuzz.fuzz.token_sort_ratio's default processing
+    return fuzz_utils.full_process(text, force_ascii=True)
+
+
+class SymptomMatcher:
+    def __init__(
+        self,
+        weights: Dict[str, int],
+        labels: Dict[int, str],
+        synonyms: Sequence[Tuple[str, str]] = (),
+        default_label: str = "Low",
+    ):
+        if not weights:
+            raise ValueError("SymptomMatcher needs a non-empty vocabulary")
+
+        self.terms: List[str] = list(weights)
+        self.term_weights = np.array([weights[t] for t in self.terms], dtype=np.int64)
+        self.labels = dict(labels)
+        self.synonyms = tuple(synonyms)
+        self.default_label = default_label
+
+        self._terms_processed = [_token_sort_process(t) for t in self.terms]
+        self._weight_bonus = self.term_weights * 20
+
+    def normalize(self, text: str) -> str:
+        if not text:
+            return ""
+        t = text.lower().strip()
+        # Sequential overwrite, same as the original normalize_text
+        for k, v in self.synonyms:
+            if k in t:
+                t = v
+        return t
+
+    def _combined_scores(self, normalized: List[str], workers: int = 1) -> np.ndarray:
+        """(len(normalized), len(terms)) matrix of weight*20 + similarity."""
+        partial = process.cdist(normalized, self.terms, scorer=fuzz.partial_ratio, workers=workers)
+        token_sort = process.cdist(
+            [_token_sort_process(s) for s in normalized],
+            self._terms_processed,
+            scorer=fuzz.token_sort_ratio,
+            workers=workers,
+        )
+        # thefuzz rounds each scorer to an int before averaging
+        similarity = (np.rint(partial) + np.rint(token_sort)) / 2
+        return self._weight_bonus + similarity
+
+    def _best(self, scores: np.ndarray) -> Tuple[int, float]:
+        # argmax on the flattened (symptom, term) matrix picks the first maximum,
+        # matching the strict `>` of the original nested loop
+        best = int(np.argmax(scores))
+        return best % len(self.terms), float(scores.flat[best])
+
+    def _label_for(self, scores: np.ndarray) -> str:
+        term, _ = self._best(scores)
+        return self.labels.get(int(self.term_weights[term]), self.default_label)
+
+    def score(self, symptoms: List[str]) -> str:
+        if not symptoms:
+            return self.default_label
+        normalized = [self.normalize(s) for s in symptoms]
+        return self._label_for(self._combined_scores(normalized))
+
+    def best_match(self, symptoms: List[str]) -> Tuple[str, Optional[str], float]:
+        """
+        (label, winning vocabulary term, coverage 0-100) for `score`'s decision.
+        Coverage is how completely the winning term appears in the symptom
+        that matched it: 100 means verbatim ("crushing chest pain" for
+        "chest pain"), while a shorter fragment ("chest") can't reach it.
+        """
+        if not symptoms:
+            return self.default_label, None, 0.0
+        normalized = [self.normalize(s) for s in symptoms]
+        scores = self._combined_scores(normalized)
+        best = int(np.argmax(scores))
+        row, term = divmod(best, len(self.terms))
+        text, vocab = normalized[row], self.terms[term]
+        coverage = fuzz.partial_ratio(vocab, text) if len(vocab) <= len(text) else fuzz.ratio(vocab, text)
+        label = self.labels.get(int(self.term_weights[term]), self.default_label)
+        return label, vocab, float(coverage)
+
+    def score_many(self, symptom_lists: Sequence[List[str]], workers: int = -1) -> List[str]:
+        """Label many symptom lists with a single scoring pass over all unique symptoms."""
+        index: Dict[str, int] = {}
+        rows_per_list: List[List[int]] = []
+        for symptoms in symptom_lists:
+            rows = []
+            for s in symptoms:
+                rows.append(index.setdefault(self.normalize(s), len(index)))
+            rows_per_list.append(rows)
+
+        if not index:
+            return [self.default_label for _ in symptom_lists]
+
+        scores = self._combined_scores(list(index), workers=workers)
+        return [
+            self._label_for(scores[rows]) if rows else self.default_label
+            for rows in rows_per_list
+        ]
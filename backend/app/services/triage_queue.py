@@ -0,0 +1,417 @@
+# backend/app/services/triage_queue.py
+"""
+Triage Queue Engine
+-------------------
+In-memory view of who is waiting, in what order, backed by `triage_records`.
+
+- Tickets are unique and monotonic per severity prefix (P/A/B/C + number),
+  seeded from the highest number already in the database.
+- One lane per severity. Patients are served oldest-first within a lane;
+  across lanes each severity gets a head start of QUEUE_AGING_SECONDS per
+  level, so a Low patient who has waited long enough is seen before a
+  High one who just arrived. Critical is never overtaken.
+- Lanes are FIFO by arrival, so instead of a heap each lane is an
+  append-only array with a Fenwick tree of "still waiting" flags: position
+  lookups, removals and re-queues are all O(log n).
+- Wait estimates are position x the observed time between patients being
+  called in (EWMA), not a static table.
+
+Status changes made through patient_queue keep this in sync; on startup
+the waiting and in-progress rows are reloaded (rebuild_triage_queue).
+Single-process, like the in-memory queue event broadcaster.
+"""
+
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+TICKET_PREFIX = {"Critical": "P", "High": "A", "Medium": "B", "Low": "C"}
+FIRST_TICKET_NUMBER = 1001
+
+_TICKET = re.compile(r"^([A-Z])(\d+)$")
+
+QUEUE_WAITING = metrics.gauge("triage_queue_waiting", "Patients waiting, by severity")
+QUEUE_SERVICE_INTERVAL = metrics.gauge(
+    "triage_queue_service_interval_seconds",
+    "Smoothed time between patients being called in",
+    fn=lambda: _engine.service_interval if _engine is not None else 0,
+)
+
+
+def _severity(label: Optional[str]) -> str:
+    return label if label in SEVERITIES else "Low"
+
+
+class _Fenwick:
+    """Growable binary indexed tree over 0/1 flags (1-based internally)."""
+
+    def __init__(self):
+        self._tree = [0]
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def append(self, value: int) -> None:
+        i = len(self._tree)
+        # Node i covers (i - lowbit(i), i]: the new value plus the stored ones in that range
+        self._tree.append(value + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def add(self, index: int, delta: int) -> None:
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count: int) -> int:
+        """Sum of the first `count` flags."""
+        total = 0
+        i = count
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def first_set(self, start: int = 0) -> Optional[int]:
+        """Index of the first set flag at or after `start`."""
+        target = self.prefix(start) + 1
+        n = len(self)
+        pos, step = 0, 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and self._tree[nxt] < target:
+                pos = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return pos if pos < n else None
+
+
+@dataclass
+class QueueEntry:
+    ticket: str
+    severity: str
+    patient_id: int
+    enqueued_at: float
+    status: str = "waiting"
+    slot: int = -1
+
+
+class _Lane:
+    def __init__(self):
+        self.times: List[float] = []
+        self.tickets: List[str] = []
+        self.waiting = _Fenwick()
+        self.count = 0      # waiting
+        self.live = 0       # waiting + in-progress (slots that must survive compaction)
+
+    def append(self, ticket: str, enqueued_at: float) -> int:
+        # Keep times sorted even if the wall clock steps back
+        if self.times and enqueued_at < self.times[-1]:
+            enqueued_at = self.times[-1]
+        self.times.append(enqueued_at)
+        self.tickets.append(ticket)
+        self.waiting.append(1)
+        self.count += 1
+        self.live += 1
+        return len(self.times) - 1
+
+    def set_waiting(self, slot: int, waiting: bool) -> None:
+        self.waiting.add(slot, 1 if waiting else -1)
+        self.count += 1 if waiting else -1
+
+    def waiting_before_time(self, t: float, inclusive: bool) -> int:
+        idx = (bisect.bisect_right if inclusive else bisect.bisect_left)(self.times, t)
+        return self.waiting.prefix(idx)
+
+    def iter_waiting(self) -> Iterator[int]:
+        slot = self.waiting.first_set(0)
+        while slot is not None:
+            yield slot
+            slot = self.waiting.first_set(slot + 1)
+
+
+class TriageQueueEngine:
+    def __init__(
+        self,
+        aging_seconds: float = 1800,
+        service_interval: float = 120,
+        ewma_alpha: float = 0.2,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.aging_seconds = aging_seconds
+        self.service_interval = service_interval
+        self.ewma_alpha = ewma_alpha
+        self.clock = clock
+
+        self._lock = threading.RLock()
+        self._lanes: Dict[str, _Lane] = {s: _Lane() for s in SEVERITIES}
+        self._entries: Dict[str, QueueEntry] = {}
+        self._next_number: Dict[str, int] = {p: FIRST_TICKET_NUMBER for p in TICKET_PREFIX.values()}
+        self._last_called: Optional[float] = None
+
+    # -- ordering -------------------------------------------------------------
+
+    def _offset(self, severity: str) -> float:
+        if severity == "Critical":
+            return -1e12  # always ahead of everyone else
+        return (SEVERITIES.index(severity) - 1) * self.aging_seconds
+
+    def _score(self, severity: str, enqueued_at: float) -> float:
+        return enqueued_at + self._offset(severity)
+
+    # -- tickets --------------------------------------------------------------
+
+    def seed_tickets(self, tickets: Iterable[str]) -> None:
+        """Continue numbering after the highest ticket already issued."""
+        with self._lock:
+            for ticket in tickets:
+                m = _TICKET.match(ticket or "")
+                if m and m.group(1) in self._next_number:
+                    self._next_number[m.group(1)] = max(self._next_number[m.group(1)], int(m.group(2)) + 1)
+
+    def issue_ticket(self, severity: str) -> str:
+        prefix = TICKET_PREFIX[_severity(severity)]
+        with self._lock:
+            number = self._next_number[prefix]
+            self._next_number[prefix] = number + 1
+        return f"{prefix}{number}"
+
+    # -- membership -----------------------------------------------------------
+
+    def admit(self, ticket: str, severity: str, patient_id: int,
+              enqueued_at: Optional[float] = None, status: str = "waiting") -> QueueEntry:
+        severity = _severity(severity)
+        with self._lock:
+            if ticket in self._entries:
+                self.discard(ticket)
+            lane = self._lanes[severity]
+            entry = QueueEntry(ticket, severity, patient_id, enqueued_at if enqueued_at is not None else self.clock())
+            entry.slot = lane.append(ticket, entry.enqueued_at)
+            entry.enqueued_at = lane.times[entry.slot]
+            self._entries[ticket] = entry
+            if status != "waiting":
+                self._leave_waiting(entry)
+                entry.status = status
+            self._publish_depth(severity)
+            return entry
+
+    def _leave_waiting(self, entry: QueueEntry) -> None:
+        self._lanes[entry.severity].set_waiting(entry.slot, False)
+
+    def transition(self, ticket: str, status: str) -> bool:
+        """waiting -> in-progress -> done (and back to waiting). False for unknown tickets."""
+        with self._lock:
+            entry = self._entries.get(ticket)
+            if entry is None:
+                return False
+            if status == entry.status:
+                return True
+
+            lane = self._lanes[entry.severity]
+            if entry.status == "waiting":
+                lane.set_waiting(entry.slot, False)
+                if status == "in-progress":
+                    self._observe_call()
+            elif status == "waiting":
+                # Back in line at the original arrival time
+                lane.set_waiting(entry.slot, True)
+
+            if status == "done":
+                del self._entries[ticket]
+                lane.live -= 1
+                self._maybe_compact(entry.severity)
+            else:
+                entry.status = status
+            self._publish_depth(entry.severity)
+            return True
+
+    def discard(self, ticket: Optional[str]) -> None:
+        with self._lock:
+            entry = self._entries.pop(ticket, None) if ticket else None
+            if entry is None:
+                return
+            if entry.status == "waiting":
+                self._leave_waiting(entry)
+            self._lanes[entry.severity].live -= 1
+            self._maybe_compact(entry.severity)
+            self._publish_depth(entry.severity)
+
+    def _maybe_compact(self, severity: str) -> None:
+        """Drop slots of finished patients once they dominate the lane (amortized O(1))."""
+        lane = self._lanes[severity]
+        if len(lane.tickets) < 1024 or lane.live * 4 > len(lane.tickets):
+            return
+        fresh = _Lane()
+        for slot, ticket in enumerate(lane.tickets):
+            entry = self._entries.get(ticket)
+            if entry is None or entry.slot != slot or entry.severity != severity:
+                continue
+            entry.slot = fresh.append(ticket, lane.times[slot])
+            if entry.status != "waiting":
+                fresh.set_waiting(entry.slot, False)
+        self._lanes[severity] = fresh
+
+    # -- service rate ---------------------------------------------------------
+
+    def _observe_call(self) -> None:
+        now = self.clock()
+        if self._last_called is not None:
+            gap = now - self._last_called
+            # Idle stretches (nobody waiting) aren't service time
+            if self.waiting_count() > 0 and gap > 0:
+                self.service_interval += self.ewma_alpha * (gap - self.service_interval)
+        self._last_called = now
+
+    # -- queries --------------------------------------------------------------
+
+    def waiting_count(self, severity: Optional[str] = None) -> int:
+        if severity is not None:
+            return self._lanes[_severity(severity)].count
+        return sum(lane.count for lane in self._lanes.values())
+
+    def get(self, ticket: str) -> Optional[QueueEntry]:
+        return self._entries.get(ticket)
+
+    def position(self, ticket: str) -> Optional[int]:
+        """Patients ahead of this ticket (0 = next), or None if it isn't waiting."""
+        with self._lock:
+            entry = self._entries.get(ticket)
+            if entry is None or entry.status != "waiting":
+                return None
+            rank = SEVERITIES.index(entry.severity)
+            score = self._score(entry.severity, entry.enqueued_at)
+            ahead = self._lanes[entry.severity].waiting.prefix(entry.slot)
+            for severity, lane in self._lanes.items():
+                other = SEVERITIES.index(severity)
+                if other == rank or not lane.count:
+                    continue
+                # Equal scores go to the more severe lane
+                ahead += lane.waiting_before_time(score - self._offset(severity), inclusive=other < rank)
+            return ahead
+
+    def estimate_wait_seconds(self, ticket: str) -> Optional[float]:
+        pos = self.position(ticket)
+        return None if pos is None else pos * self.service_interval
+
+    def wait_label(self, ticket: str) -> str:
+        entry = self._entries.get(ticket)
+        seconds = self.estimate_wait_seconds(ticket)
+        if entry is None or seconds is None or entry.severity == "Critical":
+            return "Immediate"
+        return format_wait(seconds)
+
+    def _lane_order(self, severity: str) -> Iterator[Tuple[float, int, int, str]]:
+        lane, rank = self._lanes[severity], SEVERITIES.index(severity)
+        for slot in lane.iter_waiting():
+            yield self._score(severity, lane.times[slot]), rank, slot, lane.tickets[slot]
+
+    def next_up(self, limit: int = 10) -> List[QueueEntry]:
+        """The next `limit` waiting patients in the order they will be called."""
+        with self._lock:
+            streams = [self._lane_order(sev) for sev in SEVERITIES if self._lanes[sev].count]
+            out = []
+            for _, _, _, ticket in heapq.merge(*streams):
+                out.append(self._entries[ticket])
+                if len(out) >= limit:
+                    break
+            return out
+
+    def tickets_for_patient(self, patient_id: int) -> List[QueueEntry]:
+        with self._lock:
+            return [e for e in self._entries.values() if e.patient_id == patient_id]
+
+    # -- bulk load ------------------------------------------------------------
+
+    def load(self, rows: Iterable[Tuple[str, str, int, datetime, str]]) -> int:
+        """Replace the queue with (ticket, severity, patient_id, timestamp, status) rows, oldest first."""
+        with self._lock:
+            self._lanes = {s: _Lane() for s in SEVERITIES}
+            self._entries = {}
+            n = 0
+            for ticket, severity, patient_id, ts, status in rows:
+                enqueued = _epoch(ts) if ts else self.clock()
+                self.admit(ticket, severity, patient_id, enqueued_at=enqueued, status=status or "waiting")
+                n += 1
+            for severity in SEVERITIES:
+                self._publish_depth(severity)
+            return n
+
+    def _publish_depth(self, severity: str) -> None:
+        QUEUE_WAITING.set(self._lanes[severity].count, severity=severity)
+
+
+def _epoch(ts: datetime) -> float:
+    # Record timestamps are naive UTC (datetime.utcnow)
+    return (ts - datetime(1970, 1, 1)).total_seconds() if ts.tzinfo is None else ts.timestamp()
+
+
+def format_wait(seconds: float) -> str:
+    """Estimated wait as the range the patient app shows, e.g. "20–40 minutes"."""
+    minutes = seconds / 60
+    low = 5 * math.floor(minutes * 0.8 / 5)
+    high = max(low + 5, 5 * math.ceil(minutes * 1.2 / 5))
+    return f"{low}–{high} minutes"
+
+
+_engine: Optional[TriageQueueEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_triage_queue() -> TriageQueueEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TriageQueueEngine(
+                    aging_seconds=settings.QUEUE_AGING_SECONDS,
+                    service_interval=settings.QUEUE_SERVICE_INTERVAL_SECONDS,
+                    ewma_alpha=settings.QUEUE_SERVICE_EWMA_ALPHA,
+                )
+    return _engine
+
+
+def rebuild_triage_queue() -> int:
+    """
+    Reload the queue from `triage_records`. Only open records from the last
+    QUEUE_REBUILD_MAX_AGE_HOURS are read (status/severity/timestamp index),
+    so startup time is bounded by the open queue, not the table's history.
+    """
+    from sqlalchemy import func
+
+    from app.core.database import SessionLocal
+    from app.models.triage_record import TriageRecord
+
+    engine = get_triage_queue()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=settings.QUEUE_REBUILD_MAX_AGE_HOURS)
+        rows = (
+            db.query(TriageRecord.ticket, TriageRecord.severity_label, TriageRecord.patient_id,
+                     TriageRecord.timestamp, TriageRecord.status)
+            .filter(TriageRecord.status.in_(("waiting", "in-progress")), TriageRecord.timestamp >= cutoff)
+            .order_by(TriageRecord.timestamp, TriageRecord.id)
+            .all()
+        )
+        # Highest ticket per (prefix, width): string max is numeric max at equal width
+        prefix, width = func.substr(TriageRecord.ticket, 1, 1), func.length(TriageRecord.ticket)
+        seeds = [t for (t,) in db.query(func.max(TriageRecord.ticket)).group_by(prefix, width).all() if t]
+    finally:
+        db.close()
+
+    engine.seed_tickets(seeds)
+    n = engine.load(rows)
+    logger.info("Triage queue rebuilt: %d open records in %.1f ms", n, 1000 * (time.perf_counter() - started))
+    return n
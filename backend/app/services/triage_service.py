@@ -1,70 +1,376 @@
 # backend/app/services/triage_service.py
-import json
-from groq import Groq
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from app.core import metrics
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.services.llm_client import LLMUnavailableError, get_llm_client
+from app.services.structured_output import (
+    JsonFieldScanner, StructuredOutputError, normalize_severity, parse_triage_decision,
+)
+from app.services.triage_queue import get_triage_queue
+from app.services.triage_writer import get_triage_writer
 
-client = Groq(api_key=settings.GROQ_API_KEY)
+logger = logging.getLogger(__name__)
 
-def save_triage_record(user_id, data):
-    from app.models.triage_record import TriageRecord
-    db = SessionLocal()
-    try:
-        record = TriageRecord(
-            patient_id=user_id,
-            symptoms=", ".join(data.get("symptoms", [])),
-            duration=data.get("duration", ""),
-            severity_label=data.get("severity", "Low"),
-            risk_factors=", ".join(data.get("risk_factors", [])),
-            ticket=data.get("ticket", ""),
-            wait_time=data.get("wait_time", ""),
-            status="waiting"
-        )
-        db.add(record)
-        db.commit()
-    finally:
-        db.close()
+# Part of the LLM cache key: bump when the triage prompt changes
+TRIAGE_PROMPT_VERSION = "triage-3"
+TRIAGE_MODEL = settings.LLM_MODEL
 
-async def analyze_triage(messages, user_id: int):
-    system_prompt = """
+TRIAGE_FAST_PATH = metrics.counter("triage_fast_path_total", "Rule-based triage attempts by outcome (hit = LLM skipped)")
+TRIAGE_FAST_PATH_SECONDS = metrics.histogram("triage_fast_path_seconds", "Local NER + rule scoring latency")
+TRIAGE_LLM_SECONDS = metrics.histogram("triage_llm_seconds", "LLM triage call latency")
+TRIAGE_LLM_SECONDS_SAVED = metrics.counter(
+    "triage_llm_seconds_saved_total", "Estimated LLM time avoided by the fast path (mean LLM latency - local latency)"
+)
+TRIAGE_LLM_PARSE = metrics.counter(
+    "triage_llm_parse_total", "LLM triage replies by result (ok | repaired | failed = the patient is asked to go again)"
+)
+TRIAGE_LLM_PARSE_FAILURES = metrics.counter(
+    "triage_llm_parse_failures_total", "Unusable LLM triage replies by stage (initial | repair) and reason (json | schema)"
+)
+TRIAGE_LLM_REPAIR_CALLS = metrics.counter("triage_llm_repair_calls_total", "Extra LLM calls spent on repair requests")
+TRIAGE_LLM_STREAM_ACTIONS = metrics.counter(
+    "triage_llm_stream_actions_total", "Decisions taken before the triage reply finished streaming (stop | ticket)"
+)
+TRIAGE_LLM_FALLBACK = metrics.counter(
+    "triage_llm_fallback_total", "Triages finalized by the rule table because no LLM backend answered"
+)
+
+TRIAGE_SYSTEM_PROMPT = """
 You are an AI triage assistant inside the ER.
 Never tell patient to go to ER—they're already there.
 
 Rules:
 - Ask max 2–3 short follow-ups
 - Then classify severity + ticket
-- Respond JSON only
+- Respond JSON only: one object, keys in this order
+  {"final": true|false, "severity": "Critical"|"High"|"Medium"|"Low"|null,
+   "symptoms": [strings], "duration": string, "risk_factors": [strings]}
+- "final" is false while follow-ups are still needed
+"""
+
+REPAIR_PROMPT = """
+Your last reply could not be used: {error}.
+Reply again with only the JSON object described in the instructions.
 """
 
-    res = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": str(messages)}
-        ],
-        temperature=0.2
+def _transcript(messages) -> str:
+    """The patient's messages as plain lines (not a Python list repr)."""
+    return "\n".join(str(m).strip() for m in messages if str(m).strip())
+
+async def _fast_path(text, session=None):
+    """
+    Local NER + rule scoring. A final result when confident, else None (ask the LLM).
+    With a session only `text` (the new message) goes through NER; the verdict
+    uses every symptom the session has collected.
+    """
+    from app.services.ai_chat_service import (
+        analyze_symptoms, fast_path_decision, has_negation, process_patient_input_async,
     )
+    from app.services.nlp_processing import model_status
 
-    raw = res.choices[0].message.content.strip()
-    if "{" in raw:
-        raw = raw[raw.index("{"): raw.rindex("}")+1]
+    if model_status().get("state") == "failed":
+        # Don't retry a broken model load on every triage; /health/ready reports it
+        TRIAGE_FAST_PATH.inc(outcome="unavailable")
+        return None
 
+    started = time.perf_counter()
     try:
-        data = json.loads(raw)
-    except:
-        return {"final": False}
+        analysis = await process_patient_input_async(text)
+        negated = has_negation(text)
+        if session is not None:
+            session.merge_state(analysis)
+            session.negated = session.negated or negated
+            analysis, negated = analyze_symptoms(session.symptoms), session.negated
+        data = fast_path_decision(analysis, negated)
+    except Exception:
+        # NER unavailable or failed: the LLM path still works
+        logger.exception("Triage fast path failed; using the LLM")
+        TRIAGE_FAST_PATH.inc(outcome="error")
+        return None
+    elapsed = time.perf_counter() - started
+    TRIAGE_FAST_PATH_SECONDS.observe(elapsed)
+
+    if data is None:
+        TRIAGE_FAST_PATH.inc(outcome="miss")
+        return None
+
+    TRIAGE_FAST_PATH.inc(outcome="hit")
+    if TRIAGE_LLM_SECONDS.count():
+        avg_llm = TRIAGE_LLM_SECONDS.sum() / TRIAGE_LLM_SECONDS.count()
+        TRIAGE_LLM_SECONDS_SAVED.inc(max(0.0, avg_llm - elapsed))
+    return data
+
+class _StreamWatch:
+    """
+    on_delta hook for a streamed triage reply. Stops the stream as soon as
+    `"final": false` arrives (the caller only needs that bit), and once
+    `final` and `severity` are both in, takes the patient's place in the
+    queue without waiting for the symptom list.
+    """
+
+    def __init__(self, user_id=None, stop_if_not_final=True):
+        self.scanner = JsonFieldScanner()
+        self.user_id = user_id
+        self.stop_if_not_final = stop_if_not_final
+        self.stopped = False
+        self.ticket = None
+
+    def __call__(self, delta: str) -> bool:
+        if not self.scanner.feed(delta):
+            return False
+        fields = self.scanner.fields
+        if fields.get("final") is False and self.stop_if_not_final:
+            self.stopped = True
+            TRIAGE_LLM_STREAM_ACTIONS.inc(action="stop")
+            return True
+        severity = normalize_severity(fields.get("severity"))
+        if fields.get("final") is True and severity and self.ticket is None and self.user_id is not None:
+            queue = get_triage_queue()
+            self.ticket = queue.issue_ticket(severity)
+            queue.admit(self.ticket, severity, self.user_id)
+            TRIAGE_LLM_STREAM_ACTIONS.inc(action="ticket")
+        return False
+
+    def release(self) -> None:
+        if self.ticket is not None:
+            get_triage_queue().discard(self.ticket)
+            self.ticket = None
+
+async def _llm_call(messages, temperature, on_delta=None):
+    options = {}
+    if on_delta is not None:
+        options["on_delta"] = on_delta  # the stream relies on the prompt + repair, not response_format
+    elif settings.TRIAGE_LLM_JSON_MODE:
+        options["response_format"] = {"type": "json_object"}
+    with metrics.span("triage_llm"):
+        return await get_llm_client().complete(
+            model=TRIAGE_MODEL,
+            messages=messages,
+            temperature=temperature,
+            prompt_version=TRIAGE_PROMPT_VERSION,
+            **options,
+        )
+
+async def _llm_triage(prompt_messages, user_id=None, stop_if_not_final=True):
+    """
+    One LLM triage decision as a dict (TriageDecision fields + source), or
+    {"final": False} when the reply stays unusable after the repair request.
+    A ticket reserved mid-stream comes back as data["ticket"].
+    """
+    watch = _StreamWatch(user_id, stop_if_not_final) if settings.TRIAGE_LLM_STREAM else None
+    retries = max(0, settings.TRIAGE_LLM_REPAIR_RETRIES)
+    decision = None
+    try:
+        started = time.perf_counter()
+        raw = await _llm_call(prompt_messages, 0.2, on_delta=watch)
+        TRIAGE_LLM_SECONDS.observe(time.perf_counter() - started)
+        if watch is not None and watch.stopped:
+            TRIAGE_LLM_PARSE.inc(result="ok")
+            return {"final": False, "source": "llm"}
+
+        messages = list(prompt_messages)
+        for attempt in range(retries + 1):
+            try:
+                decision = parse_triage_decision(raw)
+                break
+            except StructuredOutputError as exc:
+                TRIAGE_LLM_PARSE_FAILURES.inc(stage="repair" if attempt else "initial", reason=exc.reason)
+                if attempt == retries:
+                    logger.warning("Unusable LLM triage reply after %d repair request(s): %s", attempt, exc)
+                    TRIAGE_LLM_PARSE.inc(result="failed")
+                    return {"final": False}
+                messages += [
+                    {"role": "assistant", "content": raw[:2000]},
+                    {"role": "user", "content": REPAIR_PROMPT.format(error=exc)},
+                ]
+                TRIAGE_LLM_REPAIR_CALLS.inc()
+                raw = await _llm_call(messages, 0.0)
+    finally:
+        # Keep a mid-stream ticket only if the validated decision agrees with it
+        if watch is not None and watch.ticket is not None:
+            reserved = get_triage_queue().get(watch.ticket)
+            if decision is None or not decision.final or reserved is None or reserved.severity != decision.severity:
+                watch.release()
+
+    TRIAGE_LLM_PARSE.inc(result="repaired" if attempt else "ok")
+    data = decision.model_dump()
+    data["source"] = "llm"
+    if watch is not None and watch.ticket is not None:
+        data["ticket"] = watch.ticket
+    return data
+
+async def llm_triage(text: str):
+    """One LLM decision for a transcript, nothing queued or saved (offline re-triage)."""
+    return await _llm_triage([
+        {"role": "system", "content": TRIAGE_SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ])
+
+async def _rules_fallback(text, session=None):
+    """
+    Rule-table verdict for when no LLM backend answers, so the patient is
+    still queued instead of getting an error. NER when the model works, else
+    the model-free fragment splitter; with a session, everything it collected.
+    Final only if a symptom matched a rule term (TRIAGE_FALLBACK_MIN_SCORE);
+    otherwise the patient is asked to go on, e.g. after a bare "hi".
+    """
+    from app.services.ai_chat_service import analyze_symptoms, fragment_symptoms, process_patient_input_async
+    from app.services.nlp_processing import model_status
+
+    symptoms = []
+    if text.strip() and model_status().get("state") != "failed":
+        try:
+            symptoms = (await process_patient_input_async(text))["symptoms"]
+        except Exception:
+            logger.warning("NER failed in the triage fallback; splitting the text instead")
+    if text.strip() and not symptoms:
+        symptoms = fragment_symptoms(text)
+    if session is not None:
+        session.merge_state({"symptoms": symptoms})
+        symptoms = session.symptoms or symptoms
+
+    analysis = analyze_symptoms(symptoms or fragment_symptoms(text))
+    if analysis["matched_term"] is None or analysis["match_score"] < settings.TRIAGE_FALLBACK_MIN_SCORE:
+        return {"final": False, "source": "rules-fallback"}
+    TRIAGE_LLM_FALLBACK.inc()
+    return {
+        "final": True,
+        "severity": analysis["severity_guess"],
+        "symptoms": analysis["symptoms"],
+        "duration": "",
+        "risk_factors": [],
+        "rule_version": analysis["rule_version"],
+        "source": "rules-fallback",
+    }
+
+async def _finalize(data, user_id: int):
+    # Unique ticket + live wait estimate from the queue engine
+    queue = get_triage_queue()
+    severity = data.get("severity") or "Low"
+    ticket = data.get("ticket")
+    if ticket is None or queue.get(ticket) is None:
+        ticket = queue.issue_ticket(severity)
+        queue.admit(ticket, severity, user_id)
+    data["ticket"] = ticket
+    data["wait_time"] = queue.wait_label(ticket)
+    data["position"] = queue.position(ticket)
+
+    # Batched write-behind; waits for the commit unless TRIAGE_WRITE_MODE=enqueue.
+    # Shielded: a client that disconnects now still gets its row and its place.
+    with metrics.span("save_triage_record"):
+        await asyncio.shield(_save(queue, ticket, user_id, data))
+    return data
+
+async def _save(queue, ticket, user_id: int, data):
+    try:
+        await get_triage_writer().save(user_id, data)
+    except Exception:
+        queue.discard(ticket)  # no row, so no place in the queue either
+        raise
+
+class _OpenTriages:
+    """
+    Patients whose last /triage/process answer asked for more, so admission
+    can rank their next message as an ongoing triage from server-side state
+    rather than from the history the client posts. LRU + idle TTL.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 7200):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, float]" = OrderedDict()  # user id -> last activity
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int) -> None:
+        with self._lock:
+            self._entries[user_id] = time.time()
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def __contains__(self, user_id: int) -> bool:
+        with self._lock:
+            seen = self._entries.get(user_id)
+            return seen is not None and time.time() - seen <= self.ttl
+
+_open_triages = _OpenTriages(
+    max_entries=settings.CONVERSATION_MAX_SESSIONS,
+    ttl=settings.CONVERSATION_SESSION_TTL_SECONDS,
+)
+
+def triage_in_progress(user_id: int) -> bool:
+    """Whether the patient's stateless triage is waiting on their next message."""
+    return user_id in _open_triages
+
+async def analyze_triage(messages, user_id: int):
+    text = _transcript(messages)
+
+    # Tier 1: clear-cut cases are finalized locally; tier 2: the LLM
+    data = await _fast_path(text) if settings.TRIAGE_FAST_PATH else None
+    if data is None:
+        try:
+            data = await _llm_triage([
+                {"role": "system", "content": TRIAGE_SYSTEM_PROMPT},
+                {"role": "user", "content": text},
+            ], user_id)
+        except LLMUnavailableError as e:
+            logger.warning("No LLM backend answered (%s); triaging with the rule table", e)
+            data = await _rules_fallback(text)
 
     # 💡 Multi-turn logic — if model isn't final, keep chatting
     if not data.get("final"):
+        _open_triages.mark(user_id)
         return {"final": False}
 
-    severity = data.get("severity", "Low")
-    ticket_prefix = {"Critical":"P","High":"A","Medium":"B","Low":"C"}.get(severity,"C")
-    ticket = f"{ticket_prefix}{1000+user_id}"
-    data["ticket"] = ticket
+    _open_triages.clear(user_id)
+    return await _finalize(data, user_id)
 
-    wait = {"Critical":"Immediate","High":"5–15 minutes","Medium":"20–40 minutes","Low":"45–90 minutes"}
-    data["wait_time"] = wait.get(severity,"45–90 minutes")
+async def analyze_triage_session(session, message, user_id: int):
+    """
+    analyze_triage for a server-side conversation. `message` (optional) is the
+    new patient message; turns already added through /chat count too. Only
+    text not seen before goes through NER, and the model gets the session's
+    compact state + recent turns rather than the full history.
+    Callers hold the session lock and save the session afterwards.
+    """
+    from app.services.conversation_store import get_conversation_store
 
-    save_triage_record(user_id, data)
-    return data
+    if session.result is not None:
+        return session.result  # already ticketed; a re-post must not queue the patient twice
+
+    if message:
+        session.add_turn("patient", message)
+
+    # Read once: both the fast path and the rules fallback work on this text
+    new_text = session.take_new_patient_text()
+    data = None
+    if settings.TRIAGE_FAST_PATH and new_text:
+        data = await _fast_path(new_text, session)
+    if data is None:
+        prompt = get_conversation_store().build_messages(session, TRIAGE_SYSTEM_PROMPT)
+        try:
+            # Keep streaming past "final": false, the session wants the symptoms too
+            data = await _llm_triage(prompt, user_id, stop_if_not_final=False)
+            session.merge_state(data)
+        except LLMUnavailableError as e:
+            logger.warning("No LLM backend answered (%s); triaging with the rule table", e)
+            text = new_text
+            if not session.symptoms:
+                text = "\n".join(t["content"] for t in session.turns if t["role"] == "patient")
+            data = await _rules_fallback(text, session)
+
+    if not data.get("final"):
+        return {"final": False}
+
+    # Report everything the conversation established, not just this turn's view
+    data.update({k: v for k, v in session.state().items() if v})
+    session.result = await _finalize(data, user_id)
+    return session.result
@@ -0,0 +1,162 @@
+# backend/app/services/triage_terms.py
+"""
+Triage Terms
+------------
+Symptoms and risk factors as rows (`triage_terms`) instead of comma-joined
+text, so clinical queries ("all chest pain cases in the last 6 hours") hit
+an index instead of `LIKE '%...%'` over every record.
+
+- Exact lookups use the (kind, term, record_id) index.
+- Free-text search uses an FTS5 table on SQLite, kept in sync by triggers;
+  other databases fall back to a substring match on the normalized terms.
+
+Terms are written together with the record (see build_triage_record) and
+older rows are backfilled by the startup migrations.
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import exists, false, select, text
+from sqlalchemy.engine import Engine
+
+from app.models.triage_record import TriageRecord, TriageTerm
+
+TERM_KINDS = ("symptom", "risk_factor")
+FTS_TABLE = "triage_terms_fts"
+
+_WS = re.compile(r"\s+")
+_TOKEN = re.compile(r"\w+")
+
+_fts_enabled = False
+
+_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(term, content='triage_terms', content_rowid='id')",
+    f"""CREATE TRIGGER IF NOT EXISTS triage_terms_ai AFTER INSERT ON triage_terms BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, term) VALUES (new.id, new.term);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS triage_terms_ad AFTER DELETE ON triage_terms BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, term) VALUES ('delete', old.id, old.term);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS triage_terms_au AFTER UPDATE ON triage_terms BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, term) VALUES ('delete', old.id, old.term);
+        INSERT INTO {FTS_TABLE}(rowid, term) VALUES (new.id, new.term);
+    END""",
+)
+
+
+def normalize_term(term: str) -> str:
+    return _WS.sub(" ", term or "").strip().lower()
+
+
+def split_terms(joined: Optional[str]) -> List[str]:
+    """Unique normalized terms of a comma-joined column, in order."""
+    seen = []
+    for part in (joined or "").split(","):
+        term = normalize_term(part)
+        if term and term not in seen:
+            seen.append(term)
+    return seen
+
+
+def build_terms(symptoms: Optional[str], risk_factors: Optional[str]) -> List[TriageTerm]:
+    return (
+        [TriageTerm(kind="symptom", term=t) for t in split_terms(symptoms)]
+        + [TriageTerm(kind="risk_factor", term=t) for t in split_terms(risk_factors)]
+    )
+
+
+# ---------------------------------------------------------------------------
+# Query clauses for TriageRecord
+# ---------------------------------------------------------------------------
+
+def has_terms(kind: str, terms: Iterable[str]):
+    """Records with any of `terms` (exact, normalized) of the given kind."""
+    wanted = [normalize_term(t) for t in terms if normalize_term(t)]
+    return exists().where(
+        TriageTerm.record_id == TriageRecord.id,
+        TriageTerm.kind == kind,
+        TriageTerm.term.in_(wanted),
+    )
+
+
+def _fts_query(query: str) -> str:
+    # Quote every token so user input can't use FTS syntax; prefix-match the last one
+    tokens = [f'"{t}"' for t in _TOKEN.findall(query.lower())]
+    if tokens:
+        tokens[-1] += "*"
+    return " ".join(tokens)
+
+
+def matches_text(query: str):
+    """Records with a symptom or risk factor matching free text (FTS5 where available)."""
+    if _fts_enabled:
+        match = _fts_query(query)
+        if not match:
+            return false()
+        term_ids = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match").bindparams(match=match)
+        condition = TriageTerm.id.in_(term_ids)
+    else:
+        condition = TriageTerm.term.contains(normalize_term(query), autoescape=True)
+    return exists().where(TriageTerm.record_id == TriageRecord.id, condition)
+
+
+# ---------------------------------------------------------------------------
+# Schema upkeep (called from run_migrations)
+# ---------------------------------------------------------------------------
+
+def ensure_fts(engine: Engine) -> bool:
+    """Create the FTS5 index and its sync triggers on SQLite. Returns whether FTS is in use."""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        _fts_enabled = False
+        return False
+
+    with engine.begin() as conn:
+        present = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        if not present:
+            try:
+                conn.execute(text(_FTS_DDL[0]))
+            except Exception:
+                # SQLite built without FTS5
+                _fts_enabled = False
+                return False
+            # Index terms that already exist
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        for ddl in _FTS_DDL[1:]:
+            conn.execute(text(ddl))
+
+    _fts_enabled = True
+    return True
+
+
+def backfill_terms(engine: Engine, chunk: int = 1000) -> int:
+    """Populate triage_terms for records written before it existed. Idempotent."""
+    written = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(TriageRecord.id, TriageRecord.symptoms, TriageRecord.risk_factors)
+                .where(
+                    TriageRecord.id > last_id,
+                    ~exists().where(TriageTerm.record_id == TriageRecord.id),
+                )
+                .order_by(TriageRecord.id)
+                .limit(chunk)
+            ).all()
+            if not rows:
+                return written
+
+            values = [
+                {"record_id": row.id, "kind": kind, "term": term}
+                for row in rows
+                for kind, joined in (("symptom", row.symptoms), ("risk_factor", row.risk_factors))
+                for term in split_terms(joined)
+            ]
+            if values:
+                conn.execute(TriageTerm.__table__.insert(), values)
+            written += len(values)
+            last_id = rows[-1].id
@@ -0,0 +1,202 @@
+# backend/app/services/triage_writer.py
+"""
+Triage Write-Behind
+-------------------
+Batches TriageRecord inserts into multi-row transactions.
+
+Finalized triages are queued; a flusher task on the event loop waits for
+the first one, gathers whatever else arrives within TRIAGE_WRITE_FLUSH_MS
+(up to TRIAGE_WRITE_BATCH_MAX) and commits them together — one fsync for
+the whole batch instead of one per patient.
+
+TRIAGE_WRITE_MODE picks the durability guarantee:
+- commit  : save() returns once the batch containing the record committed
+- enqueue : save() returns as soon as the record is queued (a crash can
+            lose the last few ms of triages)
+- direct  : no batching, one transaction per record (previous behaviour)
+
+Queue events for dashboards are published after the batch commits.
+The lifespan calls close(), which flushes everything still queued.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.triage_queue import get_triage_queue
+
+logger = logging.getLogger(__name__)
+
+WRITE_MODES = ("commit", "enqueue", "direct")
+
+TRIAGE_WRITE_BATCH = metrics.histogram(
+    "triage_write_batch_size", "Records per write-behind commit", buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+TRIAGE_WRITE_QUEUED = metrics.gauge("triage_write_queued", "Triage records waiting to be written")
+TRIAGE_WRITE_FAILED = metrics.counter("triage_write_failed_total", "Triage records that could not be written")
+
+_Item = Tuple[int, Dict[str, Any], Optional[asyncio.Future]]
+_STOP = object()  # queued by close(): flush what came before it, then exit
+
+
+def build_triage_record(user_id, data):
+    from app.models.triage_record import TriageRecord
+    from app.services.severity_rules import get_rules
+    from app.services.triage_terms import build_terms
+    symptoms = ", ".join(data.get("symptoms", []))
+    risk_factors = ", ".join(data.get("risk_factors", []))
+    return TriageRecord(
+        patient_id=user_id,
+        symptoms=symptoms,
+        duration=data.get("duration", ""),
+        severity_label=data.get("severity", "Low"),
+        risk_factors=risk_factors,
+        ticket=data.get("ticket", ""),
+        wait_time=data.get("wait_time", ""),
+        status="waiting",
+        rule_version=data.get("rule_version") or get_rules().version,
+        terms=build_terms(symptoms, risk_factors),
+    )
+
+
+async def _insert(items: List[_Item]) -> list:
+    from app.services.patient_queue import serialize_record
+    from app.services.queue_events import publish_queue_event
+
+    async with AsyncSessionLocal() as db:
+        records = [build_triage_record(user_id, data) for user_id, data, _ in items]
+        db.add_all(records)
+        await db.commit()
+
+    # expire_on_commit=False: ids and defaults are already on the objects
+    for record in records:
+        publish_queue_event("created", serialize_record(record))
+    return records
+
+
+class TriageWriteBehind:
+    def __init__(self, mode: str = "commit", flush_ms: float = 20, batch_max: int = 200, queue_max: int = 10_000):
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unknown TRIAGE_WRITE_MODE: {mode}")
+        self.mode = mode
+        self.flush_interval = flush_ms / 1000.0
+        self.batch_max = batch_max
+        self._queue_max = queue_max
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self._queue_max)
+            self._closing = False
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="triage-write-behind")
+
+    async def save(self, user_id: int, data: Dict[str, Any]) -> None:
+        if self.mode == "direct" or self._closing:
+            await _insert([(user_id, data, None)])
+            return
+
+        self.start()
+        future = asyncio.get_running_loop().create_future() if self.mode == "commit" else None
+        await self._queue.put((user_id, data, future))  # waits when the queue is full: backpressure
+        TRIAGE_WRITE_QUEUED.inc()
+        if future is not None:
+            await future
+
+    async def _collect(self) -> Tuple[List[_Item], bool]:
+        """Next batch, and whether close() asked the flusher to stop after it."""
+        batch: List[_Item] = []
+        item = await self._queue.get()
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.batch_max:
+                return batch, False
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                return batch, False
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return batch, False
+        return batch, True
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        if not batch:
+            return
+        TRIAGE_WRITE_QUEUED.dec(len(batch))
+        TRIAGE_WRITE_BATCH.observe(len(batch))
+        try:
+            await _insert(batch)
+            _resolve(batch)
+            return
+        except Exception:
+            logger.exception("Batched insert of %d triage records failed; retrying one by one", len(batch))
+
+        # Isolate the bad record(s) so one failure doesn't drop the whole batch
+        for item in batch:
+            try:
+                await _insert([item])
+                _resolve([item])
+            except Exception as e:
+                TRIAGE_WRITE_FAILED.inc()
+                logger.exception("Lost triage record for patient %s: %s", item[0], item[1])
+                get_triage_queue().discard(item[1].get("ticket"))
+                _resolve([item], e)
+
+    async def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = await self._collect()
+            # Shielded: a cancelled flusher must not abandon a batch mid-commit
+            await asyncio.shield(self._flush(batch))
+
+    async def close(self) -> None:
+        """Stop batching and write everything still queued. Later saves go straight to the DB."""
+        self._closing = True
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+        # Saves that were blocked on a full queue when close() started
+        pending: List[_Item] = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for i in range(0, len(pending), self.batch_max):
+            await self._flush(pending[i:i + self.batch_max])
+
+
+def _resolve(items: List[_Item], error: Optional[BaseException] = None) -> None:
+    for _, _, future in items:
+        if future is None or future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+
+_writer: Optional[TriageWriteBehind] = None
+
+
+def get_triage_writer() -> TriageWriteBehind:
+    global _writer
+    if _writer is None:
+        _writer = TriageWriteBehind(
+            mode=settings.TRIAGE_WRITE_MODE,
+            flush_ms=settings.TRIAGE_WRITE_FLUSH_MS,
+            batch_max=settings.TRIAGE_WRITE_BATCH_MAX,
+            queue_max=settings.TRIAGE_WRITE_QUEUE_MAX,
+        )
+    return _writer
+
+
+async def close_triage_writer() -> None:
+    if _writer is not None:
+        await _writer.close()
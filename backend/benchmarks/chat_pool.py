@@ -0,0 +1,78 @@
+# backend/benchmarks/chat_pool.py
+"""
+Chat Pool Load Test
+-------------------
+Simulates many patients sending a /chat/ turn at once against the stub LLM
+and reports per-request latency plus the LLM client pool metrics.
+
+Run from backend/:
+    python -m benchmarks.chat_pool --patients 200 --concurrency 32 --delay 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+
+async def _run(n: int):
+    import httpx
+    import main
+    from app.core.deps import get_current_user
+    from app.services import llm_client
+
+    main.app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="load@test")
+
+    async def one(client, i):
+        started = time.perf_counter()
+        r = await client.post("/chat/", json={"history": [{"role": "patient", "content": f"headache #{i}"}]})
+        r.raise_for_status()
+        return time.perf_counter() - started
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=300) as client:
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*[one(client, i) for i in range(n)])
+        elapsed = time.perf_counter() - started
+
+    pool = llm_client.get_llm_client().pool_connections()
+    await llm_client.close_llm_client()
+    return latencies, elapsed, pool
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help="LLM_MAX_CONCURRENCY for the app")
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    stub = create_stub_app(delay=args.delay, reply="Where exactly does it hurt?")
+    with StubServer(stub, port=args.port) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "GROQ_API_KEY": "stub",
+            "GROQ_BASE_URL": server.url,
+            "LLM_MAX_CONCURRENCY": str(args.concurrency),
+            "DATABASE_URL": f"sqlite:///{tmp}/load.db",
+        })
+        latencies, elapsed, pool = asyncio.run(_run(args.patients))
+
+    from app.services.llm_client import LLM_QUEUE_WAIT
+
+    q = statistics.quantiles(latencies, n=100)
+    print(f"patients:            {args.patients}")
+    print(f"wall time:           {elapsed:.2f}s  ({args.patients / elapsed:.1f} req/s)")
+    print(f"latency p50/p95/p99: {q[49]:.3f}s / {q[94]:.3f}s / {q[98]:.3f}s")
+    print(f"mean queue wait:     {LLM_QUEUE_WAIT.sum() / max(LLM_QUEUE_WAIT.count(), 1):.3f}s")
+    print(f"max stub in-flight:  {stub.state.max_in_flight}")
+    print(f"pooled connections:  {pool}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,72 @@
+# backend/benchmarks/fast_path_eval.py
+"""
+Triage Fast Path Evaluation
+---------------------------
+Replays recorded conversations through the rule-based fast path offline
+and reports how often it would skip the LLM and how often it is wrong
+when it does.
+
+Replay file: JSONL, one conversation per line:
+    {"messages": ["patient message", ...], "expected": "Critical"}
+`expected` is the reference severity (clinician or recorded LLM label).
+
+--extractor ner uses the clinical NER model like production; fragments
+splits the text on punctuation/conjunctions instead, for machines without
+the model.
+
+Run from backend/:
+    python -m benchmarks.fast_path_eval --replay benchmarks/data/triage_replay.jsonl
+    TRIAGE_FAST_PATH_MIN_SCORE=90 python -m benchmarks.fast_path_eval --extractor fragments
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+DEFAULT_REPLAY = os.path.join(os.path.dirname(__file__), "data", "triage_replay.jsonl")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replay", default=DEFAULT_REPLAY)
+    parser.add_argument("--extractor", choices=("ner", "fragments"), default="ner")
+    parser.add_argument("--llm-seconds", type=float, default=2.5, help="assumed LLM triage latency, for time saved")
+    parser.add_argument("--show-misses", action="store_true", help="print every wrong fast-path decision")
+    args = parser.parse_args()
+
+    from app.services.ai_chat_service import analyze_symptoms, fast_path_decision, fragment_symptoms, has_negation
+    from app.services.nlp_processing import extract_symptoms_batch
+
+    with open(args.replay, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    texts = ["\n".join(c["messages"]) for c in cases]
+
+    started = time.perf_counter()
+    if args.extractor == "ner":
+        symptom_lists = extract_symptoms_batch(texts)
+    else:
+        symptom_lists = [fragment_symptoms(t) for t in texts]
+    decisions = [fast_path_decision(analyze_symptoms(s), has_negation(t)) for t, s in zip(texts, symptom_lists)]
+    local_seconds = time.perf_counter() - started
+
+    hits = [(c, d) for c, d in zip(cases, decisions) if d is not None]
+    wrong = [(c, d) for c, d in hits if c.get("expected") and d["severity"] != c["expected"]]
+    by_expected = Counter(c.get("expected", "?") for c in cases)
+    hit_by_expected = Counter(c.get("expected", "?") for c, _ in hits)
+
+    print(f"conversations:      {len(cases)}  ({args.extractor}, local stage {1000 * local_seconds / max(len(cases), 1):.1f} ms each)")
+    print(f"fast-path hits:     {len(hits)} ({100 * len(hits) / max(len(cases), 1):.0f}%)")
+    print(f"wrong when hit:     {len(wrong)}" + (f" ({100 * len(wrong) / len(hits):.0f}% of hits)" if hits else ""))
+    for label, total in sorted(by_expected.items()):
+        print(f"  expected {label:8s} {hit_by_expected[label]:4d} / {total:4d} finalized locally")
+    print(f"LLM time saved:     ~{len(hits) * args.llm_seconds:.0f}s at {args.llm_seconds}s per call")
+
+    if args.show_misses:
+        for c, d in wrong:
+            print(f"  WRONG {d['severity']} (expected {c['expected']}): {c['messages']} -> {d['symptoms']}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,158 @@
+# backend/benchmarks/llm_router.py
+"""
+LLM Router Fault Test
+---------------------
+Drives the LLM routing layer against two local stub servers, a primary
+with injected latency spikes / errors and a healthy secondary (standing in
+for a local model server), and reports latency and failures per scenario:
+
+- single:   primary only, no hedging (the tail the patient sees today)
+- hedged:   primary + secondary, hedge after --hedge-ms
+- outage:   the primary fails every call; its breaker should open and
+            traffic should move to the secondary
+- all-down: both fail; calls end in LLMUnavailableError and triage
+            falls back to the rule table (fallback latency reported)
+
+Run from backend/:
+    python -m benchmarks.llm_router
+    python -m benchmarks.llm_router --requests 400 --slow-rate 0.1 --slow-delay 2 --hedge-ms 300
+    python -m benchmarks.llm_router --save router.json
+    python -m benchmarks.llm_router --compare router.json
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List
+
+from benchmarks import reporting
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+MESSAGES = [{"role": "user", "content": "I have chest pain and my left arm feels numb"}]
+
+
+def _client(urls: Dict[str, str], hedge_ms: float, timeout: float, breaker: Dict[str, Any]):
+    from app.services.llm_client import CircuitBreaker, LLMBackend, LLMClient
+
+    backends = [
+        LLMBackend(name, kind="openai", base_url=f"{url}/v1", breaker=CircuitBreaker(name=name, **breaker))
+        for name, url in urls.items()
+    ]
+    return LLMClient(backends, timeout=timeout, hedge_after=hedge_ms / 1000.0 if hedge_ms else None)
+
+
+async def _drive(client, requests: int, concurrency: int) -> Dict[str, Any]:
+    from app.services.llm_client import LLMUnavailableError
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with sem:
+            started = time.perf_counter()
+            try:
+                await client.complete(MESSAGES + [{"role": "user", "content": str(i)}], model="stub", temperature=0.2)
+            except LLMUnavailableError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    result = reporting.summarize(latencies, errors, time.perf_counter() - started)
+    result["breakers"] = {b.name: b.breaker.state for b in client.backends}
+    await client.aclose()
+    return result
+
+
+async def _fallback(requests: int) -> Dict[str, float]:
+    from app.services.triage_service import _rules_fallback
+
+    await _rules_fallback(MESSAGES[0]["content"])  # warm-up (NER model load, or its failure offline)
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        t = time.perf_counter()
+        await _rules_fallback(MESSAGES[0]["content"])
+        latencies.append(time.perf_counter() - t)
+    return reporting.summarize(latencies, wall=time.perf_counter() - started)
+
+
+async def _run(args, primary, secondary) -> Dict[str, Dict[str, Any]]:
+    from app.services import llm_client
+
+    urls = {"primary": primary.url, "secondary": secondary.url}
+    breaker = {"window": args.breaker_window, "error_rate": args.breaker_error_rate,
+               "min_calls": args.breaker_min_calls, "cooldown": 60.0}
+    p, s = primary.app.state, secondary.app.state
+    results: Dict[str, Dict[str, Any]] = {}
+
+    p.slow_rate, p.error_rate = args.slow_rate, args.error_rate
+    results["single"] = await _drive(
+        _client({"primary": primary.url}, 0, args.timeout, breaker), args.requests, args.concurrency
+    )
+
+    hedges_before = llm_client.LLM_HEDGES.value(backend="secondary", result="sent")
+    results["hedged"] = await _drive(_client(urls, args.hedge_ms, args.timeout, breaker), args.requests, args.concurrency)
+    results["hedged"]["hedges"] = llm_client.LLM_HEDGES.value(backend="secondary", result="sent") - hedges_before
+
+    p.slow_rate, p.error_rate = 0.0, 1.0
+    primary_before = p.requests
+    results["outage"] = await _drive(_client(urls, args.hedge_ms, args.timeout, breaker), args.requests, args.concurrency)
+    results["outage"]["primary_calls"] = p.requests - primary_before
+
+    s.error_rate = 1.0
+    results["all-down"] = await _drive(_client(urls, args.hedge_ms, args.timeout, breaker), args.requests, args.concurrency)
+    results["rules fallback"] = await _fallback(min(args.requests, 50))
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.1, help="stub time to answer")
+    parser.add_argument("--slow-rate", type=float, default=0.1, help="primary: share of slow answers")
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="primary: extra seconds when slow")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="primary: share of HTTP 500s")
+    parser.add_argument("--hedge-ms", type=float, default=300.0)
+    parser.add_argument("--timeout", type=float, default=5.0, help="per-call deadline")
+    parser.add_argument("--breaker-window", type=int, default=20)
+    parser.add_argument("--breaker-error-rate", type=float, default=0.5)
+    parser.add_argument("--breaker-min-calls", type=int, default=5)
+    parser.add_argument("--port", type=int, default=9110, help="primary; the secondary uses port + 1")
+    parser.add_argument("--save")
+    parser.add_argument("--compare")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    os.environ.setdefault("NER_PRELOAD", "false")
+    primary_app = create_stub_app(delay=args.delay, slow_delay=args.slow_delay, seed=1)
+    secondary_app = create_stub_app(delay=args.delay, seed=2)
+    with StubServer(primary_app, port=args.port) as primary, StubServer(secondary_app, port=args.port + 1) as secondary:
+        results = asyncio.run(_run(args, primary, secondary))
+
+    print(f"{args.requests} calls per scenario, concurrency {args.concurrency}, deadline {args.timeout:.1f}s; "
+          f"primary: {args.slow_rate:.0%} slow (+{args.slow_delay:.1f}s), {args.error_rate:.0%} errors")
+    print(f"hedged: {results['hedged']['hedges']:.0f} hedges sent after {args.hedge_ms:.0f}ms; "
+          f"outage: {results['outage']['primary_calls']} calls reached the primary "
+          f"(breakers: {results['outage']['breakers']})")
+    print()
+    rows = {name: {k: v for k, v in r.items() if isinstance(v, (int, float))} for name, r in results.items()}
+    reporting.print_table(rows, title="scenario")
+
+    if args.save:
+        reporting.save(args.save, rows)
+    if args.compare:
+        regressions = reporting.compare(args.compare, rows, max_regression=args.max_regression)
+        if regressions:
+            print("\nRegressions against " + args.compare + ":")
+            print("\n".join("  " + r for r in regressions))
+            raise SystemExit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main_cli()
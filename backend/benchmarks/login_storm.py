@@ -0,0 +1,91 @@
+# backend/benchmarks/login_storm.py
+"""
+Login Storm Benchmark
+---------------------
+Fires a burst of concurrent /auth/login requests (a shift change) while a
+probe keeps polling a cheap authenticated endpoint, and reports how the
+probe's latency holds up and how many logins were shed with 503.
+
+Run from backend/:
+    python -m benchmarks.login_storm --logins 300 --workers 4 --queue 64
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+async def _run(logins: int, probe_interval: float):
+    import httpx
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=600) as client:
+        creds = {"email": "storm@example.com", "password": "hunter22"}
+        await client.post("/auth/register", json={"name": "Storm", "role": "doctor", **creds})
+        token = (await client.post("/auth/login", json=creds)).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                r = await client.get("/auth/me", headers=auth)
+                r.raise_for_status()
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(probe_interval)
+
+        async def storm():
+            started = time.perf_counter()
+            results = await asyncio.gather(*[client.post("/auth/login", json=creds) for _ in range(logins)])
+            elapsed = time.perf_counter() - started
+            done.set()
+            return results, elapsed
+
+        probe_task = asyncio.create_task(probe())
+        results, elapsed = await storm()
+        await probe_task
+
+    return results, elapsed, probe_latencies
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--queue", type=int, default=64, help="PASSWORD_HASH_QUEUE")
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS")
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{tmp}/storm.db",
+            "PASSWORD_HASH_WORKERS": str(args.workers),
+            "PASSWORD_HASH_QUEUE": str(args.queue),
+            "BCRYPT_ROUNDS": str(args.rounds),
+            "NER_PRELOAD": "false",
+        })
+        results, elapsed, probes = asyncio.run(_run(args.logins, args.probe_interval))
+
+    codes = {}
+    for r in results:
+        codes[r.status_code] = codes.get(r.status_code, 0) + 1
+    retry_after = [r.headers.get("retry-after") for r in results if r.status_code == 503]
+
+    print(f"logins:              {args.logins} in {elapsed:.2f}s  {codes}")
+    if retry_after:
+        print(f"Retry-After values:  {sorted(set(retry_after), key=int)}")
+    if len(probes) >= 2:
+        q = statistics.quantiles(probes, n=100)
+        print(f"probe /auth/me:      n={len(probes)} p50={1000 * q[49]:.1f}ms "
+              f"p95={1000 * q[94]:.1f}ms max={1000 * max(probes):.1f}ms")
+
+
+if __name__ == "__main__":
+    main_cli()
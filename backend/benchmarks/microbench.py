@@ -0,0 +1,117 @@
+# backend/benchmarks/microbench.py
+"""
+Hot-Path Microbenchmarks
+------------------------
+Times the per-request building blocks in isolation:
+
+- calculate_severity            (rule table + fuzzy matcher)
+- extract_symptoms              (clinical NER; skipped if the model can't load)
+- _convert_history_to_openai_messages (chat prompt assembly)
+
+Each case runs NUMBER calls per sample for SAMPLES samples; the table shows
+per-call p50/p95/p99 in microseconds and calls/second. --save / --compare
+work as in mixed_load, with a tighter noise floor.
+
+Run from backend/:
+    python -m benchmarks.microbench
+    python -m benchmarks.microbench --skip-ner --save micro.json
+    python -m benchmarks.microbench --skip-ner --compare micro.json
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, Dict, List
+
+from benchmarks import reporting
+
+SYMPTOM_CASES = {
+    "1 symptom": ["chest pain"],
+    "3 symptoms": ["headache", "fever", "stiff neck"],
+    "8 symptoms": ["nausea", "vomiting", "dizziness", "blurred vision", "back pain",
+                   "shortness of breath", "rash", "numbness in left arm"],
+}
+NER_CASES = {
+    "short": "I have chest pain",
+    "long": "I have had a fever and a bad cough for three days, my chest hurts when I breathe "
+            "and I feel dizzy when I stand up. I have diabetes and high blood pressure.",
+}
+
+
+def _history(turns: int) -> List[Dict[str, str]]:
+    history = []
+    for i in range(turns):
+        role = "patient" if i % 2 == 0 else "ai"
+        history.append({"role": role, "content": f"message {i}: my head hurts and I feel dizzy since this morning"})
+    return history
+
+
+def bench(fn: Callable[[], object], number: int, samples: int) -> Dict[str, float]:
+    fn()  # warm-up (caches, lazy loads)
+    per_call: List[float] = []
+    started = time.perf_counter()
+    for _ in range(samples):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - t) / number)
+    wall = time.perf_counter() - started
+    result = reporting.summarize(per_call, wall=wall)
+    result["rps"] = number * samples / wall
+    return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200, help="calls per sample")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--ner-number", type=int, default=5, help="calls per sample for NER")
+    parser.add_argument("--skip-ner", action="store_true")
+    parser.add_argument("--save")
+    parser.add_argument("--compare")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    os.environ.setdefault("NER_PRELOAD", "false")
+    from app.services.groq_chat_service import _convert_history_to_openai_messages
+    from app.services.severity_scoring import calculate_severity
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, symptoms in SYMPTOM_CASES.items():
+        results[f"calculate_severity[{name}]"] = bench(lambda s=symptoms: calculate_severity(s), args.number, args.samples)
+
+    for turns in (2, 20, 100):
+        history = _history(turns)
+        results[f"convert_history[{turns} turns]"] = bench(
+            lambda h=history: _convert_history_to_openai_messages(h), args.number, args.samples
+        )
+
+    if not args.skip_ner:
+        from app.services.nlp_processing import extract_symptoms, load_model
+        try:
+            load_model()
+        except Exception as e:
+            print(f"extract_symptoms skipped: NER model unavailable ({e.__class__.__name__}: {e})\n")
+        else:
+            for name, text in NER_CASES.items():
+                results[f"extract_symptoms[{name}]"] = bench(
+                    lambda t=text: extract_symptoms(t), args.ner_number, max(5, args.samples // 5)
+                )
+
+    reporting.print_table(results, title="case", unit="us")
+
+    if args.save:
+        reporting.save(args.save, results)
+    if args.compare:
+        regressions = reporting.compare(
+            args.compare, results, metric="p50_ms", max_regression=args.max_regression, noise_floor_ms=0.002
+        )
+        if regressions:
+            print("\nRegressions against " + args.compare + ":")
+            print("\n".join("  " + r for r in regressions))
+            raise SystemExit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,260 @@
+# backend/benchmarks/mixed_load.py
+"""
+Mixed Traffic Load Test
+-----------------------
+Boots main.app (lifespan included) against the local stub LLM and drives
+realistic traffic at scripted concurrency:
+
+- patients: log in, then alternate a chat turn and a triage call until the
+  triage returns a ticket (TURNS turns, with THINK seconds in between).
+  --api legacy resends the history (/chat/, /triage/process); --api
+  sessions uses the server-side conversation (/chat/sessions/...).
+- doctors: log in and poll the dashboard (/patients/ with If-None-Match)
+  every POLL seconds until the last patient is done.
+
+The stub answers triage prompts with JSON (final once the patient says
+"that's all") and chat prompts with a short question, at --delay plus
+--token-rate words/second. Reports p50/p95/p99 latency and throughput per
+endpoint; --save / --compare keep a baseline and fail on regressions.
+
+Run from backend/:
+    python -m benchmarks.mixed_load --patients 200 --concurrency 50 --doctors 5
+    python -m benchmarks.mixed_load --save baseline.json
+    python -m benchmarks.mixed_load --compare baseline.json --max-regression 0.25
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks import reporting
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+PASSWORD = "load-test-pw"
+OPENERS = [
+    "I have chest pain and my left arm feels numb",
+    "my head hurts a lot and I feel dizzy",
+    "I cut my hand in the kitchen and it keeps bleeding",
+    "I have a fever and a bad cough",
+    "my stomach hurts and I threw up twice",
+    "I twisted my ankle and it's swollen",
+    "I can't catch my breath when I walk",
+    "I have a rash all over my arms",
+]
+FOLLOW_UPS = [
+    "it got worse in the last hour",
+    "I have diabetes and high blood pressure",
+    "the pain is about 7 out of 10",
+    "I took paracetamol but it didn't help",
+]
+CHAT_REPLY = "Thank you. How long have you had these symptoms, and do you have any medical conditions?"
+SEVERITIES = ["Critical", "High", "Medium", "Low"]
+
+
+def stub_responder(body: Dict[str, Any]) -> str:
+    """Triage prompts get JSON (final after the patient's closing line), chat prompts get text."""
+    messages = body.get("messages", [])
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    if "triage assistant" not in system:
+        return CHAT_REPLY
+
+    conversation = " ".join(m["content"] for m in messages if m.get("role") != "system").lower()
+    if "that's all" not in conversation:
+        return json.dumps({"final": False, "severity": None, "symptoms": [], "duration": "", "risk_factors": []})
+    digest = int(hashlib.md5(conversation.encode()).hexdigest(), 16)
+    return json.dumps({
+        "final": True,
+        "severity": SEVERITIES[digest % len(SEVERITIES)],
+        "symptoms": ["reported symptom"],
+        "duration": "2 hours",
+        "risk_factors": [],
+    })
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client, name: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    def results(self, wall: float) -> Dict[str, Dict[str, float]]:
+        return {
+            name: reporting.summarize(self.latencies[name], self.errors[name], wall)
+            for name in sorted(self.latencies)
+        }
+
+
+async def _login(client, rec: Recorder, email: str) -> Dict[str, str]:
+    r = await rec.call(client, "POST /auth/login", "POST", "/auth/login", json={"email": email, "password": PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def _patient_lines(i: int, turns: int, rng: random.Random) -> List[str]:
+    """`turns` messages: an opener, follow-ups, then the closing line that lets triage finish."""
+    opener = f"{rng.choice(OPENERS)} (patient {i})"
+    closing = "that's all, it started two hours ago"
+    if turns <= 1:
+        return [f"{opener}, {closing}"]
+    return [opener] + [rng.choice(FOLLOW_UPS) for _ in range(turns - 2)] + [closing]
+
+
+async def _patient_legacy(client, rec, auth, lines, think):
+    history, messages = [], []
+    for line in lines:
+        history.append({"role": "patient", "content": line})
+        r = await rec.call(client, "POST /chat/", "POST", "/chat/", json={"history": history}, headers=auth)
+        if r.status_code == 200:
+            history.append({"role": "ai", "content": r.json()["reply"]})
+        messages.append(line)
+        r = await rec.call(client, "POST /triage/process", "POST", "/triage/process",
+                           json={"messages": messages}, headers=auth)
+        if r.status_code == 200 and "ticket" in r.json():
+            return True
+        await asyncio.sleep(think)
+    return False
+
+
+async def _patient_sessions(client, rec, auth, lines, think):
+    r = await rec.call(client, "POST /chat/sessions", "POST", "/chat/sessions", headers=auth)
+    r.raise_for_status()
+    sid = r.json()["session_id"]
+    for line in lines:
+        await rec.call(client, "POST /chat/sessions/{id}/messages", "POST", f"/chat/sessions/{sid}/messages",
+                       json={"content": line}, headers=auth)
+        r = await rec.call(client, "POST /triage/sessions/{id}", "POST", f"/triage/sessions/{sid}",
+                           json={}, headers=auth)
+        if r.status_code == 200 and "ticket" in r.json():
+            return True
+        await asyncio.sleep(think)
+    return False
+
+
+async def _doctor(client, rec, email, poll, done: asyncio.Event):
+    auth = await _login(client, rec, email)
+    etag = None
+    while not done.is_set():
+        headers = dict(auth, **({"If-None-Match": etag} if etag else {}))
+        r = await rec.call(client, "GET /patients/", "GET", "/patients/?limit=100", headers=headers)
+        etag = r.headers.get("etag", etag)
+        try:
+            await asyncio.wait_for(done.wait(), timeout=poll)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _setup_users(client, patients: int, doctors: int) -> None:
+    sem = asyncio.Semaphore(8)
+
+    async def register(email, role):
+        async with sem:
+            r = await client.post("/auth/register", json={"name": email, "email": email, "password": PASSWORD, "role": role})
+            r.raise_for_status()
+
+    await asyncio.gather(
+        *[register(f"patient{i}@load.example.com", "patient") for i in range(patients)],
+        *[register(f"doctor{i}@load.example.com", "doctor") for i in range(doctors)],
+    )
+
+
+async def _run(args) -> Dict[str, Any]:
+    import httpx
+    import main
+
+    rng = random.Random(args.seed)
+    rec = Recorder()
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app), \
+            httpx.AsyncClient(transport=transport, base_url="http://app", timeout=300) as client:
+        await _setup_users(client, args.patients, args.doctors)
+
+        done = asyncio.Event()
+        sem = asyncio.Semaphore(args.concurrency)
+        flow = _patient_sessions if args.api == "sessions" else _patient_legacy
+
+        async def patient(i):
+            async with sem:
+                auth = await _login(client, rec, f"patient{i}@load.example.com")
+                return await flow(client, rec, auth, _patient_lines(i, args.turns, rng), args.think)
+
+        started = time.perf_counter()
+        doctors = [asyncio.create_task(_doctor(client, rec, f"doctor{i}@load.example.com", args.poll, done))
+                   for i in range(args.doctors)]
+        ticketed = await asyncio.gather(*[patient(i) for i in range(args.patients)])
+        wall = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*doctors)
+
+    return {"wall": wall, "ticketed": sum(ticketed), "results": rec.results(wall)}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25, help="patients active at once")
+    parser.add_argument("--doctors", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=3, help="patient messages per triage")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds between a patient's turns")
+    parser.add_argument("--poll", type=float, default=1.0, help="dashboard poll interval")
+    parser.add_argument("--api", choices=("legacy", "sessions"), default="legacy")
+    parser.add_argument("--delay", type=float, default=0.3, help="stub LLM time to first token")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="stub LLM words per second")
+    parser.add_argument("--llm-concurrency", type=int, default=16, help="LLM_MAX_CONCURRENCY")
+    parser.add_argument("--fast-path", action="store_true", help="enable the NER fast path (needs the model)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=None, help="BCRYPT_ROUNDS (default: the app's)")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="write per-endpoint results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON; exit 1 when p95 regresses")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    stub = create_stub_app(delay=args.delay, token_rate=args.token_rate, responder=stub_responder)
+    with StubServer(stub, port=args.port) as server, tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app (and its settings) are imported
+        os.environ.update({
+            "GROQ_API_KEY": "stub",
+            "GROQ_BASE_URL": server.url,
+            "LLM_MAX_CONCURRENCY": str(args.llm_concurrency),
+            "DATABASE_URL": f"sqlite:///{tmp}/load.db",
+            "NER_PRELOAD": "false",
+            "TRIAGE_FAST_PATH": "true" if args.fast_path else "false",
+        })
+        if args.bcrypt_rounds is not None:
+            os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+        run = asyncio.run(_run(args))
+
+    print(f"patients: {args.patients} ({run['ticketed']} ticketed), doctors: {args.doctors}, "
+          f"concurrency: {args.concurrency}, api: {args.api}")
+    print(f"wall time: {run['wall']:.2f}s, stub LLM calls: {stub.state.requests}, "
+          f"max in flight: {stub.state.max_in_flight}")
+    print()
+    reporting.print_table(run["results"])
+
+    if args.save:
+        reporting.save(args.save, run["results"])
+    if args.compare:
+        regressions = reporting.compare(args.compare, run["results"], max_regression=args.max_regression)
+        if regressions:
+            print("\nRegressions against " + args.compare + ":")
+            print("\n".join("  " + r for r in regressions))
+            raise SystemExit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main_cli()
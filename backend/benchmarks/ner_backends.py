@@ -0,0 +1,103 @@
+# backend/benchmarks/ner_backends.py
+"""
+NER Backend Comparison
+----------------------
+Compares the PyTorch pipeline against ONNX Runtime (fp32 and int8) on
+latency and on agreement of the extracted symptoms, using the PyTorch
+output as the reference.
+
+Export a local, offline-loadable model directory first (optional):
+    python -m benchmarks.ner_backends --export ./models/clinical-ner-onnx
+Then compare (run from backend/):
+    python -m benchmarks.ner_backends --model ./models/clinical-ner-onnx
+and serve it with NER_BACKEND=onnx NER_MODEL_DIR=./models/clinical-ner-onnx.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.ner_batching import SAMPLES
+
+
+def export(model_ref: str, out_dir: str) -> None:
+    """Write model.onnx, model_quantized.onnx and the tokenizer into out_dir."""
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model = ORTModelForTokenClassification.from_pretrained(model_ref, export=True)
+    model.save_pretrained(out_dir)
+    AutoTokenizer.from_pretrained(model_ref).save_pretrained(out_dir)
+
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    ORTQuantizer.from_pretrained(out_dir, file_name="model.onnx").quantize(save_dir=out_dir, quantization_config=qconfig)
+    print(f"exported to {out_dir}")
+
+
+def _run(nlp, texts, repeat):
+    from app.services.nlp_processing import _merge_entities
+
+    nlp(texts[0])  # warm-up
+    latencies, outputs = [], []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            entities = nlp(text)
+            latencies.append(time.perf_counter() - started)
+            outputs.append(set(_merge_entities(entities)))
+    return latencies, outputs
+
+
+def _agreement(reference, outputs):
+    scores = []
+    for ref, out in zip(reference, outputs):
+        union = ref | out
+        scores.append(len(ref & out) / len(union) if union else 1.0)
+    return statistics.mean(scores)
+
+
+def compare(torch_model: str, onnx_model: str, repeat: int) -> None:
+    from app.services.nlp_processing import build_pipeline
+
+    variants = [
+        ("torch", torch_model, "torch", False),
+        ("onnx-fp32", onnx_model, "onnx", False),
+        ("onnx-int8", onnx_model, "onnx", True),
+    ]
+
+    reference = None
+    print(f"{'backend':<10} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'agreement':>10}")
+    for name, ref, backend, quantize in variants:
+        started = time.perf_counter()
+        try:
+            nlp = build_pipeline(ref, backend, quantize)
+        except Exception as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        load = time.perf_counter() - started
+
+        latencies, outputs = _run(nlp, SAMPLES, repeat)
+        if reference is None:
+            reference = outputs
+        q = statistics.quantiles(latencies, n=20)
+        print(f"{name:<10} {load:>7.1f} {1000 * statistics.median(latencies):>8.1f} "
+              f"{1000 * q[18]:>8.1f} {_agreement(reference, outputs):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--torch-model", default="samrawal/bert-base-uncased_clinical-ner")
+    parser.add_argument("--model", default=None, help="ONNX model dir (default: export from --torch-model on the fly)")
+    parser.add_argument("--export", metavar="DIR", help="export ONNX + int8 model to DIR and exit")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.export:
+        export(args.torch_model, args.export)
+        return
+    compare(args.torch_model, args.model or args.torch_model, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# backend/benchmarks/ner_batching.py
+"""
+NER Batching Benchmark
+----------------------
+Measures clinical NER throughput (texts/sec) when the pipeline is fed
+batches of 1..64 texts, and end-to-end through the async micro-batcher
+with many concurrent callers.
+
+Needs the model (downloads on first run unless it is cached).
+Run from backend/:
+    python -m benchmarks.ner_batching --texts 256
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+SAMPLES = [
+    "I have had chest pain and shortness of breath since this morning",
+    "severe headache with vomiting for two days",
+    "my child has a high fever and a cough",
+    "dizzy and fatigue after standing up, no chest pain",
+    "sharp abdominal pain on the right side, started last night",
+    "fainting at work, history of diabetes and hypertension",
+    "sore throat and mild fever for three days",
+    "bleeding from a deep cut on my hand that will not stop",
+]
+
+
+def _texts(n: int):
+    return list(itertools.islice(itertools.cycle(SAMPLES), n))
+
+
+def bench_direct(texts, batch_sizes):
+    from app.services.nlp_processing import extract_symptoms_batch, load_model
+
+    load_model()
+    extract_symptoms_batch(texts[:8])  # warm-up
+
+    print(f"{'batch':>6}  {'texts/s':>9}  {'ms/text':>8}")
+    for bs in batch_sizes:
+        started = time.perf_counter()
+        for i in range(0, len(texts), bs):
+            chunk = texts[i:i + bs]
+            extract_symptoms_batch(chunk, batch_size=len(chunk))
+        elapsed = time.perf_counter() - started
+        print(f"{bs:>6}  {len(texts) / elapsed:>9.1f}  {1000 * elapsed / len(texts):>8.2f}")
+
+
+async def bench_batcher(texts, concurrency):
+    from app.services.ner_batcher import get_ner_batcher
+    from app.services.nlp_processing import extract_symptoms_async
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with sem:
+            return await extract_symptoms_async(text)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(t) for t in texts])
+    elapsed = time.perf_counter() - started
+
+    b = get_ner_batcher()
+    print(f"\nmicro-batcher, {concurrency} concurrent callers:")
+    print(f"  {len(texts) / elapsed:.1f} texts/s, {b.batches_run} batches, "
+          f"mean batch {b.texts_processed / max(b.batches_run, 1):.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16,32,64")
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = _texts(args.texts)
+    bench_direct(texts, [int(b) for b in args.batch_sizes.split(",")])
+    asyncio.run(bench_batcher(texts, args.concurrency))
+
+    from app.services.ner_batcher import stop_ner_batcher
+    stop_ner_batcher()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# backend/benchmarks/queue_simulation.py
+"""
+Triage Queue Simulation
+-----------------------
+Drives the queue engine with a simulated ER: the queue is pre-filled with
+--waiting patients, new patients arrive as fast as doctors call them in
+(so depth stays around --waiting), and every waiting patient's app polls
+its position. Runs on a simulated clock; only engine time is measured.
+
+Reports per-operation latency, the cost of a full rebuild, and how close
+the wait estimate given at admission was to the wait actually observed.
+
+Run from backend/:
+    python -m benchmarks.queue_simulation --waiting 10000 --events 50000
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+SEVERITY_MIX = (("Critical", 0.05), ("High", 0.2), ("Medium", 0.35), ("Low", 0.4))
+
+
+def _pick_severity(rng: random.Random) -> str:
+    r = rng.random()
+    for severity, share in SEVERITY_MIX:
+        r -= share
+        if r <= 0:
+            return severity
+    return "Low"
+
+
+def _timed(samples, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    samples.append(time.perf_counter() - started)
+    return result
+
+
+def _fmt(samples) -> str:
+    q = statistics.quantiles(samples, n=100)
+    return f"n={len(samples):7d}  p50={1e6 * q[49]:7.1f}us  p99={1e6 * q[98]:7.1f}us  max={1e6 * max(samples):8.1f}us"
+
+
+def run(waiting: int, events: int, doctors: int, service_minutes: float, polls_per_event: int, seed: int):
+    from app.services.triage_queue import TriageQueueEngine
+
+    rng = random.Random(seed)
+    now = [0.0]
+    engine = TriageQueueEngine(aging_seconds=1800, service_interval=60, clock=lambda: now[0])
+
+    # Rebuild from 10k "open records", as on startup
+    base = datetime(2025, 1, 1)
+    rows = [
+        (f"X{i}", _pick_severity(rng), i, base + timedelta(seconds=i), "waiting")
+        for i in range(waiting)
+    ]
+    started = time.perf_counter()
+    engine.load(rows)
+    rebuild_ms = 1000 * (time.perf_counter() - started)
+    now[0] = (base + timedelta(seconds=waiting) - datetime(1970, 1, 1)).total_seconds()
+
+    ops = {"admit": [], "position": [], "call next": [], "done": []}
+    service_mean = service_minutes * 60
+    arrival_gap = service_mean / doctors  # arrivals keep pace with the doctors
+    promised, admitted_at, errors = {}, {}, []
+
+    # (time, kind, ticket)
+    timeline = [(now[0] + rng.expovariate(1 / arrival_gap), "arrive", "")]
+    timeline += [(now[0] + rng.random() * service_mean, "free", "") for _ in range(doctors)]
+    heapq.heapify(timeline)
+    polled = [r[0] for r in rows]
+
+    for _ in range(events):
+        now[0], kind, ticket = heapq.heappop(timeline)
+
+        if kind == "arrive":
+            severity = _pick_severity(rng)
+            ticket = engine.issue_ticket(severity)
+            _timed(ops["admit"], engine.admit, ticket, severity, 0)
+            promised[ticket] = engine.estimate_wait_seconds(ticket)
+            admitted_at[ticket] = now[0]
+            polled.append(ticket)
+            heapq.heappush(timeline, (now[0] + rng.expovariate(1 / arrival_gap), "arrive", ""))
+        else:
+            if kind == "finish":
+                _timed(ops["done"], engine.transition, ticket, "done")
+            nxt = _timed(ops["call next"], lambda: engine.next_up(1))
+            if nxt:
+                called = nxt[0].ticket
+                engine.transition(called, "in-progress")
+                if called in promised:
+                    errors.append((now[0] - admitted_at.pop(called), promised.pop(called)))
+                heapq.heappush(timeline, (now[0] + rng.expovariate(1 / service_mean), "finish", called))
+            else:
+                heapq.heappush(timeline, (now[0] + 30, "free", ""))
+
+        for _ in range(polls_per_event):
+            _timed(ops["position"], engine.position, polled[rng.randrange(len(polled))])
+
+    print(f"rebuild ({waiting} open records): {rebuild_ms:.1f} ms")
+    print(f"final depth: {engine.waiting_count()} waiting, service interval {engine.service_interval:.1f}s "
+          f"(true mean {arrival_gap:.1f}s)")
+    for name, samples in ops.items():
+        if len(samples) >= 2:
+            print(f"  {name:10s} {_fmt(samples)}")
+    if errors:
+        ratios = [actual / max(promised, 1) for actual, promised in errors]
+        q = statistics.quantiles(ratios, n=10)
+        print(f"wait estimate, actual/promised over {len(errors)} patients: "
+              f"p10={q[0]:.2f} median={statistics.median(ratios):.2f} p90={q[8]:.2f}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--waiting", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--doctors", type=int, default=20)
+    parser.add_argument("--service-minutes", type=float, default=15)
+    parser.add_argument("--polls-per-event", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.waiting, args.events, args.doctors, args.service_minutes, args.polls_per_event, args.seed)
+
+
+if __name__ == "__main__":
+    main_cli()
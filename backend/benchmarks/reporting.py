@@ -0,0 +1,70 @@
+# backend/benchmarks/reporting.py
+"""
+Shared result handling for the load and micro benchmarks: latency
+percentiles, a fixed-width table, and save/compare against a baseline JSON
+so a regression fails the run (non-zero exit) before deploy.
+"""
+
+import json
+import math
+from typing import Dict, List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int = 0, wall: float = 0.0) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": len(values) / wall if wall else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def print_table(rows: Dict[str, Dict[str, float]], title: str = "endpoint", unit: str = "ms") -> None:
+    """Results are stored in ms; unit="us" prints microseconds for the micro benchmarks."""
+    scale = 1000.0 if unit == "us" else 1.0
+    width = max([len(title)] + [len(name) for name in rows])
+    heads = " ".join(f"{h + ' ' + unit:>9}" for h in ("p50", "p95", "p99", "max"))
+    print(f"{title:<{width}}  {'n':>6} {'err':>5} {'rps':>8} {heads}")
+    for name, r in rows.items():
+        cells = " ".join(f"{r[k] * scale:>9.2f}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        print(f"{name:<{width}}  {r['count']:>6} {r['errors']:>5} {r['rps']:>8.1f} {cells}")
+
+
+def save(path: str, results: Dict[str, Dict[str, float]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare(path: str, results: Dict[str, Dict[str, float]], metric: str = "p95_ms",
+            max_regression: float = 0.25, noise_floor_ms: float = 5.0) -> List[str]:
+    """
+    Entries whose `metric` got worse than baseline * (1 + max_regression)
+    by more than `noise_floor_ms`, as printable lines. Entries missing on
+    either side are ignored, new error counts are always reported.
+    """
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        old, new = before.get(metric, 0.0), now.get(metric, 0.0)
+        if new > old * (1 + max_regression) and new - old > noise_floor_ms:
+            regressions.append(f"{name}: {metric} {old:.2f} -> {new:.2f}")
+        if now.get("errors", 0) > before.get("errors", 0):
+            regressions.append(f"{name}: errors {before.get('errors', 0)} -> {now['errors']}")
+    return regressions
@@ -0,0 +1,131 @@
+# backend/benchmarks/severity_matcher.py
+"""
+Severity Matcher Benchmark + Parity Check
+-----------------------------------------
+Compares the precompiled SymptomMatcher with the original per-pair
+thefuzz loop from calculate_severity: labels must be identical on every
+case, then both are timed on the shipped vocabulary and on a synthetic
+vocabulary of several hundred terms.
+
+Run from backend/:
+    python -m benchmarks.severity_matcher --cases 2000 --vocab 400
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from thefuzz import fuzz
+
+from app.services import severity_scoring
+from app.services.severity_rules import get_rules
+from app.services.symptom_matcher import SymptomMatcher
+
+EXTRA_WORDS = [
+    "pain", "left", "right", "arm", "leg", "back", "chest", "head", "neck", "sharp",
+    "dull", "burning", "swelling", "rash", "itching", "nausea", "numbness", "tingling",
+    "blurred", "vision", "hearing", "loss", "ear", "eye", "throat", "stomach", "cramps",
+    "bleeding", "bruise", "fracture", "sprain", "burn", "wound", "infection", "allergy",
+]
+ARABIC = ["الم الصدر", "صداع شديد", "دوخه", "ضيق تنفس", "نزيف", "حمى", "ترجيع"]
+
+
+def legacy_calculate_severity(symptoms: List[str], weights: Dict[str, int], labels: Dict[int, str]) -> str:
+    """The original implementation, kept verbatim as the parity reference."""
+    if not symptoms:
+        return "Low"
+
+    best_score = 0
+    best_weight = 1
+
+    for symptom in symptoms:
+        s_norm = severity_scoring.normalize_text(symptom)
+
+        for ref, weight in weights.items():
+            similarity = (fuzz.partial_ratio(s_norm, ref) + fuzz.token_sort_ratio(s_norm, ref)) / 2
+            combined_score = (weight * 20) + similarity
+
+            if combined_score > best_score:
+                best_score = combined_score
+                best_weight = weight
+
+    return labels.get(best_weight, "Low")
+
+
+def _mutate(term: str, rng: random.Random) -> str:
+    chars = list(term)
+    for _ in range(rng.randint(0, 2)):
+        if len(chars) > 3:
+            chars[rng.randrange(len(chars))] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+    return "".join(chars)
+
+
+def make_cases(n: int, vocab: List[str], rng: random.Random) -> List[List[str]]:
+    cases = []
+    for _ in range(n):
+        k = rng.randint(0, 4)
+        symptoms = []
+        for _ in range(k):
+            r = rng.random()
+            if r < 0.4:
+                symptoms.append(_mutate(rng.choice(vocab), rng))
+            elif r < 0.5:
+                symptoms.append(rng.choice(ARABIC))
+            else:
+                symptoms.append(" ".join(rng.sample(EXTRA_WORDS, rng.randint(1, 4))))
+        cases.append(symptoms)
+    return cases
+
+
+def synthetic_vocab(size: int, rng: random.Random) -> Dict[str, int]:
+    vocab = dict(get_rules().weights)
+    while len(vocab) < size:
+        vocab[" ".join(rng.sample(EXTRA_WORDS, rng.randint(1, 3)))] = rng.randint(1, 5)
+    return vocab
+
+
+def run(weights: Dict[str, int], cases: List[List[str]], title: str) -> None:
+    rules = get_rules()
+    labels = rules.labels
+    matcher = SymptomMatcher(weights, labels, rules.synonyms)
+
+    started = time.perf_counter()
+    expected = [legacy_calculate_severity(c, weights, labels) for c in cases]
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    single = [matcher.score(c) for c in cases]
+    single_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = matcher.score_many(cases)
+    batch_s = time.perf_counter() - started
+
+    mismatches = sum(a != b for a, b in zip(expected, single)) + sum(a != b for a, b in zip(expected, batch))
+    print(f"\n{title}: {len(weights)} terms, {len(cases)} cases")
+    print(f"  legacy loop      {1e6 * legacy_s / len(cases):9.1f} us/case")
+    print(f"  matcher.score    {1e6 * single_s / len(cases):9.1f} us/case  ({legacy_s / single_s:.1f}x)")
+    print(f"  matcher.batch    {1e6 * batch_s / len(cases):9.1f} us/case  ({legacy_s / batch_s:.1f}x)")
+    print(f"  label mismatches {mismatches}")
+    if mismatches:
+        raise SystemExit("parity check FAILED")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--vocab", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    shipped = dict(get_rules().weights)
+    run(shipped, make_cases(args.cases, list(shipped), rng), "shipped vocabulary")
+
+    big = synthetic_vocab(args.vocab, rng)
+    run(big, make_cases(args.cases, list(big), rng), "synthetic vocabulary")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# backend/benchmarks/stub_llm.py
+"""
+Stub LLM Server
+---------------
+Minimal OpenAI-compatible chat completions server for offline load tests.
+Answers every request after a fixed delay, so the app can be exercised
+without calling Groq. Requests with "stream": true get the reply back as
+SSE chunks, one word every TOKEN_DELAY seconds.
+
+With a token rate (words per second) the stub behaves like a model that
+generates: non-streamed replies also take len(words) / rate on top of the
+delay, and streamed words are paced at that rate. A `responder(body)`
+callable picks the reply per request (e.g. JSON for triage, text for chat).
+
+Faults for the router tests: `error_rate` of requests fail with HTTP 500,
+`slow_rate` of them wait an extra `slow_delay` seconds. Both draw from a
+seeded RNG and, like the delay, can be changed on app.state mid-run.
+
+Run standalone:
+    python -m benchmarks.stub_llm --port 9100 --delay 0.5
+Then point the backend at it:
+    GROQ_API_KEY=stub GROQ_BASE_URL=http://127.0.0.1:9100 uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from typing import Any, Callable, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_REPLY = json.dumps({"final": False})
+
+
+def _chunk(model: str, content: str = "", finish_reason=None) -> str:
+    payload = {
+        "id": "stub-completion",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def create_stub_app(
+    delay: float = 0.5,
+    reply: str = DEFAULT_REPLY,
+    token_delay: float = 0.02,
+    token_rate: Optional[float] = None,
+    responder: Optional[Callable[[Dict[str, Any]], str]] = None,
+    error_rate: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_delay: float = 0.0,
+    seed: int = 0,
+) -> FastAPI:
+    app = FastAPI(title="Stub LLM")
+    app.state.delay = delay
+    app.state.token_delay = 1.0 / token_rate if token_rate else token_delay
+    app.state.generation_paced = bool(token_rate)  # non-streamed replies pay for their tokens too
+    app.state.reply = reply
+    app.state.responder = responder
+    app.state.error_rate = error_rate
+    app.state.slow_rate = slow_rate
+    app.state.slow_delay = slow_delay
+    app.state.rng = random.Random(seed)
+    app.state.requests = 0
+    app.state.errors = 0
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+
+    # Groq's SDK posts to /openai/v1/..., plain OpenAI clients to /v1/...
+    @app.post("/openai/v1/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        app.state.requests += 1
+        if app.state.rng.random() < app.state.error_rate:
+            app.state.errors += 1
+            await asyncio.sleep(app.state.delay / 10)
+            return JSONResponse({"error": {"message": "injected failure", "type": "server_error"}}, status_code=500)
+        extra = app.state.slow_delay if app.state.rng.random() < app.state.slow_rate else 0.0
+
+        reply = app.state.responder(body) if app.state.responder else app.state.reply
+        if body.get("stream"):
+            return StreamingResponse(_stream(model, reply, extra), media_type="text/event-stream")
+
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            generation = len(reply.split(" ")) * app.state.token_delay if app.state.generation_paced else 0.0
+            await asyncio.sleep(app.state.delay + extra + generation)
+        finally:
+            app.state.in_flight -= 1
+
+        return {
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    async def _stream(model: str, reply: str, extra: float = 0.0):
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            await asyncio.sleep(app.state.delay + extra)
+            words = reply.split(" ")
+            for i, word in enumerate(words):
+                yield _chunk(model, word if i == 0 else " " + word)
+                await asyncio.sleep(app.state.token_delay)
+            yield _chunk(model, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+        finally:
+            app.state.in_flight -= 1
+
+    return app
+
+
+class StubServer:
+    """Runs the stub app on a background thread (context manager)."""
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 9100):
+        self.app = app
+        self.url = f"http://{host}:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds before each reply")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed words")
+    parser.add_argument("--token-rate", type=float, default=None, help="words/second for every reply (overrides --token-delay)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests delayed by --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=2.0)
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        delay=args.delay, token_delay=args.token_delay, token_rate=args.token_rate,
+        error_rate=args.error_rate, slow_rate=args.slow_rate, slow_delay=args.slow_delay,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,80 @@
+# backend/benchmarks/triage_concurrency.py
+"""
+Triage Concurrency Load Test
+----------------------------
+Fires N concurrent /triage/process requests at the app while the LLM is a
+local stub that takes DELAY seconds per call.
+
+If the LLM call blocked the event loop, total time would be ~N * DELAY.
+With the async client it should be ~ceil(N / LLM_MAX_CONCURRENCY) * DELAY.
+
+Run from backend/:
+    python -m benchmarks.triage_concurrency --requests 20 --delay 0.5
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from benchmarks.stub_llm import StubServer, create_stub_app
+
+
+async def _run(n: int) -> float:
+    import httpx
+    import main
+    from app.core.deps import get_current_user
+
+    main.app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="load@test")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/triage/process", json={"messages": [f"patient {i}: chest pain"]})
+            for i in range(n)
+        ])
+        elapsed = time.perf_counter() - started
+
+    failed = [r for r in responses if r.status_code != 200]
+    if failed:
+        raise SystemExit(f"{len(failed)} requests failed, first: {failed[0].status_code} {failed[0].text}")
+    return elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=16, help="LLM_MAX_CONCURRENCY for the app")
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    stub = create_stub_app(delay=args.delay)
+    with StubServer(stub, port=args.port) as server, tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the app (and its settings) are imported
+        os.environ.update({
+            "GROQ_API_KEY": "stub",
+            "GROQ_BASE_URL": server.url,
+            "LLM_MAX_CONCURRENCY": str(args.concurrency),
+            "DATABASE_URL": f"sqlite:///{tmp}/load.db",
+        })
+        elapsed = asyncio.run(_run(args.requests))
+
+    serial = args.requests * args.delay
+    expected = math.ceil(args.requests / args.concurrency) * args.delay
+    print(f"requests:           {args.requests}")
+    print(f"stub delay:         {args.delay:.2f}s")
+    print(f"wall time:          {elapsed:.2f}s")
+    print(f"serialized would be {serial:.2f}s, ideal overlap {expected:.2f}s")
+    print(f"max in-flight seen: {stub.state.max_in_flight}")
+
+    if args.requests > 1 and elapsed >= serial * 0.9:
+        raise SystemExit("LLM calls did not overlap — event loop is being blocked")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,111 @@
+# backend/benchmarks/triage_writes.py
+"""
+Triage Write Throughput
+-----------------------
+Saves a surge of finalized triages concurrently and compares
+per-request commits with the write-behind batcher on SQLite.
+
+Modes:
+- direct  : one transaction per record
+- commit  : batched, each caller waits for its batch to commit
+- enqueue : batched, callers return once the record is queued
+
+Run from backend/:
+    python -m benchmarks.triage_writes --records 2000 --synchronous FULL
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+SAMPLE = {
+    "symptoms": ["chest pain", "shortness of breath"],
+    "duration": "2 hours",
+    "severity": "High",
+    "risk_factors": ["smoker"],
+    "ticket": "A1001",
+    "wait_time": "5–15 minutes",
+}
+
+
+async def _surge(save, records: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await save(i, dict(SAMPLE))
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(records)])
+    return time.perf_counter() - started, latencies
+
+
+async def _run(mode: str, records: int, concurrency: int, flush_ms: float, batch_max: int):
+    from app.core.database import Base, engine, dispose_async_engine
+    import app.models.user  # noqa: F401
+    import app.models.triage_record  # noqa: F401
+    from app.services.triage_writer import TriageWriteBehind
+
+    Base.metadata.create_all(bind=engine)
+
+    writer = TriageWriteBehind(mode=mode, flush_ms=flush_ms, batch_max=batch_max)
+    elapsed, latencies = await _surge(writer.save, records, concurrency)
+    # Throughput counts until the last record is on disk, not just acknowledged
+    started = time.perf_counter()
+    await writer.close()
+    elapsed += time.perf_counter() - started
+
+    await dispose_async_engine()
+    return elapsed, latencies
+
+
+def _count_rows() -> int:
+    from app.core.database import SessionLocal
+    from app.models.triage_record import TriageRecord
+    db = SessionLocal()
+    try:
+        return db.query(TriageRecord).count()
+    finally:
+        db.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200, help="triages finalizing at once")
+    parser.add_argument("--modes", default="direct,commit,enqueue")
+    parser.add_argument("--flush-ms", type=float, default=20)
+    parser.add_argument("--batch-max", type=int, default=200)
+    parser.add_argument("--synchronous", default="FULL", help="SQLITE_SYNCHRONOUS (FULL fsyncs every commit)")
+    args = parser.parse_args()
+
+    print(f"{'mode':8} {'records/s':>10} {'p50 ack':>10} {'p99 ack':>10} {'rows':>6}")
+    for mode in args.modes.split(","):
+        # Fresh database and fresh imports per mode so each run gets its own engine
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ.update({
+                "DATABASE_URL": f"sqlite:///{tmp}/writes.db",
+                "SQLITE_SYNCHRONOUS": args.synchronous,
+                "NER_PRELOAD": "false",
+            })
+            import sys
+            for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+                del sys.modules[name]
+
+            elapsed, latencies = asyncio.run(
+                _run(mode, args.records, args.concurrency, args.flush_ms, args.batch_max)
+            )
+            rows = _count_rows()
+
+        q = statistics.quantiles(latencies, n=100)
+        print(f"{mode:8} {args.records / elapsed:10.0f} {1000 * q[49]:8.1f}ms {1000 * q[98]:8.1f}ms {rows:6}")
+
+
+if __name__ == "__main__":
+    main_cli()
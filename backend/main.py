@@ -1,23 +1,52 @@
 # backend/main.py
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 
 # ✅ Load DB + models BEFORE create_all()
-from app.core.database import Base, engine
+from app.core.database import Base, engine, dispose_async_engine
 import app.models.user
 import app.models.triage_record
 
-# ✅ Now create tables
+# ✅ Now create tables, then upgrade existing ones
+from app.core.migrations import run_migrations
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 # ✅ Import routers AFTER loading models
-from app.routes import triage, patients, auth, chat
+from app.routes import triage, patients, auth, chat, health
+from app.core import metrics
+from app.core.config import settings
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.core.security import init_password_pool, close_password_pool
+from app.services.llm_client import init_llm_client, close_llm_client
+from app.services.ner_batcher import stop_ner_batcher
+from app.services.nlp_processing import start_preload
+from app.services.triage_writer import close_triage_writer
+from app.services.triage_queue import rebuild_triage_queue
+
+# ✅ Shared resources live for the whole process
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_llm_client()
+    init_password_pool()
+    await asyncio.to_thread(rebuild_triage_queue)  # open tickets + ticket numbering from the DB
+    start_preload()  # /health/ready turns 200 once the NER model is warm
+    yield
+    await close_triage_writer()  # flush queued triage records before the engine goes away
+    await close_llm_client()
+    stop_ner_batcher()
+    close_password_pool()
+    await dispose_async_engine()
 
 app = FastAPI(
     title="AI-Powered Emergency Triage Assistant",
     version="1.0.0",
-    description="Backend API for patient intake and severity scoring."
+    description="Backend API for patient intake and severity scoring.",
+    lifespan=lifespan,
 )
 
 # ✅ CORS
@@ -29,11 +58,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Per-route latency + in-flight (outermost, so it sees the whole request)
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # ✅ Register API routes
 app.include_router(auth.router)
 app.include_router(triage.router)
 app.include_router(patients.router)
 app.include_router(chat.router)
+app.include_router(health.router)
 
 # ✅ Custom Swagger / JWT
 def custom_openapi():
@@ -68,3 +102,9 @@ app.openapi = custom_openapi
 @app.get("/")
 def root():
     return {"message": "Backend is running successfully!"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
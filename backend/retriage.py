@@ -0,0 +1,86 @@
+# backend/retriage.py
+"""
+Bulk re-triage CLI (engine: app/services/retriage.py).
+
+Re-scores past intakes with the current severity rules / NER model and
+reports how the labels move against what was stored.
+
+Run from backend/:
+    python retriage.py --jsonl conversations.jsonl --out retriage.jsonl
+    python retriage.py --db --since 2025-01-01 --out retriage.jsonl --extractor stored
+    python retriage.py --jsonl conversations.jsonl --out retriage.jsonl --resume
+    python retriage.py --jsonl conversations.jsonl --out retriage.jsonl --llm --llm-concurrency 4
+
+Results stream to --out (one JSON line per item); <out>.ckpt makes the run
+resumable and <out>.report.json holds the diff report.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from app.services.retriage import EXTRACTORS, RetriageEngine, iter_jsonl, iter_records, render_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--jsonl", help="conversations, one JSON object per line")
+    source.add_argument("--db", action="store_true", help="stored triage_records (DATABASE_URL)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="--db: records at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="--db: records before this time")
+    parser.add_argument("--out", required=True, help="JSONL results file")
+    parser.add_argument("--resume", action="store_true", help="continue from <out>.ckpt")
+    parser.add_argument("--extractor", choices=EXTRACTORS, default=None,
+                        help="ner (default for --jsonl), stored symptoms (default for --db), or fragments")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="processes, each with its own model copy; 0 = in-process")
+    parser.add_argument("--chunk", type=int, default=64, help="items per worker task")
+    parser.add_argument("--ner-batch", type=int, default=16, help="texts per model forward pass")
+    parser.add_argument("--llm", action="store_true", help="also ask the LLM for each item")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    extractor = args.extractor or ("stored" if args.db else "ner")
+    engine = RetriageEngine(
+        extractor=extractor,
+        workers=args.workers,
+        chunk_size=args.chunk,
+        ner_batch_size=args.ner_batch,
+        use_llm=args.llm,
+        llm_concurrency=args.llm_concurrency,
+    )
+    if args.db:
+        source = lambda after: iter_records(after, since=args.since, until=args.until)
+    else:
+        source = lambda after: iter_jsonl(args.jsonl, after)
+
+    started = time.perf_counter()
+
+    def progress(stats):
+        rate = stats.total / max(time.perf_counter() - started, 1e-9)
+        print(f"\r{stats.total} items, {stats.changed} changed ({rate:.0f}/s)", end="", file=sys.stderr, flush=True)
+
+    async def run():
+        try:
+            return await engine.run(source, args.out, resume=args.resume, progress=progress)
+        finally:
+            if args.llm:
+                from app.services.llm_client import close_llm_client
+                await close_llm_client()
+
+    stats = asyncio.run(run())
+    print(file=sys.stderr)
+    print(render_report(stats))
+    with open(args.out + ".report.json", "w", encoding="utf-8") as f:
+        json.dump(stats.to_dict(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
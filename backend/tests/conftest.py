@@ -0,0 +1,56 @@
+# backend/tests/conftest.py
+import os
+import socket
+import tempfile
+
+# Before any app import: a throwaway database, no Groq, and an NER model
+# that fails at once instead of trying the Hub.
+_tmp = tempfile.mkdtemp(prefix="triage-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_tmp}/test.db",
+    "NER_PRELOAD": "false",
+    "NER_MODEL_DIR": os.path.join(_tmp, "no-model"),
+    "NER_ALLOW_FALLBACK": "false",
+    "GROQ_API_KEY": "",
+    "LLM_BACKENDS": "",
+    "LLM_CACHE_PATH": "",
+    "BCRYPT_ROUNDS": "4",
+})
+
+import pytest
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def stub_servers():
+    """Two stub LLM servers (benchmarks/stub_llm.py): a primary and a secondary."""
+    from benchmarks.stub_llm import StubServer, create_stub_app
+
+    primary = StubServer(create_stub_app(delay=0.02, seed=1), port=free_port())
+    secondary = StubServer(create_stub_app(delay=0.02, seed=2), port=free_port())
+    with primary, secondary:
+        yield primary, secondary
+
+
+@pytest.fixture
+def stubs(stub_servers):
+    """The stub servers, healthy and fast again after each test."""
+    yield stub_servers
+    for server in stub_servers:
+        state = server.app.state
+        state.delay, state.error_rate, state.slow_rate, state.slow_delay = 0.02, 0.0, 0.0, 0.0
+
+
+@pytest.fixture(scope="session")
+def db_tables():
+    from app.core.database import Base, engine
+    import app.models.user  # noqa: F401
+    import app.models.triage_record  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
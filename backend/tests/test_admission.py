@@ -0,0 +1,179 @@
+# backend/tests/test_admission.py
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import admission as admission_module
+from app.core.admission import AdmissionController, AdmissionRejected, admission
+from app.core.auth_cache import UserSnapshot
+from app.core.deps import get_current_user
+from app.models.user import UserRole
+
+PATIENT = UserSnapshot(1, "Pat", "pat@example.com", UserRole.patient)
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """A fresh controller behind the admission() dependency."""
+    def install(**kw):
+        ctl = AdmissionController(**{"capacity": 4, "max_wait": 0.5, "poll": 0.01, **kw})
+        monkeypatch.setattr(admission_module, "_controller", ctl)
+        return ctl
+    return install
+
+
+def test_rate_limit_answers_429_with_retry_after(controller):
+    controller(rate_per_minute=6, burst=2)  # one token every 10s
+    app = FastAPI()
+
+    @app.post("/llm")
+    async def llm(user=Depends(admission("new_chat"))):
+        return {"user": user.id}
+
+    app.dependency_overrides[get_current_user] = lambda: PATIENT
+    client = TestClient(app)
+    assert [client.post("/llm").status_code for _ in range(2)] == [200, 200]
+    res = client.post("/llm")
+    assert res.status_code == 429
+    assert 9 <= int(res.headers["Retry-After"]) <= 10
+    assert "Too many requests" in res.json()["detail"]
+
+
+def test_rate_limit_is_per_user():
+    ctl = AdmissionController(rate_per_minute=6, burst=1)
+    ctl.check_rate(1)
+    with pytest.raises(AdmissionRejected) as exc:
+        ctl.check_rate(1)
+    assert exc.value.reason == "rate_limited" and exc.value.retry_after > 0
+    ctl.check_rate(2)
+    ctl.check_rate(1, cost=0)  # free requests (dashboard polls) never run out
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def run():
+        ctl = AdmissionController(capacity=1, rate_per_minute=0, max_wait=2.0, poll=0.01)
+        order = []
+
+        async def request(name, priority, hold=0.0):
+            async with ctl.admit(1, priority):
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        first = asyncio.ensure_future(request("first", "new_chat", hold=0.1))
+        await asyncio.sleep(0.01)
+        waiters = []
+        for name, priority in [("new-1", "new_chat"), ("ongoing", "ongoing"), ("new-2", "new_chat"), ("doctor", "doctor")]:
+            waiters.append(asyncio.ensure_future(request(name, priority)))
+            await asyncio.sleep(0.005)
+        await asyncio.gather(first, *waiters)
+        return order, ctl.backend.in_flight(admission_module.SLOTS_KEY)
+
+    order, in_flight = asyncio.run(run())
+    assert order == ["first", "doctor", "ongoing", "new-1", "new-2"]
+    assert in_flight == 0
+
+
+def test_lower_classes_keep_headroom_and_are_shed_after_max_wait():
+    async def run():
+        ctl = AdmissionController(capacity=5, rate_per_minute=0, max_wait=0.1, poll=0.01,
+                                  shares={"doctor": 1.0, "ongoing": 0.8, "new_chat": 0.4})
+        held = asyncio.Event()
+
+        async def hold(priority):
+            async with ctl.admit(1, priority):
+                await held.wait()
+
+        holders = [asyncio.ensure_future(hold("new_chat")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as exc:
+            async with ctl.admit(2, "new_chat"):
+                pass
+        async with ctl.admit(3, "ongoing"):   # 2 of 5 in use: ongoing still fits
+            pass
+        held.set()
+        await asyncio.gather(*holders)
+        return exc.value
+
+    rejected = asyncio.run(run())
+    assert rejected.reason == "shed" and rejected.retry_after >= 1
+
+
+def test_no_healthy_backend_sheds_llm_calls_immediately():
+    ctl = AdmissionController(capacity=0, rate_per_minute=0)
+    ctl.total_capacity = lambda: 0
+
+    async def run():
+        async with ctl.admit(1, "new_chat"):
+            pass
+
+    with pytest.raises(AdmissionRejected) as exc:
+        asyncio.run(run())
+    assert exc.value.reason == "shed"
+
+
+def test_dashboard_stays_up_when_every_llm_backend_is_down(controller, monkeypatch, db_tables):
+    import main
+
+    ctl = controller(rate_per_minute=6, burst=1)
+    ctl.total_capacity = lambda: 0
+    doctor = UserSnapshot(2, "Doc", "doc@example.com", UserRole.doctor)
+    monkeypatch.setitem(main.app.dependency_overrides, get_current_user, lambda: doctor)
+    client = TestClient(main.app)
+    for _ in range(3):
+        assert client.get("/patients/").status_code == 200
+        assert client.get("/patients/next").status_code == 200
+
+
+def test_triage_priority_comes_from_server_side_state(controller, monkeypatch):
+    import main
+    from app.core.config import settings
+    from app.services import triage_service
+
+    ctl = controller(rate_per_minute=0)
+    seen = []
+    admit = ctl.admit
+    monkeypatch.setattr(ctl, "admit", lambda user_id, priority, cost=1.0: (seen.append(priority), admit(user_id, priority, cost))[1])
+
+    async def llm_triage(prompt, user_id=None, stop_if_not_final=True):
+        return {"final": False}
+
+    monkeypatch.setattr(settings, "TRIAGE_FAST_PATH", False)
+    monkeypatch.setattr(triage_service, "_llm_triage", llm_triage)
+    monkeypatch.setattr(triage_service, "_open_triages", triage_service._OpenTriages())
+    monkeypatch.setitem(main.app.dependency_overrides, get_current_user, lambda: PATIENT)
+    client = TestClient(main.app)
+    padded = {"messages": ["chest pain", "padding", "more padding"]}
+    assert client.post("/triage/process", json=padded).json() == {"continue": True}
+    client.post("/triage/process", json={"messages": ["chest pain", "since this morning"]})
+    assert seen == ["new_chat", "ongoing"]  # a padded first message is still a new chat
+
+
+def test_a_plugged_in_backend_holds_the_counters(monkeypatch):
+    class Recording(admission_module.InMemoryAdmissionBackend):
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        def acquire(self, key, limit):
+            self.calls.append(("acquire", key))
+            return super().acquire(key, limit)
+
+        def release(self, key):
+            self.calls.append(("release", key))
+            super().release(key)
+
+    backend = Recording()
+    monkeypatch.setattr(admission_module, "_controller", None)
+    monkeypatch.setattr(admission_module, "_backend", admission_module._backend)
+    admission_module.set_admission_backend(backend)
+    ctl = admission_module.get_admission_controller()
+    assert ctl.backend is backend
+
+    async def run():
+        async with ctl.admit(1, "doctor", cost=0):
+            return backend.in_flight(admission_module.SLOTS_KEY)
+
+    assert asyncio.run(run()) == 1
+    assert backend.calls == [("acquire", "llm"), ("release", "llm")]
@@ -0,0 +1,86 @@
+# backend/tests/test_ai_chat_service.py
+import asyncio
+
+import pytest
+
+from app.services.ai_chat_service import fragment_symptoms
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("chest pain and fever, cough", ["chest pain", "fever", "cough"]),
+    ("دوار", ["دوار"]),                      # the waw inside the word is not "and"
+    ("صداع ودوار", ["صداع", "دوار"]),
+    ("صداع و دوار", ["صداع", "دوار"]),
+    ("حمى، سعال ووجع في الصدر", ["حمى", "سعال", "وجع في الصدر"]),
+    ("وجع في الصدر", ["وجع في الصدر"]),
+    ("", ["unknown symptom"]),
+])
+def test_fragment_symptoms_splits_on_conjunctions_only(text, expected):
+    assert fragment_symptoms(text) == expected
+
+
+@pytest.mark.parametrize("symptoms, negated, final", [
+    (["crushing chest pain"], False, True),
+    (["crushing chest pain"], True, False),   # "no chest pain" must go to the LLM
+    (["fever"], False, False),                # High/Medium/Low are left to the LLM by default
+    (["chest"], False, False),                # a fragment of the term is not confident enough
+])
+def test_fast_path_decision(symptoms, negated, final):
+    from app.services.ai_chat_service import analyze_symptoms, fast_path_decision
+
+    data = fast_path_decision(analyze_symptoms(symptoms), negated)
+    assert (data is not None) == final
+    if final:
+        assert data["severity"] == "Critical" and data["source"] == "rules" and data["rule_version"]
+
+
+def _local_ner(monkeypatch):
+    from app.services import ai_chat_service, nlp_processing
+
+    async def extract(text):
+        return fragment_symptoms(text)
+
+    monkeypatch.setattr(ai_chat_service, "extract_symptoms_async", extract)
+    monkeypatch.setattr(nlp_processing, "model_status", lambda: {"state": "loaded"})
+
+
+def test_a_clear_cut_case_is_ticketed_without_the_llm(monkeypatch):
+    from app.core.config import settings
+    from app.services import triage_service
+
+    _local_ner(monkeypatch)
+    saved = []
+
+    class Writer:
+        async def save(self, user_id, data):
+            saved.append(data)
+
+    def no_llm():
+        raise AssertionError("the LLM must not be called")
+
+    monkeypatch.setattr(settings, "TRIAGE_FAST_PATH", True)
+    monkeypatch.setattr(triage_service, "get_llm_client", no_llm)
+    monkeypatch.setattr(triage_service, "get_triage_writer", lambda: Writer())
+    hits = triage_service.TRIAGE_FAST_PATH.value(outcome="hit")
+
+    result = asyncio.run(triage_service.analyze_triage(["Crushing chest pain", "since an hour"], user_id=11))
+    assert result["source"] == "rules" and result["ticket"].startswith("P") and saved
+    assert triage_service.TRIAGE_FAST_PATH.value(outcome="hit") == hits + 1
+    triage_service.get_triage_queue().discard(result["ticket"])
+
+
+def test_a_negated_message_goes_to_the_llm(monkeypatch):
+    from app.core.config import settings
+    from app.services import triage_service
+
+    _local_ner(monkeypatch)
+    prompts = []
+
+    async def llm_triage(prompt, user_id=None, stop_if_not_final=True):
+        prompts.append(prompt)
+        return {"final": False}
+
+    monkeypatch.setattr(settings, "TRIAGE_FAST_PATH", True)
+    monkeypatch.setattr(triage_service, "_llm_triage", llm_triage)
+    result = asyncio.run(triage_service.analyze_triage(["no chest pain, just a cough"], user_id=12))
+    assert result == {"final": False} and len(prompts) == 1
@@ -0,0 +1,35 @@
+# backend/tests/test_auth_cache.py
+from app.core.auth_cache import UserSnapshot, token_cache
+from app.core.database import SessionLocal
+from app.models.user import User, UserRole
+
+
+def _cache(token, user):
+    token_cache.put(token, {"sub": user.email}, UserSnapshot.from_user(user))
+
+
+def test_user_changes_invalidate_cached_tokens_only_after_commit(db_tables):
+    db = SessionLocal()
+    try:
+        user = User(name="Dr A", email="a@example.com", hashed_password="x", role=UserRole.doctor)
+        db.add(user)
+        db.commit()
+        _cache("tok-a", user)
+
+        user.role = UserRole.patient
+        db.flush()
+        assert token_cache.get("tok-a") is not None  # not committed yet: others still see the old row
+
+        db.rollback()
+        assert token_cache.get("tok-a") is not None
+
+        user.email = "a2@example.com"
+        db.commit()
+        assert token_cache.get("tok-a") is None  # old email's tokens are gone
+
+        _cache("tok-a2", user)
+        db.delete(user)
+        db.commit()
+        assert token_cache.get("tok-a2") is None
+    finally:
+        db.close()
@@ -0,0 +1,140 @@
+# backend/tests/test_conversation_store.py
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core.auth_cache import UserSnapshot
+from app.core.deps import get_current_user
+from app.models.user import UserRole
+from app.services import conversation_store
+from app.services.conversation_store import (
+    ConversationSession, ConversationStore, InMemorySessionBackend, SessionBackend, estimate_tokens,
+)
+from app.services.llm_client import LLMUnavailableError
+
+PATIENT = UserSnapshot(21, "Pat", "pat21@example.com", UserRole.patient)
+SYSTEM = "You are a triage assistant. Reply with JSON."
+
+
+def _tokens(messages):
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+def test_prompt_stays_within_the_token_budget_however_long_the_conversation():
+    store = ConversationStore(InMemorySessionBackend(), token_budget=200, summary_max_chars=300)
+    session = store.create(user_id=1)
+    session.merge_state({"symptoms": ["chest pain"], "duration": "2 hours"})
+    for i in range(60):
+        session.add_turn("ai", f"Question {i}: can you describe it in a bit more detail, please?")
+        session.add_turn("patient", f"Answer {i}: it is still there and it spreads to my left arm")
+
+        messages = store.build_messages(session, SYSTEM)
+        assert _tokens(messages) <= 200
+        assert messages[-1]["content"] == session.turns[-1]["content"]  # the newest turn always goes
+
+    note = messages[1]["content"]
+    assert "Symptoms: chest pain" in note and "Duration: 2 hours" in note
+    assert "Earlier in the conversation:" in note and len(session.summary) <= 301
+    assert len(messages) < 20
+
+
+def test_sessions_round_trip_through_a_dict():
+    session = ConversationSession(id="s1", user_id=3)
+    session.add_turn("patient", "headache")
+    session.merge_state({"symptoms": ["headache"]})
+    assert ConversationSession.from_dict(session.to_dict()) == session
+
+
+class _DictBackend(SessionBackend):
+    """Stores sessions serialized, like a shared store would."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def load(self, session_id):
+        row = self.rows.get(session_id)
+        return ConversationSession.from_dict(row) if row else None
+
+    def save(self, session):
+        self.rows[session.id] = session.to_dict()
+
+    def delete(self, session_id):
+        self.rows.pop(session_id, None)
+
+
+def test_a_session_triage_continues_across_requests(monkeypatch):
+    import main
+    from app.core.config import settings
+    from app.services import triage_service
+
+    monkeypatch.setattr(conversation_store, "_backend", conversation_store._backend)
+    monkeypatch.setattr(conversation_store, "_store", None)
+    conversation_store.set_session_backend(_DictBackend())
+    prompts, saved = [], []
+    replies = iter([
+        {"final": False, "symptoms": ["chest pain"], "source": "llm"},
+        {"final": True, "severity": "High", "symptoms": [], "duration": "2 hours", "risk_factors": ["smoker"],
+         "source": "llm"},
+    ])
+
+    async def llm_triage(prompt, user_id=None, stop_if_not_final=True):
+        prompts.append(prompt)
+        return next(replies)
+
+    class Writer:
+        async def save(self, user_id, data):
+            saved.append(data)
+
+    monkeypatch.setattr(settings, "TRIAGE_FAST_PATH", False)
+    monkeypatch.setattr(triage_service, "_llm_triage", llm_triage)
+    monkeypatch.setattr(triage_service, "get_triage_writer", lambda: Writer())
+    monkeypatch.setitem(main.app.dependency_overrides, get_current_user, lambda: PATIENT)
+    client = TestClient(main.app)
+
+    session_id = client.post("/chat/sessions").json()["session_id"]
+    url = f"/triage/sessions/{session_id}"
+    assert client.post(url, json={"message": "my chest hurts"}).json() == {"continue": True}
+    result = client.post(url, json={"message": "for two hours, I smoke"}).json()
+
+    # The second prompt carries what the first turn established, and only the turns that fit
+    assert "Symptoms: chest pain" in prompts[1][1]["content"]
+    assert prompts[1][-1] == {"role": "user", "content": "for two hours, I smoke"}
+    assert result["summary"] == {
+        "symptoms": ["chest pain"], "duration": "2 hours", "severity": "High", "risk_factors": ["smoker"],
+    }
+    ticket = result["ticket"]["number"]
+    assert client.post(url, json={}).json()["ticket"]["number"] == ticket  # a re-post isn't queued twice
+    assert len(saved) == 1 and len(prompts) == 2
+    triage_service.get_triage_queue().discard(ticket)
+
+
+def test_session_triage_reads_new_text_once_for_fast_path_and_fallback(monkeypatch):
+    from app.core.config import settings
+    from app.services import triage_service
+
+    seen = {}
+
+    async def fast_path(text, session=None):
+        seen["fast_path"] = text
+        return None
+
+    async def llm_triage(*args, **kwargs):
+        raise LLMUnavailableError("all backends down")
+
+    async def rules_fallback(text, session=None):
+        seen["fallback"] = text
+        return {"final": False}
+
+    monkeypatch.setattr(settings, "TRIAGE_FAST_PATH", True)
+    monkeypatch.setattr(triage_service, "_fast_path", fast_path)
+    monkeypatch.setattr(triage_service, "_llm_triage", llm_triage)
+    monkeypatch.setattr(triage_service, "_rules_fallback", rules_fallback)
+
+    session = ConversationStore(InMemorySessionBackend()).create(user_id=1)
+    session.add_turn("patient", "I have a cough")
+    session.take_new_patient_text()
+    session.symptoms = ["cough"]
+
+    result = asyncio.run(triage_service.analyze_triage_session(session, "and chest pain", user_id=1))
+    assert result == {"final": False}
+    assert seen == {"fast_path": "and chest pain", "fallback": "and chest pain"}
@@ -0,0 +1,38 @@
+# backend/tests/test_database.py
+import asyncio
+
+from app.core.database import async_database_url, engine
+from app.services.patient_queue import QueueQuery, fetch_queue_page, fetch_queue_page_async
+
+
+def test_async_url_swaps_in_the_async_driver():
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert async_database_url("postgresql://u:p@db/er") == "postgresql+asyncpg://u:p@db/er"
+    assert async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_sqlite_connections_get_the_pragmas(db_tables):
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() > 0
+
+
+def test_async_and_sync_queue_pages_agree(db_tables):
+    from app.core.database import SessionLocal, dispose_async_engine
+    from app.core.deps import get_async_db
+    from app.services.triage_writer import build_triage_record
+
+    with SessionLocal() as db:
+        db.add_all([build_triage_record(9101, {"severity": "Low", "ticket": f"C9{i}"}) for i in range(3)])
+        db.commit()
+    query = QueueQuery(limit=2, fields=["id", "ticket"])
+
+    async def run():
+        try:
+            async for db in get_async_db():
+                return await fetch_queue_page_async(db, query)
+        finally:
+            await dispose_async_engine()
+
+    with SessionLocal() as db:
+        assert asyncio.run(run()) == fetch_queue_page(db, query)
@@ -0,0 +1,133 @@
+# backend/tests/test_llm_cache.py
+import asyncio
+
+from app.services.llm_cache import LLMResponseCache, cache_key
+from app.services.llm_client import LLMBackend, LLMClient
+
+
+def _key(content, **kw):
+    options = {"model": "m", "prompt_version": "v1", "temperature": 0.2, **kw}
+    return cache_key([{"role": "user", "content": content}], **options)
+
+
+def test_key_ignores_case_spacing_and_outer_punctuation():
+    assert _key("Chest pain.") == _key("  chest   PAIN ")
+    assert _key("chest pain") != _key("chest pains")
+    assert _key("chest pain") != _key("chest pain", prompt_version="v2")
+    assert _key("chest pain") != _key("chest pain", params={"max_tokens": 10})
+
+
+def test_cacheable_by_mode():
+    assert LLMResponseCache(mode="deterministic", max_temperature=0.2).cacheable("v1", 0.2)
+    assert not LLMResponseCache(mode="deterministic", max_temperature=0.2).cacheable("v1", 0.7)
+    assert not LLMResponseCache(mode="deterministic").cacheable(None, 0.0)
+    assert LLMResponseCache(mode="all").cacheable("v1", 1.0)
+    assert not LLMResponseCache(mode="off").cacheable("v1", 0.0)
+
+
+def test_hit_after_miss_and_ttl_expiry():
+    cache = LLMResponseCache(ttl=0.05)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "reply"
+
+    async def run():
+        first = await cache.get_or_call("k", call)
+        second = await cache.get_or_call("k", call)
+        await asyncio.sleep(0.06)
+        third = await cache.get_or_call("k", call)
+        return first, second, third
+
+    assert asyncio.run(run()) == ("reply", "reply", "reply")
+    assert len(calls) == 2
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = LLMResponseCache(max_entries=2)
+
+    async def run():
+        for key in ("a", "b"):
+            await cache.put(key, key, 0.1)
+        await cache.get("a")
+        await cache.put("c", "c", 0.1)
+        return [await cache.get(k) is not None for k in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [True, False, True]
+
+
+def test_concurrent_misses_share_one_call():
+    cache = LLMResponseCache()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "shared"
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_call("k", call) for _ in range(10)])
+
+    assert asyncio.run(run()) == ["shared"] * 10
+    assert len(calls) == 1
+
+
+def test_waiters_make_their_own_call_when_the_leader_fails():
+    cache = LLMResponseCache()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        if len(calls) == 1:
+            raise RuntimeError("upstream down")
+        return "retry"
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_call("k", call) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == ["retry", "retry"]
+    assert asyncio.run(cache.get("k")) is None  # failures and waiter retries aren't cached
+
+
+def test_disk_store_survives_a_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+
+    async def run():
+        first = LLMResponseCache(path=path)
+        await first.put("k", "from disk", 0.5)
+        first.close()
+        second = LLMResponseCache(path=path)
+        try:
+            return await second.get("k")
+        finally:
+            second.close()
+
+    reply = asyncio.run(run())
+    assert reply is not None and reply.text == "from disk"
+
+
+def test_client_only_caches_versioned_calls(stubs):
+    primary, _ = stubs
+
+    async def run():
+        client = LLMClient(
+            [LLMBackend("cache-primary", kind="openai", base_url=f"{primary.url}/v1")],
+            cache=LLMResponseCache(),
+        )
+        messages = [{"role": "user", "content": "Chest pain"}]
+        try:
+            before = primary.app.state.requests
+            for _ in range(3):
+                await client.complete(messages, model="stub", temperature=0.0, prompt_version="v1")
+            cached = primary.app.state.requests - before
+            for _ in range(2):
+                await client.complete(messages, model="stub", temperature=0.0)
+            return cached, primary.app.state.requests - before - cached
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == (1, 2)
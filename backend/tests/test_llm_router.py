@@ -0,0 +1,190 @@
+# backend/tests/test_llm_router.py
+import asyncio
+import time
+
+import pytest
+
+from app.services import llm_client
+from app.services.llm_client import CircuitBreaker, LLMBackend, LLMClient, LLMUnavailableError
+
+MESSAGES = [{"role": "user", "content": "I have chest pain and my left arm feels numb"}]
+
+
+def _client(servers, names, hedge_after=None, timeout=5.0, **breaker):
+    breaker = {"window": 5, "error_rate": 0.5, "min_calls": 3, "cooldown": 60.0, **breaker}
+    backends = [
+        LLMBackend(name, kind="openai", base_url=f"{server.url}/v1", breaker=CircuitBreaker(name=name, **breaker))
+        for name, server in zip(names, servers)
+    ]
+    return LLMClient(backends, timeout=timeout, hedge_after=hedge_after)
+
+
+async def _complete(client, i=0):
+    return await client.complete(MESSAGES + [{"role": "user", "content": str(i)}], model="stub", temperature=0.2)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_error_rate_and_probes_once():
+    clock = Clock()
+    breaker = CircuitBreaker(window=4, error_rate=0.5, min_calls=4, cooldown=10, name="unit", clock=clock)
+    for ok in (True, False, True):
+        breaker.record(ok)
+    assert breaker.state == "closed"
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert not breaker.allow() and not breaker.available()
+
+    clock.now = 10
+    assert breaker.available()
+    assert breaker.allow() and breaker.state == "half-open"
+    assert not breaker.allow()  # one probe at a time
+    breaker.release()           # the probe was cancelled: no verdict
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+def test_breaker_opens_on_outage_and_closes_after_recovery(stubs):
+    primary, secondary = stubs
+    primary.app.state.error_rate = 1.0
+
+    async def run():
+        client = _client(stubs, ["outage-primary", "outage-secondary"], cooldown=0.3)
+        try:
+            replies = [await _complete(client, i) for i in range(8)]
+            opened = client.backends[0].breaker.state
+            calls_while_open = primary.app.state.requests
+            await _complete(client, 99)
+            calls_after = primary.app.state.requests
+
+            primary.app.state.error_rate = 0.0
+            await asyncio.sleep(0.35)
+            await _complete(client, 100)  # the half-open probe
+            return replies, opened, calls_while_open, calls_after, client.backends[0].breaker.state
+        finally:
+            await client.aclose()
+
+    requests_before = primary.app.state.requests
+    replies, opened, calls_while_open, calls_after, recovered = asyncio.run(run())
+
+    assert len(replies) == 8  # every call failed over to the secondary
+    assert opened == "open"
+    assert calls_while_open - requests_before == 3  # min_calls, then the primary is skipped
+    assert calls_after == calls_while_open
+    assert recovered == "closed"
+
+
+def test_hedge_wins_and_cancels_the_slow_attempt(stubs):
+    primary, _ = stubs
+    primary.app.state.slow_rate, primary.app.state.slow_delay = 1.0, 3.0
+    cancelled = lambda: llm_client.LLM_REQUESTS.value(backend="hedge-primary", outcome="cancelled")
+    won = lambda: llm_client.LLM_HEDGES.value(backend="hedge-secondary", result="won")
+    cancelled_before, won_before = cancelled(), won()
+
+    async def run():
+        client = _client(stubs, ["hedge-primary", "hedge-secondary"], hedge_after=0.1)
+        try:
+            started = time.perf_counter()
+            await _complete(client)
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(0)  # let the cancelled attempt unwind
+            return elapsed, client.backends[0].breaker.state
+        finally:
+            await client.aclose()
+
+    elapsed, breaker_state = asyncio.run(run())
+    assert elapsed < 1.0
+    assert won() - won_before == 1
+    assert cancelled() - cancelled_before == 1
+    assert llm_client.LLM_IN_FLIGHT.value(backend="hedge-primary") == 0
+    assert breaker_state == "closed"  # a cancelled loser is no verdict on the backend
+
+
+def test_all_backends_down_raises_unavailable(stubs):
+    for server in stubs:
+        server.app.state.error_rate = 1.0
+
+    async def run():
+        client = _client(stubs, ["down-primary", "down-secondary"])
+        try:
+            with pytest.raises(LLMUnavailableError):
+                await _complete(client)
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_triage_falls_back_to_rules_when_no_backend_answers(stubs, monkeypatch):
+    from app.core.config import settings
+    from app.services import triage_service
+
+    for server in stubs:
+        server.app.state.error_rate = 1.0
+    saved = []
+
+    class Writer:
+        async def save(self, user_id, data):
+            saved.append((user_id, dict(data)))
+
+    monkeypatch.setattr(settings, "TRIAGE_FAST_PATH", False)
+    monkeypatch.setattr(triage_service, "get_triage_writer", lambda: Writer())
+    fallbacks_before = triage_service.TRIAGE_LLM_FALLBACK.value()
+
+    async def run():
+        client = _client(stubs, ["fallback-primary", "fallback-secondary"])
+        monkeypatch.setattr(triage_service, "get_llm_client", lambda: client)
+        try:
+            return await triage_service.analyze_triage([MESSAGES[0]["content"]], user_id=7)
+        finally:
+            await client.aclose()
+
+    result = asyncio.run(run())
+    assert result["final"] is True
+    assert result["source"] == "rules-fallback"
+    assert result["severity"] == "Critical"
+    assert result["ticket"].startswith("P")
+    assert saved and saved[0][0] == 7
+    assert triage_service.TRIAGE_LLM_FALLBACK.value() - fallbacks_before == 1
+    triage_service.get_triage_queue().discard(result["ticket"])
+
+
+def test_rules_fallback_does_not_ticket_a_message_without_symptoms(stubs, monkeypatch):
+    from app.core.config import settings
+    from app.services import triage_service
+
+    for server in stubs:
+        server.app.state.error_rate = 1.0
+    saved = []
+
+    class Writer:
+        async def save(self, user_id, data):
+            saved.append(data)
+
+    monkeypatch.setattr(settings, "TRIAGE_FAST_PATH", False)
+    monkeypatch.setattr(triage_service, "get_triage_writer", lambda: Writer())
+    fallbacks_before = triage_service.TRIAGE_LLM_FALLBACK.value()
+
+    async def run():
+        client = _client(stubs, ["nomatch-primary", "nomatch-secondary"])
+        monkeypatch.setattr(triage_service, "get_llm_client", lambda: client)
+        try:
+            return await triage_service.analyze_triage(["hi"], user_id=7)
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == {"final": False}
+    assert saved == []
+    assert triage_service.TRIAGE_LLM_FALLBACK.value() == fallbacks_before
@@ -0,0 +1,44 @@
+# backend/tests/test_ner_batcher.py
+import asyncio
+
+from app.services import ner_batcher
+from app.services.ner_batcher import NERBatcher
+
+
+def test_batches_concurrent_requests(monkeypatch):
+    from app.services import nlp_processing
+
+    calls = []
+
+    def fake_batch(texts, batch_size=16):
+        calls.append(list(texts))
+        return [[t.upper()] for t in texts]
+
+    monkeypatch.setattr(nlp_processing, "extract_symptoms_batch", fake_batch)
+    batcher = NERBatcher(max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*[batcher.submit(f"text {i}") for i in range(5)])
+
+    try:
+        assert asyncio.run(run()) == [[f"TEXT {i}"] for i in range(5)]
+    finally:
+        batcher.stop(timeout=5)
+    assert len(calls) == 1 and len(calls[0]) == 5
+
+
+def test_delivery_to_a_closed_loop_or_finished_future_is_skipped():
+    loop = asyncio.new_event_loop()
+    future = loop.create_future()
+    loop.close()
+    ner_batcher._deliver(loop, future, ["x"], None)  # no RuntimeError out of the worker
+
+    loop = asyncio.new_event_loop()
+    try:
+        future = loop.create_future()
+        future.cancel()
+        ner_batcher._deliver(loop, future, ["x"], None)
+        loop.run_until_complete(asyncio.sleep(0))
+        assert future.cancelled()
+    finally:
+        loop.close()
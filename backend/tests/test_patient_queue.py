@@ -0,0 +1,76 @@
+# backend/tests/test_patient_queue.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.services.patient_queue import InvalidQueueQuery, QueueQuery, fetch_queue_page, parse_fields
+
+# A window of its own, so rows written by other tests stay out of the pages
+T0 = datetime(2091, 1, 1, 8, 0)
+WINDOW = {"since": T0, "until": T0 + timedelta(days=1)}
+
+
+def _pages(**kw):
+    ids, cursor = [], None
+    with SessionLocal() as db:
+        while True:
+            items, cursor = fetch_queue_page(db, QueueQuery(**WINDOW, cursor=cursor, **kw))
+            ids.append([item["id"] for item in items])
+            if cursor is None:
+                return ids
+
+
+@pytest.fixture(scope="module")
+def records(db_tables):
+    from app.services.triage_writer import build_triage_record
+
+    rows = [
+        # (minutes after T0, severity, status); two pairs share a timestamp
+        (0, "Low", "waiting"), (5, "High", "waiting"), (5, "Medium", "done"),
+        (9, "High", "in-progress"), (12, "Critical", "waiting"), (12, "Low", "waiting"),
+        (20, "Medium", "waiting"),
+    ]
+    with SessionLocal() as db:
+        created = []
+        for minutes, severity, status in rows:
+            record = build_triage_record(9201, {"severity": severity, "ticket": "C0"})
+            record.timestamp, record.status = T0 + timedelta(minutes=minutes), status
+            created.append(record)
+        db.add_all(created)
+        db.commit()
+        return [(r.id, r.timestamp, r.severity_label, r.status) for r in created]
+
+
+def _newest_first(records):
+    return [r[0] for r in sorted(records, key=lambda r: (r[1], r[0]), reverse=True)]
+
+
+def test_keyset_pages_cover_every_row_once_newest_first(records):
+    pages = _pages(limit=3)
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert sum(pages, []) == _newest_first(records)
+
+
+def test_a_page_that_ends_exactly_at_the_last_row_has_no_cursor(records):
+    assert _pages(limit=7) == [_newest_first(records)]
+
+
+def test_filters_combine_with_paging(records):
+    waiting_or_done = [r for r in records if r[3] in ("waiting", "done") and r[2] in ("High", "Low", "Medium")]
+    pages = _pages(limit=2, status=["waiting", "done"], severity=["High", "Low", "Medium"])
+    assert sum(pages, []) == _newest_first(waiting_or_done)
+
+
+def test_fields_select_the_columns(records):
+    with SessionLocal() as db:
+        items, _ = fetch_queue_page(db, QueueQuery(**WINDOW, limit=1, fields=parse_fields("ticket,severity")))
+    assert items == [{"ticket": "C0", "severity": "Medium"}]
+
+
+def test_bad_cursor_and_unknown_fields_are_rejected():
+    with pytest.raises(InvalidQueueQuery):
+        with SessionLocal() as db:
+            fetch_queue_page(db, QueueQuery(cursor="not-a-cursor"))
+    with pytest.raises(InvalidQueueQuery):
+        parse_fields("id,password")
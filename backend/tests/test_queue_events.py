@@ -0,0 +1,92 @@
+# backend/tests/test_queue_events.py
+import asyncio
+
+import pytest
+
+from app.services import queue_events
+from app.services.queue_events import InMemoryBroadcaster
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    backend = InMemoryBroadcaster(history=3, subscriber_queue=4)
+    monkeypatch.setattr(queue_events, "_backend", queue_events._backend)
+    queue_events.set_event_backend(backend)
+    return backend
+
+
+def _publish(backend, n):
+    return [backend.publish("created", {"id": i}).seq for i in range(n)]
+
+
+async def _take(events, n):
+    out = [await asyncio.wait_for(events.__anext__(), 1) for _ in range(n)]
+    await events.aclose()
+    return out
+
+
+def test_reconnect_replays_only_what_was_missed(broadcaster):
+    _publish(broadcaster, 3)
+    events = asyncio.run(_take(broadcaster.subscribe(since=1), 2))
+    assert [(e.seq, e.type) for e in events] == [(2, "created"), (3, "created")]
+
+
+def test_live_events_follow_the_replay():
+    async def run():
+        backend = InMemoryBroadcaster()
+        _publish(backend, 2)
+        events = backend.subscribe(since=1)
+        first = await events.__anext__()
+        backend.publish("updated", {"id": 1})
+        return [first] + await _take(events, 1)
+
+    assert [(e.seq, e.type) for e in asyncio.run(run())] == [(2, "created"), (3, "updated")]
+
+
+def test_a_gap_older_than_the_buffer_gets_a_reset(broadcaster):
+    _publish(broadcaster, 5)  # the buffer keeps 3..5
+    [event] = asyncio.run(_take(broadcaster.subscribe(since=1), 1))
+    assert (event.type, event.seq) == ("reset", 5)
+
+
+def test_a_slow_subscriber_is_told_to_resync():
+    async def run():
+        backend = InMemoryBroadcaster(subscriber_queue=2)
+        events = backend.subscribe()
+        pending = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)  # subscribed
+        _publish(backend, 5)    # 2 fit in its queue, the rest overflow
+        await asyncio.sleep(0.01)
+        seen = [await pending] + await _take(events, 1)
+        return [(e.type, e.seq) for e in seen]
+
+    # The dropped range is covered by the reset: the client re-fetches /patients/
+    assert asyncio.run(run()) == [("created", 1), ("reset", 5)]
+
+
+def _stream(since=None, last_event_id=None, n=2):
+    from app.routes.patients import queue_events as route
+
+    async def run():
+        response = await route(since=since, last_event_id=last_event_id, current_user=None)
+        body = response.body_iterator
+        chunks = [await asyncio.wait_for(body.__anext__(), 1) for _ in range(n)]
+        await body.aclose()
+        return chunks
+
+    return asyncio.run(run())
+
+
+def test_stream_says_hello_then_replays_since(broadcaster):
+    _publish(broadcaster, 3)
+    hello, event = _stream(since=2)
+    assert hello == 'event: hello\ndata: {"seq": 3}\n\n'
+    assert event.startswith("id: 3\nevent: created\n")
+
+
+def test_last_event_id_resumes_unless_since_is_given(broadcaster):
+    _publish(broadcaster, 3)
+    assert _stream(last_event_id=1)[1].startswith("id: 2\n")
+    assert _stream(since=2, last_event_id=1)[1].startswith("id: 3\n")
+    _publish(broadcaster, 2)  # the buffer keeps 3..5
+    assert _stream(last_event_id=1)[1].startswith("id: 5\nevent: reset\n")
@@ -0,0 +1,88 @@
+# backend/tests/test_queue_snapshot.py
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.auth_cache import UserSnapshot
+from app.core.deps import get_current_user
+from app.models.user import UserRole
+from app.services import patient_queue
+from app.services.queue_events import publish_queue_event
+from app.services.queue_snapshot import QueueSnapshotCache, etag_matches
+
+DOCTOR = UserSnapshot(2, "Doc", "doc@example.com", UserRole.doctor)
+T0 = datetime(2092, 1, 1, 8, 0)
+WINDOW = {"since": T0.isoformat(), "until": (T0 + timedelta(days=1)).isoformat()}
+
+
+@pytest.fixture
+def client(monkeypatch, db_tables):
+    import main
+    from app.services.queue_snapshot import snapshot_cache
+
+    snapshot_cache.clear()
+    queries = []
+    fetch = patient_queue.fetch_queue_page_async
+
+    async def counting_fetch(db, q):
+        queries.append(q)
+        return await fetch(db, q)
+
+    monkeypatch.setattr(patient_queue, "fetch_queue_page_async", counting_fetch)
+    monkeypatch.setitem(main.app.dependency_overrides, get_current_user, lambda: DOCTOR)
+    client = TestClient(main.app)
+    client.queries = queries
+    return client
+
+
+def _add_record(ticket):
+    from app.core.database import SessionLocal
+    from app.services.triage_writer import build_triage_record
+
+    with SessionLocal() as db:
+        record = build_triage_record(9301, {"severity": "High", "ticket": ticket})
+        record.timestamp = T0
+        db.add(record)
+        db.commit()
+        return {"id": record.id}
+
+
+def test_unchanged_queue_is_served_from_memory_and_revalidates_with_304(client):
+    first = client.get("/patients/", params=WINDOW)
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+    etag = first.headers["ETag"]
+
+    again = client.get("/patients/", params=WINDOW)
+    assert again.content == first.content and again.headers["ETag"] == etag
+    not_modified = client.get("/patients/", params=WINDOW, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert len(client.queries) == 1
+
+
+def test_a_queue_event_invalidates_the_snapshot(client):
+    etag = client.get("/patients/", params=WINDOW).headers["ETag"]
+
+    publish_queue_event("updated", {"id": -1})  # a change elsewhere: same rows, same ETag
+    res = client.get("/patients/", params=WINDOW, headers={"If-None-Match": etag})
+    assert res.status_code == 304 and len(client.queries) == 2
+
+    publish_queue_event("created", _add_record("A9301"))
+    res = client.get("/patients/", params=WINDOW, headers={"If-None-Match": etag})
+    assert res.status_code == 200 and res.headers["ETag"] != etag
+    assert [r["ticket"] for r in res.json()] == ["A9301"]
+
+
+def test_snapshot_from_an_older_version_is_dropped():
+    cache = QueueSnapshotCache()
+    version = cache.current_version()
+    cache.put("k", version, [{"id": 1}], None)
+    assert cache.get("k").body == b'[{"id":1}]'
+    publish_queue_event("updated", {"id": 1})
+    assert cache.get("k") is None
+
+
+def test_etag_matching():
+    assert etag_matches('"q-1", W/"q-2"', '"q-2"')
+    assert etag_matches("*", '"q-1"')
+    assert not etag_matches(None, '"q-1"') and not etag_matches('"q-9"', '"q-1"')
@@ -0,0 +1,72 @@
+# backend/tests/test_retriage.py
+import asyncio
+import json
+
+import pytest
+
+from app.services.retriage import RetriageEngine, iter_jsonl, load_checkpoint
+
+LINES = [
+    {"id": "r1", "messages": ["chest pain"], "severity_label": "Critical"},
+    {"id": "r2", "text": "sore throat, cough", "severity": "Low"},
+    {"id": "r3", "history": [{"role": "patient", "content": "high fever"}, {"role": "ai", "content": "Since?"}]},
+    {"request_id": "r4", "title": "Headache", "body": "and vomiting", "expected": "High"},
+] * 3
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "intakes.jsonl"
+    path.write_text("\n".join(json.dumps(line) for line in LINES) + "\nnot json\n", encoding="utf-8")
+    return str(path)
+
+
+def _run(source, output, resume=False, stop_after=None):
+    def items(after_seq):
+        for n, item in enumerate(iter_jsonl(source, after_seq)):
+            if stop_after is not None and n == stop_after:
+                raise KeyboardInterrupt
+            yield item
+
+    engine = RetriageEngine(extractor="fragments", workers=0, chunk_size=3)
+    return asyncio.run(engine.run(items, output, resume=resume))
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_sources_read_every_shape(source):
+    items = list(iter_jsonl(source))
+    assert [i.id for i in items[:4]] == ["r1", "r2", "r3", "r4"]
+    assert [i.text for i in items[:4]] == ["chest pain", "sore throat, cough", "high fever", "Headache\nand vomiting"]
+    assert [i.stored_severity for i in items[:4]] == ["Critical", "Low", None, "High"]
+    assert [i.seq for i in iter_jsonl(source, after_seq=10)] == [11, 12]
+
+
+def test_an_interrupted_run_resumes_without_repeating_or_losing_items(source, tmp_path):
+    full = str(tmp_path / "full.jsonl")
+    expected = _run(source, full)
+
+    output = str(tmp_path / "out.jsonl")
+    with pytest.raises(KeyboardInterrupt):
+        _run(source, output, stop_after=8)
+    checkpoint = load_checkpoint(output)
+    assert 0 < checkpoint["last_seq"] < len(LINES)
+    with open(output, "ab") as f:
+        f.write(b'{"id": "half a line')  # written after the checkpoint, then the crash
+
+    stats = _run(source, output, resume=True)
+    assert _lines(output) == _lines(full)
+    assert [r["seq"] for r in _lines(output)] == list(range(1, len(LINES) + 1))
+    assert stats.to_dict() == expected.to_dict()
+    assert load_checkpoint(output)["last_seq"] == len(LINES)
+
+
+def test_without_resume_the_output_starts_over(source, tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    _run(source, output)
+    assert len(_lines(output)) == len(LINES)
+    _run(source, output)
+    assert len(_lines(output)) == len(LINES)
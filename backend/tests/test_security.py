@@ -0,0 +1,38 @@
+# backend/tests/test_security.py
+import asyncio
+
+from app.core import security
+
+
+def test_password_pool_is_rebuilt_for_each_lifespan():
+    async def roundtrip():
+        hashed = await security.get_password_hash_async("s3cret")
+        return await security.verify_password_async("s3cret", hashed)
+
+    for _ in range(2):
+        security.init_password_pool()
+        assert asyncio.run(roundtrip())
+        security.close_password_pool()
+    assert security._password_pool is None
+
+
+def test_saturated_pool_rejects_with_retry_after():
+    pool = security.PasswordHasherPool(workers=1, queue_size=0)
+
+    async def run():
+        release = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        first = asyncio.ensure_future(pool.run(lambda: asyncio.run_coroutine_threadsafe(release.wait(), loop).result()))
+        await asyncio.sleep(0.05)
+        try:
+            await pool.run(lambda: None)
+        except security.PasswordPoolSaturated as e:
+            return e.retry_after
+        finally:
+            release.set()
+            await first
+
+    try:
+        assert asyncio.run(run()) >= 1
+    finally:
+        pool.shutdown()
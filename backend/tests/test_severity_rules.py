@@ -0,0 +1,65 @@
+# backend/tests/test_severity_rules.py
+import json
+import os
+import time
+
+import pytest
+
+from app.services.severity_rules import RuleStore, RuleTableError, parse_rule_table
+
+RULES = {
+    "version": "t1",
+    "weights": {"chest pain": 5, "cough": 2},
+    "labels": {"5": "Critical", "2": "Low"},
+    "synonyms": [["tight chest", "chest pain"]],
+}
+
+
+def _write(path, content, bump=0):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content if isinstance(content, str) else json.dumps(content))
+    os.utime(path, (time.time() + bump, time.time() + bump))  # a new mtime even on coarse clocks
+
+
+def _update(store, content, bump):
+    _write(store.path, content, bump)
+    time.sleep(0.02)  # past the check interval
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write(path, RULES)
+    return RuleStore(path, check_interval=0.01)
+
+
+def test_a_changed_file_is_picked_up(store):
+    table = store.current()
+    assert table.version == "t1" and table.matcher.score(["tight chest"]) == "Critical"
+
+    _update(store, {**RULES, "version": "t2", "weights": {"chest pain": 2, "cough": 2}}, bump=10)
+    assert store.current().version == "t2"
+    assert store.current().matcher.score(["tight chest"]) == "Low"
+    assert table.version == "t1"  # a request holding the old table keeps it
+
+
+def test_a_broken_file_keeps_the_last_good_table(store):
+    _update(store, "{not json", bump=10)
+    assert store.current().version == "t1"
+    _update(store, {**RULES, "version": "t3", "labels": {"5": "Critical"}}, bump=20)  # weight 2 unlabeled
+    assert store.current().version == "t1"
+    _update(store, {**RULES, "version": "t4"}, bump=30)
+    assert store.current().version == "t4"
+
+
+def test_a_missing_file_keeps_the_last_good_table(store):
+    os.remove(store.path)
+    time.sleep(0.02)
+    assert store.current().version == "t1"
+
+
+def test_validation():
+    with pytest.raises(RuleTableError, match="No label"):
+        parse_rule_table({**RULES, "labels": {"5": "Critical"}})
+    with pytest.raises(RuleTableError, match="Malformed"):
+        parse_rule_table({"version": "x", "weights": {"a": "high"}, "labels": {}})
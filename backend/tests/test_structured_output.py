@@ -0,0 +1,62 @@
+# backend/tests/test_structured_output.py
+import pytest
+
+from app.services.structured_output import (
+    JsonFieldScanner, StructuredOutputError, extract_json_object, parse_triage_decision,
+)
+
+REPLY = '{"final": true, "severity": "High", "symptoms": ["chest pain", "a \\"tight\\" chest"], ' \
+        '"duration": "2 hours", "meta": {"final": false}, "score": 42, "note": null}'
+
+
+def _feed_in(pieces):
+    scanner, seen = JsonFieldScanner(), []
+    for piece in pieces:
+        seen.append(scanner.feed(piece))
+    return scanner, seen
+
+
+def test_reports_each_top_level_scalar_once_complete():
+    scanner, seen = _feed_in(['Sure! {"fin', 'al": tr', 'ue, "sever', 'ity": "Hi', 'gh", "sym'])
+    assert seen == [{}, {}, {"final": True}, {}, {"severity": "High"}]
+    assert scanner.fields == {"final": True, "severity": "High"}
+    assert not scanner.done
+
+
+def test_same_fields_whatever_the_chunking():
+    expected = {"final": True, "severity": "High", "duration": "2 hours", "score": 42, "note": None}
+    for size in (1, 2, 3, 7, len(REPLY)):
+        scanner, _ = _feed_in([REPLY[i:i + size] for i in range(0, len(REPLY), size)])
+        assert scanner.fields == expected, size
+        assert scanner.done
+
+
+def test_nested_values_are_skipped():
+    scanner, _ = _feed_in([REPLY])
+    assert "symptoms" not in scanner.fields and "meta" not in scanner.fields
+    assert scanner.fields["final"] is True  # not overwritten by meta.final
+
+
+def test_escaped_quotes_and_text_after_the_object():
+    scanner, _ = _feed_in(['{"a": "say \\"hi\\"", "b": false} {"c": 1}'])
+    assert scanner.fields == {"a": 'say "hi"', "b": False}
+    assert scanner.done
+
+
+def test_number_is_reported_at_the_closing_brace():
+    scanner, seen = _feed_in(['{"final": false, "n": 3', '.5', '}'])
+    assert seen[1] == {} and seen[2] == {"n": 3.5}
+
+
+def test_parse_triage_decision_handles_fences_and_trailing_commas():
+    decision = parse_triage_decision('```json\n{"final": true, "severity": "high", "symptoms": ["x"],}\n```')
+    assert decision.final and decision.severity == "High"
+
+
+def test_parse_errors_carry_a_reason():
+    with pytest.raises(StructuredOutputError) as exc:
+        extract_json_object("no json here")
+    assert exc.value.reason == "json"
+    with pytest.raises(StructuredOutputError) as exc:
+        parse_triage_decision('{"final": true}')
+    assert exc.value.reason == "schema"
@@ -0,0 +1,35 @@
+# backend/tests/test_symptom_matcher.py
+import random
+
+from benchmarks.severity_matcher import legacy_calculate_severity, make_cases, synthetic_vocab
+from app.services.severity_rules import get_rules
+from app.services.symptom_matcher import SymptomMatcher
+
+
+def _check_parity(weights, cases):
+    rules = get_rules()
+    matcher = SymptomMatcher(weights, rules.labels, rules.synonyms)
+    expected = [legacy_calculate_severity(c, weights, rules.labels) for c in cases]
+    assert [matcher.score(c) for c in cases] == expected
+    assert matcher.score_many(cases) == expected
+    assert matcher.score_many(cases, workers=1) == expected
+
+
+def test_matches_the_original_loop_on_the_shipped_vocabulary():
+    rng = random.Random(7)
+    weights = dict(get_rules().weights)
+    _check_parity(weights, make_cases(300, list(weights), rng) + [[], ["chest pain"], ["الم الصدر"]])
+
+
+def test_matches_the_original_loop_on_a_large_vocabulary():
+    rng = random.Random(11)
+    weights = synthetic_vocab(300, rng)
+    _check_parity(weights, make_cases(150, list(weights), rng))
+
+
+def test_best_match_reports_the_winning_term():
+    matcher = get_rules().matcher
+    label, term, score = matcher.best_match(["chest pain"])
+    assert label == "Critical"
+    assert term is not None and score > 0
+    assert matcher.best_match([])[0] == "Low"
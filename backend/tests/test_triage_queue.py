@@ -0,0 +1,117 @@
+# backend/tests/test_triage_queue.py
+import random
+
+from app.services.triage_queue import SEVERITIES, TriageQueueEngine, format_wait
+
+AGING = 1800
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _engine(clock=None, **kw):
+    return TriageQueueEngine(aging_seconds=AGING, service_interval=120, clock=clock or Clock(), **kw)
+
+
+def _admit(engine, severity, at, patient_id=1):
+    ticket = engine.issue_ticket(severity)
+    engine.admit(ticket, severity, patient_id, enqueued_at=at)
+    return ticket
+
+
+def _order(engine):
+    return [e.ticket for e in engine.next_up(limit=10_000)]
+
+
+def test_tickets_are_unique_per_prefix_and_continue_after_seeding():
+    engine = _engine()
+    assert [engine.issue_ticket(s) for s in SEVERITIES] == ["P1001", "A1001", "B1001", "C1001"]
+    engine.seed_tickets(["A1500", "C0999", "X42", None])
+    assert engine.issue_ticket("High") == "A1501"
+    assert engine.issue_ticket("Low") == "C1002"
+    assert engine.issue_ticket("unknown").startswith("C")
+
+
+def test_fifo_within_a_severity():
+    engine = _engine()
+    tickets = [_admit(engine, "Medium", at) for at in (10, 20, 30)]
+    assert _order(engine) == tickets
+    assert [engine.position(t) for t in tickets] == [0, 1, 2]
+
+
+def test_a_long_wait_overtakes_a_higher_severity_but_never_critical():
+    engine = _engine()
+    low = _admit(engine, "Low", 0)
+    high_early = _admit(engine, "High", 2 * AGING - 1)    # Low's head start over High is 2 levels
+    high_recent = _admit(engine, "High", 2 * AGING + 1)
+    critical = _admit(engine, "Critical", 10 * AGING)
+    assert _order(engine) == [critical, high_early, low, high_recent]
+    assert [engine.position(t) for t in (critical, high_early, low, high_recent)] == [0, 1, 2, 3]
+
+
+def test_equal_scores_go_to_the_more_severe_lane():
+    engine = _engine()
+    medium = _admit(engine, "Medium", AGING)
+    high = _admit(engine, "High", 0)
+    assert _order(engine) == [high, medium]
+    assert engine.position(medium) == 1
+
+
+def test_position_matches_next_up_under_churn():
+    rng = random.Random(3)
+    engine = _engine()
+    waiting = []
+    for i in range(600):
+        severity = rng.choice(SEVERITIES)
+        waiting.append(_admit(engine, severity, i * 37.0 + rng.random()))
+        if waiting and rng.random() < 0.3:
+            ticket = waiting.pop(rng.randrange(len(waiting)))
+            engine.transition(ticket, rng.choice(["in-progress", "done"]))
+    order = _order(engine)
+    assert sorted(order) == sorted(waiting)
+    assert [engine.position(t) for t in order] == list(range(len(order)))
+
+
+def test_requeued_patient_keeps_their_place():
+    engine = _engine()
+    first, second = _admit(engine, "High", 10), _admit(engine, "High", 20)
+    engine.transition(first, "in-progress")
+    assert _order(engine) == [second] and engine.position(first) is None
+    engine.transition(first, "waiting")
+    assert _order(engine) == [first, second]
+
+
+def test_done_and_discarded_patients_leave_and_lanes_compact():
+    engine = _engine()
+    tickets = [_admit(engine, "Low", float(i)) for i in range(2000)]
+    for t in tickets[:1900]:
+        engine.transition(t, "done")
+    engine.discard(tickets[1900])
+    assert engine.waiting_count("Low") == 99
+    assert engine.transition("nope", "done") is False
+    assert _order(engine) == tickets[1901:]
+    assert engine.position(tickets[1950]) == 49
+
+
+def test_wait_estimate_follows_the_observed_service_interval():
+    clock = Clock()
+    engine = _engine(clock, ewma_alpha=0.5)
+    tickets = [_admit(engine, "Medium", clock.now + i) for i in range(4)]
+    assert engine.estimate_wait_seconds(tickets[3]) == 3 * 120
+
+    engine.transition(tickets[0], "in-progress")
+    clock.now += 600
+    engine.transition(tickets[1], "in-progress")
+    assert engine.service_interval == 120 + 0.5 * (600 - 120)
+    assert engine.estimate_wait_seconds(tickets[3]) == engine.service_interval
+    assert engine.wait_label(_admit(engine, "Critical", clock.now)) == "Immediate"
+
+
+def test_format_wait_gives_a_range():
+    assert format_wait(0) == "0–5 minutes"
+    assert format_wait(30 * 60) == "20–40 minutes"
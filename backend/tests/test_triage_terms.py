@@ -0,0 +1,74 @@
+# backend/tests/test_triage_terms.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import SessionLocal, engine
+from app.services import triage_terms
+from app.services.patient_queue import QueueQuery, fetch_queue_page
+from app.services.triage_terms import backfill_terms, ensure_fts, split_terms
+
+T0 = datetime(2093, 1, 1, 8, 0)
+WINDOW = {"since": T0, "until": T0 + timedelta(days=1)}
+
+
+@pytest.fixture(scope="module")
+def tickets(db_tables):
+    from app.services.triage_writer import build_triage_record
+
+    rows = [
+        ("A1", "Chest  pain, cough", "diabetes"),
+        ("B1", "fever, COUGH", ""),
+        ("C1", "sore throat", "smoker, diabetes"),
+    ]
+    with SessionLocal() as db:
+        for i, (ticket, symptoms, risk_factors) in enumerate(rows):
+            record = build_triage_record(9401, {
+                "ticket": ticket, "symptoms": symptoms.split(", "), "risk_factors": risk_factors.split(", "),
+            })
+            record.timestamp = T0 + timedelta(minutes=i)
+            db.add(record)
+        db.commit()
+    return [r[0] for r in rows]
+
+
+def _tickets(**kw):
+    with SessionLocal() as db:
+        items, _ = fetch_queue_page(db, QueueQuery(**WINDOW, fields=["ticket"], **kw))
+    return sorted(item["ticket"] for item in items)
+
+
+def test_split_terms_normalizes_and_dedupes():
+    assert split_terms(" Chest  Pain, cough,chest pain ,, ") == ["chest pain", "cough"]
+
+
+def test_symptom_and_risk_factor_filters_match_any_exact_term(tickets):
+    assert _tickets(symptom=["CHEST PAIN"]) == ["A1"]
+    assert _tickets(symptom=["cough", "sore throat"]) == ["A1", "B1", "C1"]
+    assert _tickets(symptom=["chest"]) == []
+    assert _tickets(risk_factor=["diabetes"], symptom=["cough"]) == ["A1"]
+
+
+@pytest.mark.parametrize("fts", [True, False])
+def test_free_text_search(tickets, monkeypatch, fts):
+    monkeypatch.setattr(triage_terms, "_fts_enabled", False)  # substring fallback unless FTS is set up
+    if fts and not ensure_fts(engine):
+        pytest.skip("SQLite built without FTS5")
+    assert _tickets(text="thro") == ["C1"]
+    assert _tickets(text="smok") == ["C1"]
+    assert _tickets(text="fever") == ["B1"]
+
+
+def test_backfill_fills_in_old_records_once(db_tables):
+    from app.models.triage_record import TriageRecord
+
+    with SessionLocal() as db:
+        old = TriageRecord(patient_id=9402, symptoms="Dizzy, fatigue", risk_factors="", ticket="C2",
+                           wait_time="", timestamp=T0 + timedelta(hours=1))  # written before triage_terms
+        db.add(old)
+        db.commit()
+    assert _tickets(symptom=["dizzy"]) == []
+
+    assert backfill_terms(engine, chunk=2) >= 2
+    assert _tickets(symptom=["dizzy"]) == ["C2"]
+    assert backfill_terms(engine) == 0
@@ -0,0 +1,96 @@
+# backend/tests/test_triage_writer.py
+import asyncio
+
+from app.services import triage_writer
+from app.services.triage_writer import TriageWriteBehind
+
+SAMPLE = {"symptoms": ["chest pain"], "duration": "1 hour", "severity": "High", "risk_factors": [], "ticket": ""}
+
+
+def _count(patient_id):
+    from app.core.database import SessionLocal
+    from app.models.triage_record import TriageRecord
+
+    with SessionLocal() as db:
+        return db.query(TriageRecord).filter(TriageRecord.patient_id == patient_id).count()
+
+
+def _surge(mode, patient_id, n=60):
+    from app.core.database import dispose_async_engine
+
+    async def run():
+        writer = TriageWriteBehind(mode=mode, flush_ms=20, batch_max=25)
+        try:
+            await asyncio.gather(*[writer.save(patient_id, dict(SAMPLE)) for _ in range(n)])
+            return _count(patient_id)
+        finally:
+            await writer.close()
+            await dispose_async_engine()
+
+    return asyncio.run(run())
+
+
+def test_commit_mode_acks_after_batched_commits(db_tables):
+    batches_before = triage_writer.TRIAGE_WRITE_BATCH.count()
+    assert _surge("commit", patient_id=9001) == 60  # every caller returned after its row was committed
+    assert triage_writer.TRIAGE_WRITE_BATCH.count() - batches_before <= 4
+
+
+def test_close_flushes_enqueued_records(db_tables):
+    _surge("enqueue", patient_id=9002)
+    assert _count(9002) == 60
+
+
+def test_direct_mode_writes_one_by_one(db_tables):
+    batches_before = triage_writer.TRIAGE_WRITE_BATCH.count()
+    assert _surge("direct", patient_id=9003, n=5) == 5
+    assert triage_writer.TRIAGE_WRITE_BATCH.count() == batches_before
+
+
+class _SlowWriter:
+    def __init__(self, error=None):
+        self.error = error
+        self.saved = []
+
+    async def save(self, user_id, data):
+        await asyncio.sleep(0.05)
+        if self.error is not None:
+            raise self.error
+        self.saved.append(data["ticket"])
+
+
+def _finalize_then_cancel(monkeypatch, writer):
+    from app.services import triage_service
+
+    monkeypatch.setattr(triage_service, "get_triage_writer", lambda: writer)
+    data = {"final": True, "severity": "Medium", "symptoms": ["cough"]}
+
+    async def run():
+        task = asyncio.ensure_future(triage_service._finalize(data, user_id=9004))
+        await asyncio.sleep(0.01)
+        task.cancel()  # the client went away mid-save
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0.1)
+        return data["ticket"]
+
+    return asyncio.run(run())
+
+
+def test_a_disconnect_during_the_save_keeps_the_row_and_the_ticket(monkeypatch):
+    from app.services.triage_queue import get_triage_queue
+
+    writer = _SlowWriter()
+    ticket = _finalize_then_cancel(monkeypatch, writer)
+    assert writer.saved == [ticket]
+    assert get_triage_queue().get(ticket) is not None
+    get_triage_queue().discard(ticket)
+
+
+def test_a_failed_save_gives_the_ticket_back(monkeypatch):
+    from app.services.triage_queue import get_triage_queue
+
+    ticket = _finalize_then_cancel(monkeypatch, _SlowWriter(error=RuntimeError("disk full")))
+    assert get_triage_queue().get(ticket) is None